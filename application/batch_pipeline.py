@@ -0,0 +1,115 @@
+# application/batch_pipeline.py
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List
+
+_END = object()
+
+
+class BatchPipeline:
+    """
+    Productor/consumidor por etapas para los lotes de una tabla: un hilo lee de
+    SQL Server, cada transformación corre en su propio hilo y quien itera (la
+    carga en PostgreSQL) consume el resultado. Entre etapas hay colas acotadas:
+    si la carga va más lenta, la lectura se bloquea en vez de acumular lotes en
+    memoria, y el tiempo total tiende al de la etapa más lenta.
+    """
+
+    def __init__(self, queue_size: int = 2, name: str = 'pipeline'):
+        self.queue_size = max(1, queue_size)
+        self.name = name
+        # Segundos bloqueados: 'extract' esperando hueco en la cola (la carga es más
+        # lenta) y 'load' esperando lotes (la lectura es más lenta)
+        self.waits: Dict[str, float] = {'extract': 0.0, 'load': 0.0}
+
+    def _put(self, target: queue.Queue, item, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run_source(self, source: Iterable, target: queue.Queue, stop: threading.Event, errors: List):
+        try:
+            iterator = iter(source)
+            while not stop.is_set():
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                start = time.perf_counter()
+                if not self._put(target, item, stop):
+                    break
+                self.waits['extract'] += time.perf_counter() - start
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            close = getattr(source, 'close', None)
+            if close is not None:
+                close()  # Cierra el generador (y el cursor) en el hilo que lo usa
+            self._put(target, _END, stop)
+
+    def _run_stage(self, stage: Callable, source: queue.Queue, target: queue.Queue,
+                   stop: threading.Event, errors: List):
+        try:
+            while not stop.is_set():
+                try:
+                    item = source.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _END:
+                    break
+                if not self._put(target, stage(item), stop):
+                    break
+        except BaseException as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            self._put(target, _END, stop)
+
+    def iterate(self, source: Iterable, stages: List[Callable] = (), stop: threading.Event = None) -> Iterator:
+        """
+        Lanza la lectura y las etapas en hilos y devuelve los lotes ya procesados en
+        el hilo que llama. Un error en cualquier etapa detiene el resto y se relanza aquí.
+        `stop` se activa al terminar o al cortar la iteración, antes de esperar a los
+        hilos: la lectura puede usarlo para dejar de esperar (p. ej. memoria).
+        """
+        stop = stop or threading.Event()
+        errors: List[BaseException] = []
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(stages) + 1)]
+        threads = [threading.Thread(target=self._run_source, args=(source, queues[0], stop, errors),
+                                    name=f'{self.name}-extract', daemon=True)]
+        for index, stage in enumerate(stages):
+            threads.append(threading.Thread(
+                target=self._run_stage, args=(stage, queues[index], queues[index + 1], stop, errors),
+                name=f'{self.name}-stage{index + 1}', daemon=True
+            ))
+        for thread in threads:
+            thread.start()
+
+        output = queues[-1]
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = output.get(timeout=0.1)
+                except queue.Empty:
+                    self.waits['load'] += time.perf_counter() - start
+                    if stop.is_set() and errors:
+                        break
+                    continue
+                self.waits['load'] += time.perf_counter() - start
+                if item is _END:
+                    break
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
@@ -0,0 +1,109 @@
+# application/batch_size_controller.py
+
+import threading
+from typing import Dict, List, Optional
+
+
+class BatchSizeController:
+    """
+    Ajusta las filas por lote de una tabla según el rendimiento medido. Parte de
+    `initial_rows` y, tras `samples` lotes completos de cada tamaño, compara sus
+    filas/s: mientras mejore al menos un `tolerance`, duplica el tamaño; si no
+    mejora, prueba tamaños menores que el mejor y, cuando tampoco mejoran, se
+    queda con el mejor. El tope de memoria que indica quien lee (`next_rows`)
+    limita el crecimiento. Es compartido por las particiones de la tabla.
+    """
+
+    def __init__(self, initial_rows: int, min_rows: int = 1000, max_rows: int = 1000000,
+                 samples: int = 3, growth: float = 2.0, tolerance: float = 0.05):
+        self.min_rows = max(1, int(min_rows))
+        self.max_rows = max(self.min_rows, int(max_rows))
+        self.samples = max(1, int(samples))
+        self.growth = growth
+        self.tolerance = tolerance
+        self.rows = self._clamp(initial_rows)
+        self.ceiling = self.max_rows
+        self.best_rows: Optional[int] = None
+        self.best_throughput = 0.0
+        self.growing = True
+        self.converged = False
+        # Filas/s medidas por tamaño de lote y acumulados [lotes, filas, segundos, bytes] del tamaño en curso
+        self.measured: Dict[int, float] = {}
+        self._stats: Dict[int, List[float]] = {}
+        self._rows_total = 0
+        self._bytes_total = 0
+        self._lock = threading.Lock()
+
+    def _clamp(self, rows) -> int:
+        return max(self.min_rows, min(self.max_rows, int(rows)))
+
+    @property
+    def row_bytes(self) -> float:
+        """
+        Memoria media por fila de los lotes medidos (0 si aún no hay medidas).
+        """
+        with self._lock:
+            return self._bytes_total / self._rows_total if self._rows_total else 0.0
+
+    def next_rows(self, limit: int = None) -> int:
+        """
+        Filas del siguiente lote. `limit` es el máximo que cabe en memoria: si el
+        tamaño en curso lo supera se reduce a él y deja de crecer por encima.
+        """
+        with self._lock:
+            if limit is not None and limit < self.rows:
+                self.rows = max(1, int(limit))
+                self.ceiling = self.rows
+            return self.rows
+
+    def record(self, rows: int, seconds: float, nbytes: int):
+        """
+        Registra un lote escrito: filas, segundos que ha tardado y bytes en memoria.
+        """
+        if rows <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            self._rows_total += rows
+            self._bytes_total += nbytes
+            if self.converged or rows != self.rows:
+                return  # Lotes finales incompletos o de un tamaño anterior
+            stats = self._stats.setdefault(rows, [0, 0, 0.0, 0])
+            stats[0] += 1
+            stats[1] += rows
+            stats[2] += seconds
+            stats[3] += nbytes
+            if stats[0] >= self.samples:
+                self._evaluate(rows, stats[1] / stats[2])
+
+    def _evaluate(self, rows: int, throughput: float):
+        self.measured[rows] = throughput
+        if self.best_rows is None or throughput > self.best_throughput * (1 + self.tolerance):
+            self.best_rows, self.best_throughput = rows, throughput
+            candidate = rows * self.growth if self.growing else rows / self.growth
+        elif self.growing:
+            self.growing = False
+            candidate = self.best_rows / self.growth
+        else:
+            candidate = None
+        while candidate is not None:
+            candidate = int(candidate)
+            if self.min_rows <= candidate <= self.ceiling and candidate not in self.measured:
+                break
+            if self.growing:
+                self.growing = False
+                candidate = self.best_rows / self.growth
+            else:
+                candidate = None
+        if candidate is None:
+            self.converged = True
+            self.rows = self.best_rows
+        else:
+            self.rows = candidate
+
+    @property
+    def chosen_rows(self) -> Optional[int]:
+        """
+        Mejor tamaño medido hasta ahora (None si ningún tamaño tiene medidas suficientes).
+        """
+        with self._lock:
+            return self.best_rows
@@ -2,19 +2,26 @@
 
 import os
 import logging
+from typing import Optional
+from infrastructure.bak_cache import BakCache, zip_fingerprint
 from infrastructure.database_utilities import DatabaseUtilities
 
 class ExtractBakUseCase:
     """
     Caso de uso para extraer el archivo .bak más reciente desde la carpeta compartida.
+    Con caché de .bak (BAK_CACHE_DIR, desactivada por defecto y relativa a la carpeta
+    local) los archivos se extraen en ella y un ZIP ya extraído antes se reutiliza sin
+    copiarlo ni descomprimirlo; sin caché, o si el ZIP no cabe en su cuota, se
+    extraen en la carpeta local.
     """
-    def __init__(self, shared_folder: str, local_folder: str):
+    def __init__(self, shared_folder: str, local_folder: str, cache: Optional[BakCache] = None):
         self.shared_folder = shared_folder
         self.local_folder = local_folder  # Ahora se ajusta a la nueva carpeta de destino
+        self.cache = cache if cache is not None else BakCache.from_config(local_folder)
 
     def execute(self):
         """
-        Extrae el archivo .bak desde un ZIP en la carpeta compartida y lo mueve a la carpeta local.
+        Extrae el archivo .bak desde un ZIP en la carpeta compartida directamente en la carpeta local.
         Devuelve el nombre del archivo .bak extraído.
         """
         # Crear carpeta local si no existe
@@ -36,25 +43,18 @@ class ExtractBakUseCase:
                 raise FileNotFoundError("No se encontró ningún archivo ZIP en la carpeta compartida.")
             logging.info(f"Último archivo ZIP encontrado: {latest_zip}")
 
-            # Extraer el archivo .bak del ZIP
-            bak_files = DatabaseUtilities.extract_bak_from_zip(latest_zip)
-            if not bak_files:
-                raise FileNotFoundError(f"No se encontró ningún archivo .bak en el archivo ZIP {latest_zip}")
-
-            # Mover el archivo .bak extraído a la carpeta local
-            extracted_bak_files = []
-            for bak_file in bak_files:
-                bak_name = os.path.basename(bak_file)
-                destination = os.path.join(self.local_folder, bak_name)
+            if self.cache is not None:
+                key = zip_fingerprint(latest_zip)
+                cached_bak_files = self.cache.lookup(key) or self.cache.store(
+                    key, latest_zip, lambda folder: DatabaseUtilities.extract_bak_from_zip(latest_zip, folder)
+                )
+                if cached_bak_files:
+                    return cached_bak_files
 
-                # Si el archivo ya existe, lo eliminamos para sobrescribir
-                if os.path.exists(destination):
-                    logging.warning(f"El archivo ya existe en {destination}. Será sobrescrito.")
-                    os.remove(destination)
-
-                os.rename(bak_file, destination)
-                logging.info(f"Archivo .bak movido a {destination}")
-                extracted_bak_files.append(destination)
+            # Extraer el archivo .bak del ZIP directamente en la carpeta local
+            extracted_bak_files = DatabaseUtilities.extract_bak_from_zip(latest_zip, self.local_folder)
+            if not extracted_bak_files:
+                raise FileNotFoundError(f"No se encontró ningún archivo .bak en el archivo ZIP {latest_zip}")
 
             logging.info(f"Todos los archivos .bak se extrajeron correctamente a {self.local_folder}")
             return extracted_bak_files  # Devolver la lista de archivos extraídos
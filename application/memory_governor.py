@@ -0,0 +1,100 @@
+# application/memory_governor.py
+
+import logging
+import sys
+import threading
+from typing import Dict
+
+import pandas as pd
+
+
+def estimate_frame_bytes(frame) -> int:
+    """
+    Estima la memoria de un lote sin recorrerlo entero: los RecordBatch conocen el
+    tamaño de sus buffers y en los DataFrame las columnas object se estiman con una
+    muestra de hasta 100 valores.
+    """
+    if not isinstance(frame, pd.DataFrame):
+        return int(frame.nbytes)
+    total = int(frame.memory_usage(index=False, deep=False).sum())
+    for column in frame.columns:
+        series = frame[column]
+        if series.dtype == object and len(series):
+            sample = series.iloc[:100]
+            total += int(sum(sys.getsizeof(value) for value in sample) / len(sample) * len(series))
+    return total
+
+
+class MemoryWaitCancelled(RuntimeError):
+    """
+    La lectura se detuvo (error o corte de la carga) mientras esperaba memoria.
+    """
+
+
+class MemoryGovernor:
+    """
+    Presupuesto de memoria compartido por todos los workers de la sincronización.
+    Cada lote reserva sus bytes estimados antes de leerse y los libera cuando ya
+    se ha escrito en PostgreSQL; si el presupuesto está agotado, la lectura espera.
+    Un lote mayor que el presupuesto solo se admite cuando no hay nada más en vuelo,
+    para no bloquear la ejecución. Registra el pico de bytes en vuelo por tabla.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = max(1, int(budget_bytes))
+        self.in_flight = 0
+        self.peak = 0
+        self._in_flight_by_table: Dict[str, int] = {}
+        self._peak_by_table: Dict[str, int] = {}
+        self._condition = threading.Condition()
+
+    def _account(self, table_name: str, nbytes: int):
+        self.in_flight += nbytes
+        self.peak = max(self.peak, self.in_flight)
+        current = self._in_flight_by_table.get(table_name, 0) + nbytes
+        self._in_flight_by_table[table_name] = current
+        self._peak_by_table[table_name] = max(self._peak_by_table.get(table_name, 0), current)
+
+    def acquire(self, table_name: str, nbytes: int, cancel: threading.Event = None):
+        """
+        Reserva `nbytes` para un lote de la tabla, esperando si no caben. Si se activa
+        `cancel` durante la espera lanza MemoryWaitCancelled: los lotes que retienen
+        la memoria pueden estar en colas que ya nadie va a vaciar.
+        """
+        nbytes = max(0, int(nbytes))
+        with self._condition:
+            waited = False
+            while self.in_flight and self.in_flight + nbytes > self.budget_bytes:
+                if cancel is not None and cancel.is_set():
+                    raise MemoryWaitCancelled(f"Tabla '{table_name}': lectura detenida mientras esperaba memoria.")
+                if not waited:
+                    logging.debug(f"Tabla '{table_name}': esperando memoria ({self.in_flight} bytes en vuelo).")
+                    waited = True
+                self._condition.wait(timeout=None if cancel is None else 0.1)
+            self._account(table_name, nbytes)
+
+    def adjust(self, table_name: str, reserved: int, actual: int):
+        """
+        Sustituye la reserva estimada por el tamaño medido del lote ya leído.
+        """
+        with self._condition:
+            self._account(table_name, int(actual) - int(reserved))
+            if actual < reserved:
+                self._condition.notify_all()
+
+    def release(self, table_name: str, nbytes: int):
+        with self._condition:
+            self._account(table_name, -int(nbytes))
+            self._condition.notify_all()
+
+    def batch_rows(self, requested_rows: int, row_bytes: float, slots: int) -> int:
+        """
+        Filas por lote para que `slots` lotes simultáneos quepan en el presupuesto.
+        """
+        if row_bytes <= 0:
+            return requested_rows
+        return max(1, min(requested_rows, int(self.budget_bytes / max(1, slots) / row_bytes)))
+
+    def table_peak(self, table_name: str) -> int:
+        with self._condition:
+            return self._peak_by_table.get(table_name, 0)
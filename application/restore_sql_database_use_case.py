@@ -1,17 +1,49 @@
 # application/restore_sql_database_use_case
 
 import os
-import subprocess
+import re
 import logging
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from domain.entities import RestoreProfile, RestoreResult
+from infrastructure.config import Config
+from infrastructure.sql_server_catalog import backup_fingerprint
+from infrastructure.sql_server_executor import ResultSet, SqlServerError, SqlServerExecutor
+
+
+def parse_restore_throughput(output: str) -> Tuple[float, Optional[float]]:
+    """
+    (segundos, MB/s) del mensaje final del RESTORE: "RESTORE DATABASE successfully
+    processed N pages in X seconds (Y MB/sec)". (0.0, None) si no aparece.
+    """
+    match = re.search(r"processed \d+ pages in ([\d.]+) seconds \(([\d.]+) MB/sec\)", output or "")
+    if not match:
+        return 0.0, None
+    return float(match.group(1)), float(match.group(2))
+
+
+def sql_literal(value: str) -> str:
+    return "N'" + value.replace("'", "''") + "'"
+
 
 class RestoreSQLDatabaseUseCase:
     """
-    Caso de uso para restaurar una base de datos en SQL Server desde un archivo .bak.
+    Caso de uso para restaurar una base de datos en SQL Server desde un archivo .bak,
+    o desde varios si la copia está repartida en bandas (striped). Con un repositorio
+    de estado, la copia restaurada se registra por su huella de RESTORE HEADERONLY y
+    no se vuelve a restaurar si la base sigue ONLINE con ella. Las sentencias se
+    ejecutan con `executor` (por defecto el SqlServerExecutor compartido).
     """
 
-    def __init__(self, bak_file_path, database_name="TemporaryDB"):
-        self.bak_file_path = bak_file_path
+    def __init__(self, bak_file_path: Union[str, Sequence[str]], database_name="TemporaryDB",
+                 state_repository=None, profile: RestoreProfile = None, executor: SqlServerExecutor = None):
+        self.bak_files = [bak_file_path] if isinstance(bak_file_path, str) else list(bak_file_path)
+        self.bak_file_path = self.bak_files[0]
         self.database_name = database_name
+        self.state_repository = state_repository
+        self.profile = profile or RestoreProfile(
+            'config', Config.SQL_RESTORE_BUFFERCOUNT, Config.SQL_RESTORE_MAXTRANSFERSIZE, Config.SQL_RESTORE_BLOCKSIZE
+        )
+        self.executor = executor or SqlServerExecutor.shared()
         self.base_path = r"C:\Program Files\Microsoft SQL Server\MSSQL16.MSSQLSERVER\MSSQL\Backup"
         self.subdirectories = ["Data", "Logs"]
 
@@ -27,48 +59,103 @@ class RestoreSQLDatabaseUseCase:
             else:
                 logging.info(f"Carpeta ya existe: {dir_path}")
 
+    def missing_bak_files(self) -> List[str]:
+        return [path for path in self.bak_files if not os.path.exists(path)]
+
+    def from_clause(self) -> str:
+        """
+        Origen del RESTORE: todas las bandas de la copia.
+        """
+        return "FROM " + ", ".join(f"DISK = {sql_literal(path)}" for path in self.bak_files)
+
     def delete_database(self):
         """
         Elimina la base de datos si ya existe.
         """
         try:
             logging.info(f"Eliminando la base de datos '{self.database_name}' si existe...")
-            delete_cmd = f"DROP DATABASE {self.database_name}"
-            cmd = [
-                'sqlcmd',
-                '-S', 'localhost',
-                '-E',
-                '-Q', delete_cmd
-            ]
-            result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-            if result.returncode == 0:
-                logging.info(f"La base de datos '{self.database_name}' se eliminó correctamente.")
-            else:
-                logging.warning(f"Error al eliminar la base de datos: {result.stderr}")
-        except Exception as e:
-            logging.error(f"Error durante la eliminación de la base de datos: {e}")
+            self.executor.execute(f"DROP DATABASE IF EXISTS [{self.database_name}]")
+            logging.info(f"La base de datos '{self.database_name}' se eliminó correctamente.")
+        except SqlServerError as e:
+            logging.warning(f"Error al eliminar la base de datos: {e}")
 
-    def parse_logical_names(self, filelist_output):
+    def parse_logical_names(self, filelist: ResultSet) -> List[Dict[str, str]]:
         """
-        Parsear los nombres lógicos desde la salida de RESTORE FILELISTONLY.
+        Archivos lógicos del resultado de RESTORE FILELISTONLY, en su orden:
+        [{"logical_name": ..., "type": "D" | "L" | "S" | "F"}].
         """
-        import re
-        logical_names = {"data": None, "log": None}
-        lines = filelist_output.splitlines()
+        logical_files = [
+            {"logical_name": record["LogicalName"], "type": record["Type"]}
+            for record in filelist.records()
+        ]
 
-        for line in lines:
-            match = re.match(r"^\s*(\S+)\s+([A-Za-z]:\\.+?\.\w+)\s+([DL])", line)
-            if match:
-                logical_name, physical_name, file_type = match.groups()
-                if file_type == "D":  # Archivo de datos
-                    logical_names["data"] = logical_name
-                elif file_type == "L":  # Archivo de log
-                    logical_names["log"] = logical_name
-
-        if not logical_names["data"] or not logical_names["log"]:
+        file_types = {f["type"] for f in logical_files}
+        if "D" not in file_types or "L" not in file_types:
             raise ValueError("No se pudieron determinar los nombres lógicos del archivo .bak.")
 
-        return logical_names
+        return logical_files
+
+    def build_move_clauses(self, logical_files: List[Dict[str, str]]) -> List[str]:
+        """
+        Un MOVE por archivo lógico: el primer archivo de datos y el primer log
+        conservan los nombres de siempre (.mdf y _Log.ldf); los demás llevan el
+        nombre lógico (.ndf, .ldf o carpeta de FILESTREAM / catálogo de texto).
+        """
+        data_folder = os.path.join(self.base_path, "Data")
+        log_folder = os.path.join(self.base_path, "Logs")
+        clauses, seen = [], set()
+        for logical_file in logical_files:
+            name, file_type = logical_file["logical_name"], logical_file["type"]
+            if file_type == "D":
+                file_name = f"{self.database_name}.mdf" if "D" not in seen else f"{self.database_name}_{name}.ndf"
+                path = os.path.join(data_folder, file_name)
+            elif file_type == "L":
+                file_name = f"{self.database_name}_Log.ldf" if "L" not in seen else f"{self.database_name}_{name}.ldf"
+                path = os.path.join(log_folder, file_name)
+            else:
+                path = os.path.join(data_folder, f"{self.database_name}_{name}")
+            seen.add(file_type)
+            clauses.append(f"MOVE {sql_literal(name)} TO {sql_literal(path)}")
+        return clauses
+
+    def build_restore_command(self, logical_files: List[Dict[str, str]]) -> str:
+        """
+        RESTORE DATABASE desde todas las bandas, con MOVE por archivo y el perfil de E/S.
+        """
+        options = self.build_move_clauses(logical_files) + self.profile.options() + ["REPLACE", "STATS = 10"]
+        return (
+            f"RESTORE DATABASE [{self.database_name}]\n"
+            f"{self.from_clause()}\n"
+            f"WITH\n    " + ",\n    ".join(options) + ";\n"
+        )
+
+    def read_backup_fingerprint(self) -> Optional[str]:
+        """
+        Huella de la copia (FILE = 1) según RESTORE HEADERONLY: GUID del backup set,
+        fecha de fin y rango de LSN, la misma que registra msdb al restaurarla.
+        None si no se puede leer la cabecera.
+        """
+        try:
+            headers = self.executor.query(f"RESTORE HEADERONLY {self.from_clause()}").records()
+            header = next((h for h in headers if h.get("Position") == 1), headers[0] if headers else None)
+            if header is None:
+                raise ValueError("RESTORE HEADERONLY no devolvió ninguna copia")
+            return backup_fingerprint(
+                header["BackupSetGUID"], header["BackupFinishDate"], header["FirstLSN"], header["LastLSN"]
+            )
+        except (SqlServerError, ValueError, KeyError) as e:
+            logging.warning(f"No se pudo leer la cabecera del archivo .bak ({e}); se restaurará igualmente.")
+            return None
+
+    def is_already_restored(self, fingerprint: Optional[str]) -> bool:
+        """
+        True si la base está ONLINE con la misma copia de seguridad registrada en el estado.
+        """
+        if self.state_repository is None or fingerprint is None:
+            return False
+        if self.state_repository.get_restored_backup(self.database_name) != fingerprint:
+            return False
+        return self.verify_database_status()
 
     def verify_database_status(self):
         """
@@ -76,94 +163,74 @@ class RestoreSQLDatabaseUseCase:
         """
         try:
             logging.info(f"Verificando si la base de datos '{self.database_name}' está ONLINE...")
-            query_cmd = f"SELECT name, state_desc FROM sys.databases WHERE name = '{self.database_name}'"
-            cmd = [
-                'sqlcmd',
-                '-S', 'localhost',
-                '-E',
-                '-Q', query_cmd
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, shell=True, check=True)
-            if self.database_name in result.stdout and "ONLINE" in result.stdout:
-                return True
-            else:
-                return False
-        except Exception as e:
+            state = self.executor.query(
+                "SELECT state_desc FROM sys.databases WHERE name = ?", (self.database_name,)
+            ).scalar()
+            return state == "ONLINE"
+        except SqlServerError as e:
             logging.error(f"Error al verificar el estado de la base de datos: {e}")
             return False
 
-    def execute(self):
+    def execute(self) -> RestoreResult:
         """
-        Restaura la base de datos desde el archivo .bak.
+        Restaura la base de datos desde el archivo .bak, salvo que ya tenga restaurada
+        la misma copia ('unchanged'): las etapas siguientes pueden entonces reanudar
+        su trabajo con esa copia en lugar de empezar de cero.
         """
         self.ensure_directories_exist()
 
-        data_path = os.path.join(self.base_path, "Data", f"{self.database_name}.mdf")
-        log_path = os.path.join(self.base_path, "Logs", f"{self.database_name}_Log.ldf")
-
-        if not os.path.exists(self.bak_file_path):
-            logging.error(f"Error: El archivo .bak no existe en la ruta especificada: {self.bak_file_path}")
-            return False
-
+        missing = self.missing_bak_files()
+        if missing:
+            logging.error(f"Error: El archivo .bak no existe en la ruta especificada: {', '.join(missing)}")
+            return RestoreResult(self.database_name, 'error', error=f"No existe {', '.join(missing)}")
+
+        if self.state_repository is not None:
+            self.state_repository.ensure_schema()
+        fingerprint = self.read_backup_fingerprint()
+        if self.is_already_restored(fingerprint):
+            logging.info(f"La base de datos '{self.database_name}' ya tiene restaurada la copia {fingerprint}; "
+                         f"se omite la restauración.")
+            return RestoreResult(self.database_name, 'unchanged', fingerprint)
+        if self.state_repository is not None:
+            # La base se va a sobrescribir: si la restauración falla no debe constar ninguna copia
+            self.state_repository.clear_restored_backup(self.database_name)
         try:
             # Obtener los nombres lógicos del archivo .bak
             logging.info("Obteniendo los nombres lógicos del archivo .bak...")
-            filelist_cmd = f"RESTORE FILELISTONLY FROM DISK = '{self.bak_file_path}'"
-            cmd = [
-                'sqlcmd',
-                '-S', 'localhost',
-                '-E',
-                '-Q', filelist_cmd
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, shell=True, check=True)
-            filelist_output = result.stdout
-            logging.info("Salida de FILELISTONLY obtenida correctamente:")
-            logging.info(filelist_output)
-
-            logical_names = self.parse_logical_names(filelist_output)
-            logging.info(f"Nombres lógicos detectados: {logical_names}")
+            filelist = self.executor.query(f"RESTORE FILELISTONLY {self.from_clause()}")
+            logical_files = self.parse_logical_names(filelist)
+            logging.info(f"Archivos lógicos detectados: {logical_files}")
 
             # Preparar comando de restauración
-            restore_cmd = f"""
-            RESTORE DATABASE [{self.database_name}]
-            FROM DISK = '{self.bak_file_path}'
-            WITH 
-            MOVE '{logical_names["data"]}' TO '{data_path}',
-            MOVE '{logical_names["log"]}' TO '{log_path}',
-            REPLACE, STATS = 10;
-            """
-            logging.info("Comando RESTORE generado:")
+            restore_cmd = self.build_restore_command(logical_files)
+            logging.info(f"Comando RESTORE generado (perfil '{self.profile.name}', {len(self.bak_files)} bandas):")
             logging.info(restore_cmd)
 
-            temp_sql_file = os.path.join(self.base_path, "restore_command.sql")
-            with open(temp_sql_file, "w") as f:
-                f.write(restore_cmd)
-
-            restore_cmd_exec = [
-                'sqlcmd',
-                '-S', 'localhost',
-                '-E',
-                '-i', temp_sql_file
-            ]
-
             logging.info(f"Iniciando restauración de la base de datos como '{self.database_name}'...")
-            restore_result = subprocess.run(restore_cmd_exec, capture_output=True, text=True, shell=True)
-            logging.info(f"Salida del comando de restauración:")
-            logging.info(restore_result.stdout)
-
-            if restore_result.returncode != 0:
-                logging.error(f"Error durante la restauración: {restore_result.stderr}")
-                return False
-
+            try:
+                messages = [m for result in self.executor.execute(restore_cmd) for m in result.messages]
+            except SqlServerError as e:
+                logging.error(f"Error durante la restauración: {e}")
+                logging.info("\n".join(e.messages))
+                return RestoreResult(self.database_name, 'error', fingerprint, str(e))
+            logging.info("Salida del comando de restauración:")
+            logging.info("\n".join(messages))
+
+            seconds, megabytes_per_second = parse_restore_throughput("\n".join(messages))
+            if megabytes_per_second is not None:
+                logging.info(f"RESTORE en {seconds:.1f} s ({megabytes_per_second:.1f} MB/s).")
             if self.verify_database_status():
                 logging.info(f"La base de datos '{self.database_name}' está ONLINE y funcional.")
-                return True
+                if self.state_repository is not None and fingerprint is not None:
+                    self.state_repository.save_restored_backup(
+                        self.database_name, fingerprint, ", ".join(self.bak_files)
+                    )
+                return RestoreResult(self.database_name, 'restored', fingerprint,
+                                     seconds=seconds, megabytes_per_second=megabytes_per_second)
             else:
                 logging.error(f"Error: La base de datos '{self.database_name}' no se encuentra en la lista de bases de datos.")
-                return False
+                return RestoreResult(self.database_name, 'error', fingerprint, "La base no está ONLINE")
 
-        except subprocess.CalledProcessError as e:
+        except (SqlServerError, ValueError) as e:
             logging.error(f"Error al restaurar la base de datos: {e}")
-            return False
+            return RestoreResult(self.database_name, 'error', fingerprint, str(e))
@@ -0,0 +1,77 @@
+# application/run_manifest.py
+
+import logging
+import threading
+from typing import Dict, Optional
+
+TABLE_DONE = '*'
+
+
+class RunManifest:
+    """
+    Manifiesto de una ejecución de la sincronización, ligado a la huella de la
+    copia de seguridad restaurada: registra las tablas terminadas y los trozos
+    (particiones o trozos de checksum) ya escritos. Al reanudar con la misma
+    copia se omite ese trabajo; con otra copia el manifiesto se descarta.
+    Sin huella (la base no viene de un RESTORE) no registra nada.
+    """
+
+    def __init__(self, repository, fingerprint: Optional[str], resume: bool = False):
+        self.repository = repository
+        self.fingerprint = fingerprint
+        self.progress: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        if fingerprint is None:
+            if resume:
+                logging.warning("Sin huella de la copia restaurada: no se puede reanudar y se empieza de cero.")
+            return
+        if resume:
+            repository.clear_run_progress(fingerprint)  # Manifiestos de otras copias
+            self.progress = repository.get_run_progress(fingerprint)
+            done = [table for table, chunks in self.progress.items() if TABLE_DONE in chunks]
+            logging.info(f"Reanudando la ejecución de la copia {fingerprint}: {len(done)} tablas terminadas y "
+                         f"{sum(len(chunks) for chunks in self.progress.values()) - len(done)} trozos escritos.")
+        else:
+            repository.clear_run_progress()
+
+    @property
+    def enabled(self) -> bool:
+        return self.fingerprint is not None
+
+    def completed_table(self, table_name: str) -> Optional[int]:
+        """
+        Filas de la tabla si se terminó en una ejecución anterior de la misma copia, o None.
+        """
+        with self._lock:
+            return self.progress.get(table_name, {}).get(TABLE_DONE)
+
+    def completed_chunks(self, table_name: str, prefix: str) -> Dict[str, int]:
+        """
+        Trozos terminados de la tabla cuyo identificador empieza por `prefix`: {trozo: filas}.
+        """
+        with self._lock:
+            return {
+                chunk_key: rows for chunk_key, rows in self.progress.get(table_name, {}).items()
+                if chunk_key != TABLE_DONE and chunk_key.startswith(prefix)
+            }
+
+    def record_chunk(self, table_name: str, chunk_key: str, rows: int):
+        if not self.enabled:
+            return
+        self.repository.save_run_progress(self.fingerprint, table_name, chunk_key, rows)
+        with self._lock:
+            self.progress.setdefault(table_name, {})[chunk_key] = rows
+
+    def record_table(self, table_name: str, rows: int):
+        self.record_chunk(table_name, TABLE_DONE, rows)
+
+    def reset_table(self, table_name: str):
+        """
+        Olvida los trozos de la tabla (su trabajo parcial ya no es reutilizable).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if not self.progress.pop(table_name, None):
+                return
+        self.repository.clear_run_progress(self.fingerprint, table_name)
@@ -1,22 +1,105 @@
 # application/sync_sql_to_postgres.py
 
 import logging
+import threading
+import time
 import psycopg2
+from collections import deque
+from contextlib import closing, contextmanager
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
 from sqlalchemy import create_engine
 from sqlalchemy.exc import SQLAlchemyError
+from application.transformations.process_transform import ProcessTransformStage
+from application.transformations.transformation_factory import TransformationFactory, TransformationPlan
+from application.batch_pipeline import BatchPipeline
+from application.batch_size_controller import BatchSizeController
+from application.memory_governor import MemoryGovernor, estimate_frame_bytes
+from application.run_manifest import RunManifest
+from application.table_dependencies import TableDependencies
+from application.table_discovery import plan_tables
+from application.table_partitioning import KeyRange, chunk_key_range, ranges_from_boundaries, split_key_range
+from domain.entities import TableSyncResult
 from infrastructure.config import Config
-from typing import List
-import pandas as pd
+from infrastructure.sql_server_catalog import INTEGER_KEY_TYPES, SQLServerCatalog, compute_schema_hash
+from infrastructure.sync_state_repository import SyncStateRepository
+from infrastructure.schema_translator import SchemaTranslator, build_foreign_key, build_index, build_primary_key
+from infrastructure.postgres_table_manager import PostgresTableManager
+from infrastructure.table_stream import TableStreamReader, quote_sql_server_identifier
+from infrastructure.postgres_copy_loader import LOADERS, replace_rows, upsert_dataframe, write_dataframe
+from typing import Dict, List, Optional, Tuple
 import urllib
 import traceback
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class SyncSQLToPostgres:
-    def __init__(self, sql_server_config, postgres_config, tables: List[str]):
+    def __init__(self, sql_server_config, postgres_config, tables: Optional[List[str]], chunk_size: int = None,
+                 loader: str = None, table_config: Dict[str, dict] = None, max_workers: int = None,
+                 force_full_reload: bool = False, include: List[str] = None, exclude: List[str] = None,
+                 largest_first: bool = None, resume: bool = False):
         self.sql_server_config = sql_server_config
         self.postgres_config = postgres_config
+        # Tablas a sincronizar; con None se descubren en el catálogo y se filtran con
+        # los patrones `include` / `exclude` (p. ej. ['obr*'] / ['*_hist'])
         self.tables = tables
+        self.include = list(Config.SYNC_INCLUDE if include is None else include)
+        self.exclude = list(Config.SYNC_EXCLUDE if exclude is None else exclude)
+        # Reparto de las tablas a los workers de mayor a menor tamaño (LPT)
+        self.largest_first = Config.SYNC_LARGEST_FIRST if largest_first is None else largest_first
+        # Filas por lote: la tabla se lee y se escribe lote a lote para acotar la memoria.
+        # Con SYNC_ADAPTIVE_BATCH (u opción 'adaptive_batch') el tamaño se ajusta por tabla
+        self.chunk_size = chunk_size or Config.SYNC_CHUNK_SIZE
+        # Cargador por defecto (to_sql, copy_text, copy_binary o arrow); se puede sobrescribir por tabla
+        self.loader = loader or Config.SYNC_LOADER
+        # Opciones por tabla, p. ej. {'obr': {'loader': 'copy_binary', 'partitions': 8}} o
+        # {'cli': {'mode': 'incremental', 'watermark_column': 'ide', 'key_columns': ['ide']}} o
+        # {'prv': {'mode': 'checksum', 'checksum_key': 'ide'}} o
+        # {'obr': {'date_columns': {'fecinipre': 'fecha_inicio_prevista'},
+        #          'transformations': [{'column': 'nombre', 'type': 'trim'}]}} o
+        # {'obr': {'columns': ['ide', 'nombre'], 'where': "fecinirea >= ?", 'where_params': [20200101]}} o
+        # {'doc': {'exclude_columns': ['contenido']}}
+        self.table_config = table_config or {}
+        for table_name in [None] + list(self.table_config):
+            table_loader = self.get_table_option(table_name, 'loader', self.loader)
+            if table_loader not in LOADERS:
+                raise ValueError(f"Cargador desconocido '{table_loader}'. Opciones: {', '.join(LOADERS)}")
+        # Fuerza la recarga completa también de las tablas en modo incremental
+        self.force_full_reload = force_full_reload
+        # Reanuda la ejecución anterior de la misma copia de seguridad omitiendo el trabajo terminado
+        self.resume = resume
+        self.run_manifest = RunManifest(None, None)
+        # Tablas que se sincronizan a la vez; cada worker abre sus propias conexiones
+        self.max_workers = max(1, max_workers or Config.SYNC_MAX_WORKERS)
+        self._worker_state = threading.local()
+        self._worker_engines = []
+        self._worker_engines_lock = threading.Lock()
+        # Traductor de esquemas SQL Server -> PostgreSQL, con caché por huella de backup
+        self.schema_translator = SchemaTranslator(Config.SCHEMA_CACHE_DIR)
+        # Planes de transformación por tabla, compilados una vez y aplicados a cada lote
+        self.transformation_factory = TransformationFactory()
+        for table_name in self.table_config:
+            self.get_transformation(table_name)  # Valida la configuración antes de empezar
+            self.validate_source_options(table_name)
+        # Columnas leídas por tabla cuando se excluyen columnas (se consultan una vez al catálogo)
+        self._source_columns: Dict[str, List[str]] = {}
+        # Presupuesto de memoria común para los lotes en vuelo de todas las tablas
+        self.memory_governor = MemoryGovernor(Config.SYNC_MEMORY_BUDGET_MB * 1024 * 1024)
+        # Controladores del tamaño de lote de las tablas en curso
+        self.batch_controllers: Dict[str, BatchSizeController] = {}
+        self._batch_controllers_lock = threading.Lock()
+        # Pool de procesos para transformaciones pesadas, creado una vez por ejecución
+        self.transform_processes = Config.SYNC_TRANSFORM_PROCESSES
+        self._process_pool = None
+        self._process_pool_lock = threading.Lock()
+        # Métricas adicionales por tabla (trozos omitidos, bytes ahorrados...) para el resumen
+        self.table_stats: Dict[str, dict] = {}
+        self._table_stats_lock = threading.Lock()
+
+    def get_table_option(self, table_name: str, option: str, default=None):
+        """
+        Devuelve una opción de `table_config` para la tabla o el valor por defecto.
+        """
+        return self.table_config.get(table_name, {}).get(option, default)
 
     def create_postgres_database_if_not_exists(self):
         """
@@ -55,8 +138,10 @@ class SyncSQLToPostgres:
             f"postgresql://{self.postgres_config['user']}:{self.postgres_config['password']}@"
             f"{self.postgres_config['host']}:{self.postgres_config['port']}/{self.postgres_config['dbname']}"
         )
+        # Ajustes de sesión orientados a la carga (p. ej. synchronous_commit=off)
+        connect_args = {'options': Config.SYNC_PG_SESSION_OPTIONS} if Config.SYNC_PG_SESSION_OPTIONS else {}
         try:
-            pg_engine = create_engine(connection_string)
+            pg_engine = create_engine(connection_string, connect_args=connect_args)
             logging.info("Motor de conexión a PostgreSQL creado exitosamente.")
             return pg_engine
         except SQLAlchemyError as e:
@@ -83,56 +168,1057 @@ class SyncSQLToPostgres:
             logging.error(f"Error al crear el motor de SQL Server: {e}")
             raise
 
+    def uses_catalog_schema(self, table_name: str) -> bool:
+        return self.get_table_option(table_name, 'schema', Config.SYNC_SCHEMA_SOURCE) == 'catalog'
+
+    def get_key_options(self, table_name: str) -> List[str]:
+        """
+        Columnas de origen que usa la tabla como clave (marca de agua, upsert,
+        particiones o checksums) y que por tanto no pueden quedar fuera de la lectura.
+        """
+        keys = []
+        mode = self.get_table_option(table_name, 'mode', 'full')
+        if mode == 'incremental':
+            watermark_column = self.get_table_option(table_name, 'watermark_column')
+            keys += [watermark_column] + list(self.get_table_option(table_name, 'key_columns', [watermark_column]))
+        if mode == 'checksum':
+            keys.append(self.get_table_option(
+                table_name, 'checksum_key', self.get_table_option(table_name, 'partition_key', Config.SYNC_PARTITION_KEY)
+            ))
+        if int(self.get_table_option(table_name, 'partitions', 1)) > 1:
+            keys.append(self.get_table_option(table_name, 'partition_key', Config.SYNC_PARTITION_KEY))
+        return [key for key in keys if key]
+
+    def validate_source_options(self, table_name: str):
+        """
+        Comprueba que la proyección de columnas ('columns' o 'exclude_columns')
+        conserva las columnas clave de la tabla.
+        """
+        columns = self.get_table_option(table_name, 'columns')
+        excluded = self.get_table_option(table_name, 'exclude_columns')
+        if columns and excluded:
+            raise ValueError(f"La tabla '{table_name}' no admite 'columns' y 'exclude_columns' a la vez.")
+        keys = {key.lower() for key in self.get_key_options(table_name)}
+        if columns:
+            missing = keys - {column.lower() for column in columns}
+        else:
+            missing = keys & {column.lower() for column in excluded or []}
+        if missing:
+            raise ValueError(f"La tabla '{table_name}' necesita leer sus columnas clave: {', '.join(sorted(missing))}")
+
+    def get_source_columns(self, sql_engine, table_name: str) -> Optional[List[str]]:
+        """
+        Columnas que se leen de SQL Server: las de 'columns', todas menos las de
+        'exclude_columns' (p. ej. LOB que nadie usa) o None para leer todas.
+        """
+        columns = self.get_table_option(table_name, 'columns')
+        if columns:
+            return list(columns)
+        excluded = {column.lower() for column in self.get_table_option(table_name, 'exclude_columns') or []}
+        if not excluded:
+            return None
+        if table_name not in self._source_columns:
+            self._source_columns[table_name] = [
+                column[0] for column in SQLServerCatalog(sql_engine).get_columns(table_name)
+                if column[0].lower() not in excluded
+            ]
+        return self._source_columns[table_name]
+
+    def source_filter(self, table_name: str, where: str = None, params: tuple = ()) -> Tuple[Optional[str], tuple]:
+        """
+        Combina el filtro de filas de la tabla ('where' en T-SQL con 'where_params'
+        posicionales) con el filtro de la lectura concreta (partición, trozo o marca de agua).
+        """
+        table_where = self.get_table_option(table_name, 'where')
+        if not table_where:
+            return where, tuple(params)
+        table_params = tuple(self.get_table_option(table_name, 'where_params', ()))
+        if not where:
+            return table_where, table_params
+        return f"({table_where}) AND ({where})", table_params + tuple(params)
+
+    def get_source_hash(self, catalog: SQLServerCatalog, table_name: str) -> str:
+        """
+        Huella del esquema de origen más la proyección y el filtro configurados: si
+        cambian, las tablas incrementales o con checksums se recargan enteras.
+        """
+        schema_hash = catalog.get_schema_hash(table_name)
+        columns = self.get_table_option(table_name, 'columns') or self.get_table_option(table_name, 'exclude_columns')
+        where = self.get_table_option(table_name, 'where')
+        if not columns and not where:
+            return schema_hash
+        return compute_schema_hash([
+            (schema_hash,), tuple(columns or ()), (where, *self.get_table_option(table_name, 'where_params', ()))
+        ])
+
+    def reads_columns(self, sql_engine, table_name: str, columns: List[str]) -> bool:
+        """
+        Indica si todas las columnas se leen de SQL Server con la proyección de la tabla.
+        """
+        selected = self.get_source_columns(sql_engine, table_name)
+        return selected is None or {c.lower() for c in columns} <= {c.lower() for c in selected}
+
+    def select_columns(self, sql_engine, table_name: str, columns: List[dict]) -> List[dict]:
+        """
+        Filtra las columnas traducidas del catálogo a las que se leen de SQL Server.
+        """
+        selected = self.get_source_columns(sql_engine, table_name)
+        if selected is None:
+            return columns
+        selected = {column.lower() for column in selected}
+        return [column for column in columns if column['name'].lower() in selected]
+
+    def get_transformation(self, table_name: str) -> TransformationPlan:
+        """
+        Plan de transformaciones de la tabla entre la extracción y la carga: columnas
+        de fecha yyyymmdd ('date_columns') y pasos de 'transformations'. Las columnas
+        de 'columns', si se proyectan, se validan contra los renombrados al compilarlo.
+        """
+        return self.transformation_factory.get_plan(
+            table_name,
+            self.get_table_option(table_name, 'date_columns'),
+            self.get_table_option(table_name, 'transformations', []),
+            self.get_table_option(table_name, 'columns') or ()
+        )
+
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Devuelve el pool de procesos de transformación, compartido por todas las
+        tablas para pagar el arranque de los procesos una sola vez.
+        """
+        with self._process_pool_lock:
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.transform_processes)
+                logging.info(f"Pool de {self.transform_processes} procesos de transformación creado.")
+            return self._process_pool
+
+    def shutdown_process_pool(self):
+        with self._process_pool_lock:
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=True, cancel_futures=True)
+                self._process_pool = None
+
+    def get_transform_stages(self, table_name: str) -> list:
+        """
+        Etapas de transformación del pipeline: ninguna si el plan está vacío, el plan en
+        un hilo o, con SYNC_TRANSFORM_PROCESSES > 0 (opción 'transform_processes'),
+        envío al pool de procesos y recogida del resultado como dos etapas separadas.
+        """
+        plan = self.get_transformation(table_name)
+        if not plan.steps:
+            return []
+        if not self.transform_processes or not self.get_table_option(table_name, 'transform_processes', True):
+            return [plan.apply]
+        stage = ProcessTransformStage(
+            self.get_process_pool(), plan,
+            self.get_table_option(table_name, 'date_columns'),
+            self.get_table_option(table_name, 'transformations', [])
+        )
+        return [stage.submit, stage.collect]
+
+    def estimate_row_bytes(self, sql_engine, table_name: str, loader: str) -> float:
+        """
+        Memoria estimada por fila: tamaño medio de fila en SQL Server más el coste de pandas/Arrow.
+        """
+        return SQLServerCatalog(sql_engine).get_average_row_bytes(table_name) * (2 if loader == 'arrow' else 4)
+
+    def start_batch_controller(self, sql_engine, pg_engine, table_name: str, loader: str):
+        """
+        Crea el controlador del tamaño de lote de la tabla. Empieza por el tamaño
+        guardado en la ejecución anterior o, la primera vez, por las filas que caben
+        en SYNC_BATCH_TARGET_MB según el ancho de fila del catálogo.
+        """
+        if not self.get_table_option(table_name, 'adaptive_batch', Config.SYNC_ADAPTIVE_BATCH):
+            return None
+        initial_rows = SyncStateRepository(pg_engine).get_batch_size(table_name)
+        origin = 'ejecución anterior'
+        if initial_rows is None:
+            row_bytes = self.estimate_row_bytes(sql_engine, table_name, loader)
+            initial_rows = Config.SYNC_BATCH_TARGET_MB * 1024 * 1024 / row_bytes if row_bytes else self.chunk_size
+            origin = 'ancho de fila'
+        controller = BatchSizeController(initial_rows, Config.SYNC_BATCH_MIN_ROWS, Config.SYNC_BATCH_MAX_ROWS)
+        logging.debug(f"Tabla '{table_name}': lotes iniciales de {controller.rows} filas ({origin}).")
+        with self._batch_controllers_lock:
+            self.batch_controllers[table_name] = controller
+        return controller
+
+    def finish_batch_controller(self, pg_engine, table_name: str):
+        """
+        Guarda el mejor tamaño de lote medido para que la próxima ejecución empiece por él.
+        """
+        with self._batch_controllers_lock:
+            controller = self.batch_controllers.pop(table_name, None)
+        if controller is None or controller.chosen_rows is None:
+            return None
+        SyncStateRepository(pg_engine).save_batch_size(
+            table_name, controller.chosen_rows, controller.best_throughput, controller.row_bytes
+        )
+        logging.info(f"Tabla '{table_name}': lotes de {controller.chosen_rows} filas "
+                     f"({controller.best_throughput:.0f} filas/s, "
+                     f"~{controller.chosen_rows * controller.row_bytes / 1024 / 1024:.1f} MB por lote).")
+        return controller.chosen_rows
+
+    def extract_frames(self, sql_engine, table_name: str, loader: str, where: str = None, params: tuple = (),
+                       sizes: deque = None, cancel: threading.Event = None):
+        """
+        Lee la tabla (o las filas que cumplan `where`) por lotes en el formato del cargador,
+        con la proyección de columnas y el filtro de filas configurados para la tabla.
+        Cada lote reserva su memoria estimada en el gobernador antes de leerse y el
+        tamaño de lote (fijo o el del controlador de la tabla) se reduce si no caben
+        en el presupuesto los lotes simultáneos previstos. Los bytes de cada lote se
+        añaden en orden a `sizes` para liberarlos cuando se escriban. Si se activa
+        `cancel` mientras espera memoria, la lectura termina con MemoryWaitCancelled.
+        """
+        row_bytes = self.estimate_row_bytes(sql_engine, table_name, loader)
+        controller = self.batch_controllers.get(table_name)
+        columns = self.get_source_columns(sql_engine, table_name)
+        where, params = self.source_filter(table_name, where, params)
+        slots = self.max_workers * self.batches_in_flight(table_name)
+        with TableStreamReader(sql_engine, table_name, columns=columns, where=where, params=params) as reader:
+            while True:
+                if controller is None:
+                    rows = self.memory_governor.batch_rows(self.chunk_size, row_bytes, slots)
+                else:
+                    rows = controller.next_rows(
+                        self.memory_governor.batch_rows(controller.max_rows, row_bytes, slots)
+                    )
+                reserved = int(rows * row_bytes)
+                self.memory_governor.acquire(table_name, reserved, cancel)
+                try:
+                    frame = reader.fetch_frame(rows, loader)
+                except BaseException:
+                    self.memory_governor.release(table_name, reserved)
+                    raise
+                if frame is None:
+                    self.memory_governor.release(table_name, reserved)
+                    return
+                actual = estimate_frame_bytes(frame)
+                self.memory_governor.adjust(table_name, reserved, actual)
+                row_bytes = actual / len(frame)
+                if sizes is not None:
+                    sizes.append(actual)
+                yield frame
+
+    def batches_in_flight(self, table_name: str) -> int:
+        """
+        Lotes de la tabla que pueden estar en memoria a la vez: por cada lectura, el
+        que se lee, el que se escribe y, con pipeline, los de cada cola y cada etapa;
+        con particiones, por cada partición que se copia en paralelo.
+        """
+        per_reader = 2
+        if self.get_table_option(table_name, 'pipeline', Config.SYNC_PIPELINE):
+            stages = len(self.get_transform_stages(table_name))
+            queue_size = int(self.get_table_option(table_name, 'pipeline_queue_size', Config.SYNC_PIPELINE_QUEUE_SIZE))
+            per_reader += queue_size * (stages + 1) + stages
+        readers = 1
+        if int(self.get_table_option(table_name, 'partitions', 1)) > 1:
+            readers = max(1, int(self.get_table_option(table_name, 'partition_workers', Config.SYNC_PARTITION_WORKERS)))
+        return readers * per_reader
+
+    def release_written(self, table_name: str, batches, sizes: deque):
+        """
+        Devuelve los lotes y libera la memoria de cada uno cuando se pide el siguiente,
+        es decir, cuando ya se ha escrito en PostgreSQL. El tiempo entre dos lotes
+        escritos (el ritmo de la etapa más lenta) se pasa al controlador del tamaño
+        de lote; el primero se descarta porque incluye el arranque de la consulta.
+        """
+        controller = self.batch_controllers.get(table_name)
+        previous = None
+        for batch in batches:
+            yield batch
+            nbytes = sizes.popleft()
+            self.memory_governor.release(table_name, nbytes)
+            now = time.perf_counter()
+            if controller is not None and previous is not None:
+                controller.record(len(batch), now - previous, nbytes)
+            previous = now
+
+    @contextmanager
+    def read_frames(self, sql_engine, table_name: str, loader: str, where: str = None, params: tuple = ()):
+        """
+        Devuelve los lotes de la tabla ya transformados. Con 'pipeline' activo, la
+        lectura y la transformación corren en sus propios hilos con colas acotadas
+        de SYNC_PIPELINE_QUEUE_SIZE lotes, mientras quien itera escribe en PostgreSQL.
+        """
+        sizes = deque()
+        # Se activa al cortar el pipeline: la lectura no debe quedarse esperando memoria
+        # retenida por lotes de las colas mientras se espera a que terminen sus hilos
+        stop = threading.Event()
+        frames = self.extract_frames(sql_engine, table_name, loader, where, params, sizes, stop)
+        stages = self.get_transform_stages(table_name)
+        try:
+            if not self.get_table_option(table_name, 'pipeline', Config.SYNC_PIPELINE):
+                with closing(frames):
+                    batches = frames
+                    for stage in stages:
+                        batches = map(stage, batches)
+                    yield self.release_written(table_name, batches, sizes)
+                return
+
+            pipeline = BatchPipeline(
+                int(self.get_table_option(table_name, 'pipeline_queue_size', Config.SYNC_PIPELINE_QUEUE_SIZE)),
+                name=table_name
+            )
+            batches = pipeline.iterate(frames, stages, stop)
+            with closing(batches):
+                yield self.release_written(table_name, batches, sizes)
+            log = logging.info if where is None else logging.debug
+            log(f"Tabla '{table_name}': la lectura esperó {pipeline.waits['extract']:.1f} s a la carga "
+                f"y la carga {pipeline.waits['load']:.1f} s a la lectura.")
+        finally:
+            # Lotes leídos que no llegaron a escribirse (error o corte)
+            while sizes:
+                self.memory_governor.release(table_name, sizes.popleft())
+
+    def create_target_table(self, sql_engine, pg_engine, table_name: str, target_table_name: str, sample=None):
+        """
+        Crea la tabla destino vacía (UNLOGGED). Con esquema 'catalog' los tipos salen del
+        catálogo de SQL Server, ajustados a las transformaciones; con 'pandas', de los
+        tipos deducidos de `sample` ya transformado.
+        """
+        tables = PostgresTableManager(pg_engine)
+        if self.uses_catalog_schema(table_name):
+            schema = self.schema_translator.get_table_schema(SQLServerCatalog(sql_engine), table_name)
+            columns = self.select_columns(sql_engine, table_name, schema['columns'])
+            tables.create_table_from_schema(
+                target_table_name, self.get_transformation(table_name).output_columns(columns)
+            )
+        else:
+            tables.create_table_from_frame(target_table_name, sample)
+
+    def copy_rows(self, sql_engine, pg_engine, table_name: str, target_table_name: str, loader: str,
+                  create_target: bool = False, where: str = None, params: tuple = (),
+                  key_columns: List[str] = None) -> int:
+        """
+        Copia por lotes las filas de la tabla (o las que cumplan `where`) a la tabla
+        destino. Con `create_target`, se crea antes la tabla destino (UNLOGGED); con
+        `key_columns`, los lotes se aplican como upsert sobre esa clave.
+        Devuelve el número de filas copiadas.
+        """
+        create_from_catalog = create_target and self.uses_catalog_schema(table_name)
+        # Los lotes llegan ya transformados: la clave del upsert usa los nombres de columna de destino
+        rename = self.get_transformation(table_name).output_name
+        target_keys = [rename(column) for column in key_columns or ()]
+        if create_from_catalog:
+            self.create_target_table(sql_engine, pg_engine, table_name, target_table_name)
+        total_rows = 0
+        with self.read_frames(sql_engine, table_name, loader, where, params) as frames:
+            for chunk in frames:
+                if total_rows == 0:
+                    logging.debug(f"Tipos de datos antes de la sincronización:\n"
+                                  f"{chunk.schema if loader == 'arrow' else chunk.dtypes}")
+                    if create_target and not create_from_catalog:
+                        sample = chunk.to_pandas() if loader == 'arrow' else chunk
+                        self.create_target_table(sql_engine, pg_engine, table_name, target_table_name, sample)
+                if key_columns:
+                    upsert_dataframe(pg_engine, chunk, target_table_name, target_keys, loader)
+                else:
+                    write_dataframe(pg_engine, chunk, target_table_name, loader, replace=False)
+                total_rows += len(chunk)
+                logging.debug(f"Tabla '{table_name}': {total_rows} registros transferidos.")
+        return total_rows
+
+    def build_partitions(self, catalog: SQLServerCatalog, table_name: str, key: str,
+                         partitions: int, method: str) -> List[KeyRange]:
+        """
+        Calcula los rangos de clave de una tabla: 'range' reparte [MIN, MAX] en tramos
+        de igual anchura y 'ntile' usa cortes NTILE con un número de filas parecido.
+        Siempre se añade la partición de claves NULL.
+        """
+        if method == 'ntile':
+            ranges = ranges_from_boundaries(catalog.get_ntile_boundaries(table_name, key, partitions))
+        elif method == 'range':
+            min_value, max_value = catalog.get_key_range(table_name, key)
+            if min_value is None:
+                ranges = []
+            elif not isinstance(min_value, int) or not isinstance(max_value, int):
+                raise ValueError(
+                    f"La clave '{key}' de '{table_name}' no es entera; usa partition_method='ntile'."
+                )
+            else:
+                ranges = split_key_range(min_value, max_value, partitions)
+        else:
+            raise ValueError(f"Método de partición desconocido: {method}")
+        return ranges + [KeyRange(nulls=True)]
+
+    def process_partitioned_table(self, sql_engine, pg_engine, table_name: str,
+                                  target_table_name: str, loader: str, partitions: int) -> int:
+        """
+        Divide la tabla en rangos de la clave de partición y los copia en paralelo
+        sobre la misma tabla destino. Al terminar comprueba que el número de filas
+        en PostgreSQL coincide con el de SQL Server.
+        """
+        key = self.get_table_option(table_name, 'partition_key', Config.SYNC_PARTITION_KEY)
+        method = self.get_table_option(table_name, 'partition_method', 'range')
+        catalog = SQLServerCatalog(sql_engine)
+        ranges = self.build_partitions(catalog, table_name, key, partitions, method)
+        tables = PostgresTableManager(pg_engine)
+
+        # Particiones ya escritas en la tabla destino por una ejecución interrumpida de la misma copia
+        prefix = f"partition:{method}:{partitions}:"
+        completed = self.run_manifest.completed_chunks(table_name, prefix)
+        if completed and set(completed) <= {prefix + r.label for r in ranges} \
+                and tables.table_exists(target_table_name):
+            logging.info(f"Tabla '{table_name}': se reanuda con {len(completed)} de {len(ranges)} "
+                         f"particiones ya copiadas.")
+            tables.drop_indexes(target_table_name)
+            ranges = [r for r in ranges if prefix + r.label not in completed]
+            target_key = self.get_transformation(table_name).output_name(key)
+            for key_range in ranges:
+                # Filas que dejó a medias la partición interrumpida
+                where, params = key_range.to_where(target_key, dialect='postgresql')
+                replace_rows(pg_engine, [], target_table_name, where, params)
+        else:
+            completed = {}
+            self.run_manifest.reset_table(table_name)
+            # La tabla destino se crea vacía antes de lanzar las particiones (con 'pandas', a partir de una muestra)
+            sample = None
+            if not self.uses_catalog_schema(table_name):
+                where, params = self.source_filter(table_name)
+                with TableStreamReader(sql_engine, table_name, columns=self.get_source_columns(sql_engine, table_name),
+                                       where=where, params=params, limit=1000) as reader:
+                    sample = reader.fetch(1000)
+                if sample is None:
+                    return 0
+                sample = self.get_transformation(table_name).apply(sample)
+            self.create_target_table(sql_engine, pg_engine, table_name, target_table_name, sample)
+
+        workers = max(1, min(len(ranges), int(self.get_table_option(
+            table_name, 'partition_workers', Config.SYNC_PARTITION_WORKERS))))
+        logging.info(f"Tabla '{table_name}': {len(ranges)} particiones por '{key}' ({method}), "
+                     f"{workers} en paralelo.")
+        total_rows = sum(completed.values())
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'{table_name}-part') as pool:
+            futures = {}
+            for key_range in ranges:
+                where, params = key_range.to_where(key)
+                future = pool.submit(self.copy_rows, sql_engine, pg_engine, table_name,
+                                     target_table_name, loader, where=where, params=params)
+                futures[future] = key_range
+            try:
+                for future in as_completed(futures):
+                    rows = future.result()
+                    total_rows += rows
+                    key_range = futures.pop(future)
+                    self.run_manifest.record_chunk(table_name, prefix + key_range.label, rows)
+                    logging.info(f"Tabla '{table_name}', partición {key_range.label}: {rows} registros.")
+            except Exception:
+                pool.shutdown(wait=True, cancel_futures=True)
+                # Las particiones que sí terminaron quedan registradas para reanudar
+                for future, key_range in futures.items():
+                    if future.done() and not future.cancelled() and future.exception() is None:
+                        self.run_manifest.record_chunk(table_name, prefix + key_range.label, future.result())
+                raise
+
+        source_rows = catalog.count_rows(table_name, *self.source_filter(table_name))
+        target_rows = tables.count_rows(target_table_name)
+        if source_rows != target_rows:
+            raise RuntimeError(
+                f"Recuento distinto en '{table_name}': {source_rows} en SQL Server y "
+                f"{target_rows} en PostgreSQL."
+            )
+        logging.info(f"Recuento verificado para '{table_name}': {target_rows} registros.")
+        return total_rows
+
+    def build_target_indexes(self, sql_engine, pg_engine, table_name: str, target_table_name: str,
+                             key_columns: List[str] = None):
+        """
+        Recrea en la tabla cargada la clave primaria y los índices de la tabla de origen
+        (sys.indexes), más el índice único del upsert si la tabla es incremental.
+        """
+        primary_key_statement, index_statements = None, []
+        # Los índices se crean sobre los nombres de columna de destino
+        rename = self.get_transformation(table_name).output_name
+        if self.uses_catalog_schema(table_name):
+            schema = self.schema_translator.get_table_schema(SQLServerCatalog(sql_engine), table_name)
+            selected = {c['name'].lower() for c in self.select_columns(sql_engine, table_name, schema['columns'])}
+
+            def projected(columns: List[str], what: str) -> bool:
+                missing = [column for column in columns if column.lower() not in selected]
+                if missing:
+                    logging.warning(f"Tabla '{table_name}': {what} omitido, usa columnas no leídas "
+                                    f"({', '.join(missing)}).")
+                return not missing
+
+            if schema['primary_key'] and projected(schema['primary_key'], "clave primaria"):
+                primary_key_statement = build_primary_key(
+                    target_table_name, [rename(column) for column in schema['primary_key']]
+                )
+            index_statements = [
+                build_index(target_table_name, {
+                    **index,
+                    'columns': [(rename(column), descending) for column, descending in index['columns']],
+                    'include': [rename(column) for column in index['include']],
+                })
+                for index in schema['indexes']
+                if projected([column for column, _ in index['columns']] + index['include'],
+                             f"índice '{index['name']}'")
+            ]
+        if key_columns and (not primary_key_statement or schema['primary_key'] != list(key_columns)):
+            index_statements.append(PostgresTableManager.unique_key_index_statement(
+                target_table_name, [rename(column) for column in key_columns]
+            ))
+        PostgresTableManager(pg_engine).build_indexes(
+            target_table_name, primary_key_statement, index_statements,
+            workers=int(self.get_table_option(table_name, 'index_workers', Config.SYNC_INDEX_WORKERS)),
+            maintenance_work_mem=self.get_table_option(
+                table_name, 'maintenance_work_mem', Config.SYNC_MAINTENANCE_WORK_MEM)
+        )
+
+    def load_full_table(self, sql_engine, pg_engine, table_name: str, target_table_name: str, loader: str,
+                        key_columns: List[str] = None) -> int:
+        """
+        Recarga completa sin cortes de servicio: los datos se cargan en una tabla de
+        staging UNLOGGED (por particiones si la tabla las tiene configuradas), después
+        se construyen los índices y por último la staging sustituye a la tabla publicada
+        con un RENAME en una sola transacción. Los lectores nunca ven la tabla vacía
+        ni a medio cargar.
+        """
+        tables = PostgresTableManager(pg_engine)
+        staging_table = tables.staging_name(target_table_name)
+        partitions = int(self.get_table_option(table_name, 'partitions', 1))
+        try:
+            if partitions > 1:
+                rows = self.process_partitioned_table(
+                    sql_engine, pg_engine, table_name, staging_table, loader, partitions
+                )
+            else:
+                rows = self.copy_rows(sql_engine, pg_engine, table_name, staging_table, loader, create_target=True)
+            if rows == 0:
+                tables.drop_table(staging_table)
+                return 0
+
+            # Índices después de los datos: construirlos de una vez es más rápido que mantenerlos fila a fila
+            self.build_target_indexes(sql_engine, pg_engine, table_name, staging_table, key_columns)
+            tables.analyze(staging_table)
+            if Config.SYNC_STAGING_SET_LOGGED:
+                tables.set_logged(staging_table)
+            else:
+                logging.warning(f"Tabla '{table_name}': se publica UNLOGGED (SYNC_STAGING_SET_LOGGED=false); "
+                                f"se vaciará si PostgreSQL se cae.")
+            tables.swap_tables(staging_table, target_table_name)
+            return rows
+        except Exception:
+            if partitions > 1 and self.run_manifest.enabled:
+                # Las particiones copiadas quedan en staging para reanudar con --resume
+                logging.info(f"Tabla '{table_name}': se conserva '{staging_table}' para reanudar.")
+            else:
+                tables.drop_table(staging_table)
+            raise
+
+    def target_reload_reason(self, tables: PostgresTableManager, target_table_name: str,
+                             stored_rows: Optional[int]) -> Optional[str]:
+        """
+        Motivo para recargar entera una tabla destino que ya no conserva la última
+        carga, o None: sigue UNLOGGED (PostgreSQL la vacía tras una caída) o su
+        número de filas no coincide con el que dejó la última carga.
+        """
+        if Config.SYNC_STAGING_SET_LOGGED and tables.is_unlogged(target_table_name):
+            return "la tabla destino es UNLOGGED y puede haberse vaciado tras una caída"
+        if stored_rows is not None:
+            target_rows = tables.count_rows(target_table_name)
+            if target_rows != stored_rows:
+                return f"la tabla destino tiene {target_rows} filas y la última carga dejó {stored_rows}"
+        return None
+
+    def forget_target_state(self, state_repository: SyncStateRepository, table_name: str, reason: str):
+        """
+        Descarta la marca de agua y los checksums de una tabla destino que no los refleja.
+        """
+        logging.warning(f"Tabla '{table_name}': {reason}; se descartan la marca de agua y los checksums.")
+        state_repository.clear_state(table_name)
+        state_repository.clear_checksums(table_name)
+
+    def process_incremental_table(self, sql_engine, pg_engine, table_name: str,
+                                  target_table_name: str, loader: str) -> int:
+        """
+        Sincronización incremental: solo se extraen las filas posteriores a la marca de
+        agua guardada en `etl_sync_state` y se aplican como upsert sobre `key_columns`.
+        La recarga completa solo ocurre la primera vez, si cambia el esquema de origen,
+        si falta la tabla destino o no conserva la última carga, o si se fuerza.
+        """
+        watermark_column = self.get_table_option(table_name, 'watermark_column')
+        if not watermark_column:
+            raise ValueError(f"La tabla '{table_name}' está en modo incremental sin 'watermark_column'.")
+        key_columns = list(self.get_table_option(table_name, 'key_columns', [watermark_column]))
+
+        catalog = SQLServerCatalog(sql_engine)
+        state_repository = SyncStateRepository(pg_engine)
+        tables = PostgresTableManager(pg_engine)
+        schema_hash = self.get_source_hash(catalog, table_name)
+        state = state_repository.get_state(table_name)
+        # La marca nueva se toma antes de extraer: lo que llegue después entra en la próxima ejecución
+        new_watermark = catalog.get_max_value(table_name, watermark_column, *self.source_filter(table_name))
+
+        reason = None
+        if self.force_full_reload or self.get_table_option(table_name, 'force_full', False):
+            reason = "recarga forzada"
+        elif state is None:
+            reason = "sin marca de agua previa"
+        elif state['schema_hash'] != schema_hash or state['watermark_column'] != watermark_column:
+            reason = "el esquema de origen, las columnas o el filtro han cambiado"
+        elif not tables.table_exists(target_table_name):
+            reason = "no existe la tabla destino"
+        else:
+            reason = self.target_reload_reason(tables, target_table_name, state.get('row_count'))
+            if reason:
+                self.forget_target_state(state_repository, table_name, reason)
+
+        if reason:
+            logging.info(f"Tabla '{table_name}': recarga completa ({reason}).")
+            rows = self.load_full_table(sql_engine, pg_engine, table_name, target_table_name, loader,
+                                        key_columns=key_columns)
+            state_repository.save_state(table_name, watermark_column, new_watermark, schema_hash,
+                                        row_count=rows or None)
+            return rows
+
+        watermark = state['watermark']
+        if new_watermark is None or (watermark is not None and new_watermark <= watermark):
+            logging.info(f"Tabla '{table_name}': sin filas nuevas desde {watermark_column} = {watermark}.")
+            return 0
+
+        column = quote_sql_server_identifier(watermark_column)
+        if watermark is None:
+            where, params = f"{column} IS NOT NULL", ()
+        else:
+            # Solo si la marca es por sí sola la clave no se repite: si no (o si la clave es
+            # compuesta) se relee el último valor y el upsert absorbe las filas ya copiadas
+            operator = '>' if key_columns == [watermark_column] else '>='
+            where, params = f"{column} {operator} ?", (watermark,)
+        logging.info(f"Tabla '{table_name}': extrayendo filas con {watermark_column} posterior a {watermark}...")
+        rows = self.copy_rows(sql_engine, pg_engine, table_name, target_table_name, loader,
+                              where=where, params=params, key_columns=key_columns)
+        row_count = state.get('row_count')
+        if rows:
+            tables.analyze(target_table_name)
+            row_count = tables.count_rows(target_table_name)
+        state_repository.save_state(table_name, watermark_column, new_watermark, schema_hash, row_count=row_count)
+        return rows
+
+    def record_table_stats(self, table_name: str, **stats):
+        """
+        Guarda métricas de la tabla para el resumen de la ejecución.
+        """
+        with self._table_stats_lock:
+            self.table_stats.setdefault(table_name, {}).update(stats)
+
+    def validate_checksum_key(self, catalog: SQLServerCatalog, table_name: str, key: str):
+        """
+        Comprueba en el catálogo que la clave de los checksums es entera: los trozos
+        son la división entera de la clave por su ancho.
+        """
+        key_type = next((column[1] for column in catalog.get_columns(table_name)
+                         if column[0].lower() == str(key).lower()), None)
+        if key_type is None:
+            raise ValueError(f"La tabla '{table_name}' no tiene la columna clave de checksums '{key}'.")
+        if key_type.lower() not in INTEGER_KEY_TYPES:
+            raise ValueError(
+                f"La clave de checksums '{key}' de '{table_name}' es {key_type}; debe ser entera "
+                f"({', '.join(INTEGER_KEY_TYPES)})."
+            )
+
+    def process_checksum_table(self, sql_engine, pg_engine, table_name: str,
+                               target_table_name: str, loader: str) -> int:
+        """
+        Detección de cambios por checksums: se compara el checksum de la tabla y, si
+        difiere, el de cada trozo de clave (clave / ancho) con los guardados en la
+        última carga correcta. Solo se vuelven a copiar los trozos distintos. Las
+        columnas text, ntext, image y xml, que BINARY_CHECKSUM ignora, entran por su
+        HASHBYTES o, con checksum_lob = 'full', la tabla se recarga entera.
+        """
+        key = self.get_table_option(
+            table_name, 'checksum_key', self.get_table_option(table_name, 'partition_key', Config.SYNC_PARTITION_KEY)
+        )
+        width = int(self.get_table_option(table_name, 'checksum_chunk_width', Config.SYNC_CHECKSUM_CHUNK_WIDTH))
+        catalog = SQLServerCatalog(sql_engine)
+        self.validate_checksum_key(catalog, table_name, key)
+        state_repository = SyncStateRepository(pg_engine)
+        schema_hash = self.get_source_hash(catalog, table_name)
+        stored_schema_hash, stored = state_repository.get_checksums(table_name)
+        columns = self.get_source_columns(sql_engine, table_name)
+        where, params = self.source_filter(table_name)
+
+        lob_columns = catalog.get_lob_columns(table_name, columns)
+        if lob_columns:
+            if self.get_table_option(table_name, 'checksum_lob', Config.SYNC_CHECKSUM_LOB) == 'full':
+                logging.info(f"Tabla '{table_name}': columnas LOB sin checksum ({', '.join(lob_columns)}); "
+                             f"recarga completa.")
+                state_repository.clear_checksums(table_name)
+                return self.load_full_table(sql_engine, pg_engine, table_name, target_table_name, loader)
+            logging.info(f"Tabla '{table_name}': checksums con HASHBYTES('SHA2_256') para las columnas LOB "
+                         f"({', '.join(lob_columns)}).")
+            columns = columns or [column[0] for column in catalog.get_columns(table_name)]
+        else:
+            logging.debug(f"Tabla '{table_name}': checksums con BINARY_CHECKSUM.")
+
+        tables = PostgresTableManager(pg_engine)
+        full_reload = (
+            self.force_full_reload or self.get_table_option(table_name, 'force_full', False)
+            or not stored or stored_schema_hash != schema_hash
+            or not tables.table_exists(target_table_name)
+        )
+        if not full_reload:
+            # Filas de origen en la última carga correcta, las mismas que debe tener la tabla destino
+            reason = self.target_reload_reason(tables, target_table_name, stored['*'][0] if '*' in stored else None)
+            if reason:
+                self.forget_target_state(state_repository, table_name, reason)
+                full_reload = True
+        table_checksum = catalog.get_table_checksum(table_name, columns, where, params, lob_columns)
+        if not full_reload and stored.get('*') == table_checksum:
+            skipped = len(stored) - 1
+            bytes_saved = int(table_checksum[0] * catalog.get_average_row_bytes(table_name))
+            self.record_table_stats(table_name, skipped_chunks=skipped, bytes_saved=bytes_saved)
+            logging.info(f"Tabla '{table_name}' sin cambios: {skipped} trozos omitidos "
+                         f"(~{bytes_saved / 1024 / 1024:.1f} MB).")
+            return 0
+
+        chunks = {
+            'NULL' if bucket is None else str(bucket): (bucket, rows, checksum)
+            for bucket, (rows, checksum)
+            in catalog.get_chunk_checksums(table_name, key, width, columns, where, params, lob_columns).items()
+        }
+        current = {chunk_key: (rows, checksum) for chunk_key, (_, rows, checksum) in chunks.items()}
+        current['*'] = table_checksum
+
+        if full_reload:
+            logging.info(f"Tabla '{table_name}': carga completa y registro de {len(chunks)} checksums.")
+            rows = self.load_full_table(sql_engine, pg_engine, table_name, target_table_name, loader)
+            state_repository.save_checksums(table_name, current, schema_hash)
+            return rows
+
+        changed = [chunk_key for chunk_key in chunks if stored.get(chunk_key) != current[chunk_key]]
+        removed = [chunk_key for chunk_key in stored if chunk_key != '*' and chunk_key not in chunks]
+        # Trozos ya reemplazados por una ejecución interrumpida de la misma copia
+        replaced = self.run_manifest.completed_chunks(table_name, 'checksum:')
+        target_key = self.get_transformation(table_name).output_name(key)
+        total_rows = 0
+        for chunk_key in changed + removed:
+            if f"checksum:{chunk_key}" in replaced:
+                total_rows += replaced[f"checksum:{chunk_key}"]
+                continue
+            bucket = None if chunk_key == 'NULL' else int(chunk_key)
+            key_range = chunk_key_range(bucket, width)
+            source_where, source_params = key_range.to_where(key)
+            target_where, target_params = key_range.to_where(target_key, dialect='postgresql')
+            rows = 0
+            if chunk_key in chunks:
+                with self.read_frames(sql_engine, table_name, loader, source_where, source_params) as frames:
+                    rows = replace_rows(pg_engine, frames, target_table_name, target_where, target_params, loader)
+            else:
+                replace_rows(pg_engine, [], target_table_name, target_where, target_params, loader)
+            total_rows += rows
+            self.run_manifest.record_chunk(table_name, f"checksum:{chunk_key}", rows)
+        if changed or removed:
+            tables.analyze(target_table_name)
+
+        skipped_keys = [chunk_key for chunk_key in chunks if chunk_key not in changed]
+        skipped_rows = sum(current[chunk_key][0] for chunk_key in skipped_keys)
+        bytes_saved = int(skipped_rows * catalog.get_average_row_bytes(table_name))
+        self.record_table_stats(table_name, skipped_chunks=len(skipped_keys), bytes_saved=bytes_saved)
+        logging.info(f"Tabla '{table_name}': {len(changed)} trozos modificados, {len(removed)} eliminados y "
+                     f"{len(skipped_keys)} sin cambios (~{bytes_saved / 1024 / 1024:.1f} MB ahorrados).")
+        state_repository.save_checksums(table_name, current, schema_hash)
+        return total_rows
+
     def process_table(self, sql_engine, pg_engine, table_name: str):
         """
-        Lee una tabla completa de SQL Server y la guarda en PostgreSQL sin mapeo de columnas.
+        Copia una tabla de SQL Server a PostgreSQL por lotes, sin mapeo de columnas.
+        Cada lote se escribe antes de leer el siguiente, de modo que el consumo de
+        memoria depende de `chunk_size` y no del tamaño de la tabla. Si la tabla
+        tiene `partitions` > 1 en `table_config`, sus rangos de clave se copian en
+        paralelo; con `mode` = 'incremental' solo se copian las filas nuevas y con
+        `mode` = 'checksum' solo los trozos cuyo checksum ha cambiado.
         """
         logging.info(f"\nProcesando la tabla '{table_name}'...")
 
         try:
-            # Leer toda la tabla de SQL Server
-            df = pd.read_sql_table(table_name, sql_engine)
-            logging.info(f"Tabla '{table_name}' leída desde SQL Server con {len(df)} registros.")
-            logging.debug(f"Tipos de datos antes de la sincronización:\n{df.dtypes}")
+            target_table_name = table_name  # Puedes ajustar esto si deseas renombrar tablas
+            loader = self.get_table_option(table_name, 'loader', self.loader)
+            mode = self.get_table_option(table_name, 'mode', 'full')
+            logging.info(f"Guardando la tabla '{target_table_name}' en PostgreSQL ({loader}, {mode})...")
+            self.start_batch_controller(sql_engine, pg_engine, table_name, loader)
 
-            if df.empty:
-                logging.info(f"La tabla '{table_name}' no tiene datos. No se transferirá.")
-                return
+            if mode == 'incremental':
+                total_rows = self.process_incremental_table(
+                    sql_engine, pg_engine, table_name, target_table_name, loader
+                )
+            elif mode == 'checksum':
+                total_rows = self.process_checksum_table(
+                    sql_engine, pg_engine, table_name, target_table_name, loader
+                )
+            elif mode == 'full':
+                total_rows = self.load_full_table(sql_engine, pg_engine, table_name, target_table_name, loader)
+            else:
+                raise ValueError(f"Modo de sincronización desconocido: {mode}")
 
-            # Guardar el DataFrame en PostgreSQL
-            target_table_name = table_name  # Puedes ajustar esto si deseas renombrar tablas
-            logging.info(f"Guardando la tabla '{target_table_name}' en PostgreSQL...")
-            df.to_sql(target_table_name, pg_engine, if_exists='replace', index=False)
-            logging.info(f"Tabla '{target_table_name}' guardada en PostgreSQL con éxito.")
+            self.finish_batch_controller(pg_engine, table_name)
+            if total_rows == 0:
+                logging.info(f"La tabla '{table_name}' no tiene datos nuevos. No se transferirá.")
+                return 0
+
+            logging.info(f"Tabla '{target_table_name}' guardada en PostgreSQL con éxito ({total_rows} registros).")
+            return total_rows
 
         except Exception as e:
+            with self._batch_controllers_lock:
+                self.batch_controllers.pop(table_name, None)
             logging.error(f"Error al transferir la tabla '{table_name}': {e}")
             logging.error("Detalles del error:")
             traceback_str = ''.join(traceback.format_exception(None, e, e.__traceback__))
             logging.error(traceback_str)
             raise
 
+    def prepare_state(self):
+        """
+        Crea las tablas de estado de la sincronización si no existen.
+        """
+        pg_engine = self.create_postgres_engine()
+        try:
+            SyncStateRepository(pg_engine).ensure_schema()
+        finally:
+            pg_engine.dispose()
+
+    def discover_tables(self) -> List[str]:
+        """
+        Devuelve las tablas a sincronizar en el orden en que se reparten a los
+        workers: las indicadas o, sin lista, las descubiertas en el catálogo que
+        pasan los filtros; de mayor a menor espacio reservado si `largest_first`.
+        """
+        sql_engine = self.create_sql_engine()
+        try:
+            try:
+                available = SQLServerCatalog(sql_engine).get_table_sizes()
+            except Exception as e:
+                if not self.tables:
+                    raise
+                logging.warning(f"No se pudieron leer los tamaños de las tablas ({e}); se mantiene el orden indicado.")
+                return list(self.tables)
+        finally:
+            sql_engine.dispose()
+        tables = plan_tables(available, self.tables, self.include, self.exclude, self.largest_first)
+        if not self.tables:
+            logging.info(f"Tablas descubiertas: {len(tables)} de {len(available)}.")
+        logging.info("Orden de sincronización: " + ", ".join(
+            f"{table.name} ({table.rows} filas, {table.reserved_bytes / 1024 / 1024:.1f} MB)" for table in tables
+        ))
+        return [table.name for table in tables]
+
+    def open_run_manifest(self, pg_engine) -> RunManifest:
+        """
+        Abre el manifiesto de la ejecución para la copia de seguridad restaurada. Sin
+        `resume` se empieza de cero; con él se conserva lo terminado con la misma copia.
+        """
+        sql_engine = self.create_sql_engine()
+        try:
+            fingerprint = SQLServerCatalog(sql_engine).get_backup_fingerprint()
+        except Exception as e:
+            logging.warning(f"No se pudo leer la huella de la copia restaurada ({e}); no habrá reanudación.")
+            fingerprint = None
+        finally:
+            sql_engine.dispose()
+        return RunManifest(SyncStateRepository(pg_engine), fingerprint, self.resume)
+
+    def load_foreign_keys(self, tables: List[str]) -> List[dict]:
+        """
+        Lee las claves foráneas de origen entre las tablas a sincronizar, con los
+        nombres de columna de destino. Solo se tienen en cuenta las tablas con
+        esquema 'catalog', que son las que reciben clave primaria e índices, y las
+        claves cuyas columnas se leen; se omiten las que apuntan a una tabla con
+        filtro de filas, porque sus filas hijas pueden quedar huérfanas.
+        """
+        if not Config.SYNC_FOREIGN_KEYS:
+            return []
+        names = {table for table in tables if self.uses_catalog_schema(table)}
+        sql_engine = self.create_sql_engine()
+        try:
+            foreign_keys = [
+                fk for fk in SQLServerCatalog(sql_engine).get_foreign_keys()
+                if fk['table'] in names and fk['referenced_table'] in names
+                and not self.get_table_option(fk['referenced_table'], 'where')
+                and self.reads_columns(sql_engine, fk['table'], fk['columns'])
+                and self.reads_columns(sql_engine, fk['referenced_table'], fk['referenced_columns'])
+            ]
+        except Exception as e:
+            logging.warning(f"No se pudieron leer las claves foráneas ({e}); las tablas se cargan sin orden.")
+            return []
+        finally:
+            sql_engine.dispose()
+        return [
+            {
+                **fk,
+                'columns': [self.get_transformation(fk['table']).output_name(c) for c in fk['columns']],
+                'referenced_columns': [self.get_transformation(fk['referenced_table']).output_name(c)
+                                       for c in fk['referenced_columns']],
+            }
+            for fk in foreign_keys
+        ]
+
+    def create_foreign_keys(self, pg_engine, foreign_keys: List[dict], created: set):
+        """
+        Crea las claves foráneas indicadas que aún no existen en destino. Un fallo
+        (p. ej. filas huérfanas) se registra como aviso y no detiene la sincronización.
+        """
+        tables = PostgresTableManager(pg_engine)
+        for fk in foreign_keys:
+            key = (fk['table'], fk['name'])
+            if key in created:
+                continue
+            created.add(key)
+            if not (tables.table_exists(fk['table']) and tables.table_exists(fk['referenced_table'])):
+                continue
+            if tables.foreign_key_exists(fk['table'], fk['name']):
+                continue
+            try:
+                tables.execute_ddl(build_foreign_key(fk))
+                logging.info(f"Clave foránea '{fk['name']}' creada: {fk['table']} -> {fk['referenced_table']}.")
+            except SQLAlchemyError as e:
+                logging.warning(f"No se pudo crear la clave foránea '{fk['name']}' de '{fk['table']}': {e}")
+
+    def run_tables(self, tables: List[str], dependencies: TableDependencies, pg_engine) -> List[TableSyncResult]:
+        """
+        Sincroniza las tablas en `max_workers` workers respetando las dependencias:
+        una tabla empieza cuando han terminado las tablas a las que referencia, y
+        cada clave foránea se crea en cuanto sus dos tablas se han sincronizado.
+        Entre las tablas listas se lanzan primero las de `tables` que van antes.
+        """
+        results, started, finished, succeeded, created = [], set(), set(), set(), set()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='sync') as pool:
+            pending = {}
+
+            def submit_ready():
+                for table_name in dependencies.ready(finished, started):
+                    started.add(table_name)
+                    pending[pool.submit(self.sync_table, table_name)] = table_name
+
+            submit_ready()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results.append(result)
+                    finished.add(pending.pop(future))
+                    if result.succeeded:
+                        succeeded.add(result.table_name)
+                self.create_foreign_keys(pg_engine, dependencies.foreign_keys_ready(succeeded), created)
+                submit_ready()
+        return results
+
+    def get_worker_engines(self):
+        """
+        Devuelve los motores de SQL Server y PostgreSQL del worker actual,
+        creándolos la primera vez que el hilo los necesita.
+        """
+        engines = getattr(self._worker_state, 'engines', None)
+        if engines is None:
+            engines = (self.create_sql_engine(), self.create_postgres_engine())
+            self._worker_state.engines = engines
+            with self._worker_engines_lock:
+                self._worker_engines.append(engines)
+        return engines
+
+    def dispose_worker_engines(self):
+        """
+        Cierra los motores creados por los workers.
+        """
+        with self._worker_engines_lock:
+            for sql_engine, pg_engine in self._worker_engines:
+                sql_engine.dispose()
+                pg_engine.dispose()
+            self._worker_engines = []
+        self._worker_state = threading.local()
+
+    def sync_table(self, table_name: str) -> TableSyncResult:
+        """
+        Sincroniza una tabla en el worker actual. Los errores quedan aislados en el
+        resultado de la tabla y no detienen al resto.
+        """
+        start = time.perf_counter()
+        resumed_rows = self.run_manifest.completed_table(table_name)
+        if resumed_rows is not None:
+            logging.info(f"Tabla '{table_name}' ya sincronizada en la ejecución anterior ({resumed_rows} registros).")
+            return TableSyncResult(table_name, 'ok', rows=resumed_rows, resumed=True)
+        try:
+            sql_engine, pg_engine = self.get_worker_engines()
+            rows = self.process_table(sql_engine, pg_engine, table_name)
+            self.run_manifest.record_table(table_name, rows or 0)
+            stats = self.table_stats.get(table_name, {})
+            return TableSyncResult(table_name, 'ok', rows=rows or 0, seconds=time.perf_counter() - start,
+                                   skipped_chunks=stats.get('skipped_chunks', 0),
+                                   bytes_saved=stats.get('bytes_saved', 0),
+                                   peak_memory_bytes=self.memory_governor.table_peak(table_name),
+                                   transform_timings=dict(self.get_transformation(table_name).timings))
+        except Exception as e:
+            return TableSyncResult(table_name, 'error', seconds=time.perf_counter() - start, error=str(e))
+
+    @staticmethod
+    def log_summary(results: List[TableSyncResult]):
+        """
+        Muestra el resumen de la sincronización: estado, filas y duración por tabla.
+        """
+        succeeded = [r for r in results if r.succeeded]
+        failed = [r for r in results if not r.succeeded]
+        logging.info(f"\nResumen de la sincronización: {len(succeeded)} correctas, {len(failed)} con error.")
+        for result in sorted(results, key=lambda r: r.seconds, reverse=True):
+            if result.succeeded:
+                skipped = ""
+                if result.skipped_chunks:
+                    skipped = (f", {result.skipped_chunks} trozos omitidos "
+                               f"(~{result.bytes_saved / 1024 / 1024:.1f} MB)")
+                if result.resumed:
+                    logging.info(f"  [OK]    {result.table_name}: {result.rows} registros "
+                                 f"(terminada en la ejecución anterior)")
+                    continue
+                logging.info(f"  [OK]    {result.table_name}: {result.rows} registros en "
+                             f"{result.seconds:.1f} s{skipped}, pico de memoria "
+                             f"{result.peak_memory_bytes / 1024 / 1024:.1f} MB")
+                if result.transform_timings:
+                    steps = sorted(result.transform_timings.items(), key=lambda item: item[1], reverse=True)
+                    logging.info("          transformaciones: " +
+                                 ", ".join(f"{label} {seconds:.2f} s" for label, seconds in steps))
+            else:
+                logging.error(f"  [ERROR] {result.table_name}: {result.error} ({result.seconds:.1f} s)")
+        skipped_chunks = sum(r.skipped_chunks for r in results)
+        if skipped_chunks:
+            bytes_saved = sum(r.bytes_saved for r in results)
+            logging.info(f"Trozos omitidos por checksum: {skipped_chunks} "
+                         f"(~{bytes_saved / 1024 / 1024:.1f} MB no transferidos).")
+
     def execute(self):
         """
         Función principal que ejecuta la transferencia de tablas desde SQL Server a PostgreSQL.
+        Las tablas se reparten entre `max_workers` workers concurrentes, las mayores
+        primero y en el orden que imponen sus claves foráneas.
+        Devuelve la lista de resultados por tabla.
         """
         try:
             # Crear la base de datos PostgreSQL si no existe
             self.create_postgres_database_if_not_exists()
+            self.prepare_state()
+            tables = self.discover_tables()
+            dependencies = TableDependencies(tables, self.load_foreign_keys(tables))
+            if len(dependencies.waves) > 1:
+                logging.info(f"Orden por claves foráneas en {len(dependencies.waves)} oleadas: " +
+                             " | ".join(", ".join(wave) for wave in dependencies.waves))
 
-            # Crear motores de conexión
-            sql_engine = self.create_sql_engine()
+            logging.info(f"Sincronizando {len(tables)} tablas con {self.max_workers} workers...")
             pg_engine = self.create_postgres_engine()
-            logging.info('Conexión exitosa a SQL Server y PostgreSQL.')
-
-            # Procesar cada tabla y transferirla
-            for table_name in self.tables:
-                self.process_table(sql_engine, pg_engine, table_name)
+            try:
+                self.run_manifest = self.open_run_manifest(pg_engine)
+                results = self.run_tables(tables, dependencies, pg_engine)
+            finally:
+                # Cerrar las conexiones y el pool de procesos de transformación
+                pg_engine.dispose()
+                self.dispose_worker_engines()
+                self.shutdown_process_pool()
+                logging.info('\nConexiones cerradas.')
 
-            # Cerrar las conexiones
-            sql_engine.dispose()
-            pg_engine.dispose()
-            logging.info('\nConexiones cerradas.')
+            self.log_summary(results)
+            logging.info(f"Pico de memoria en vuelo: {self.memory_governor.peak / 1024 / 1024:.1f} MB de "
+                         f"{self.memory_governor.budget_bytes / 1024 / 1024:.0f} MB.")
+            failed = [r.table_name for r in results if not r.succeeded]
+            if failed:
+                raise RuntimeError(f"Fallaron {len(failed)} tablas: {', '.join(failed)}")
+            return results
 
         except Exception as e:
             logging.error(f"Error durante la sincronización: {e}")
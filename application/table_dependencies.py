@@ -0,0 +1,64 @@
+# application/table_dependencies.py
+
+import logging
+from typing import Dict, Iterable, List, Set
+
+
+class TableDependencies:
+    """
+    Grafo de dependencias entre las tablas a sincronizar según sus claves
+    foráneas: una tabla depende de las tablas a las que referencia. Las claves
+    hacia tablas que no se sincronizan y las autorreferencias no crean
+    dependencias. Un ciclo se rompe adelantando la tabla con menos dependencias
+    pendientes; sus claves foráneas se crean igualmente cuando terminan ambas tablas.
+    """
+
+    def __init__(self, tables: List[str], foreign_keys: List[dict]):
+        self.tables = list(tables)
+        names = set(self.tables)
+        self.foreign_keys = [
+            fk for fk in foreign_keys if fk['table'] in names and fk['referenced_table'] in names
+        ]
+        graph: Dict[str, Set[str]] = {table: set() for table in self.tables}
+        for fk in self.foreign_keys:
+            if fk['table'] != fk['referenced_table']:
+                graph[fk['table']].add(fk['referenced_table'])
+        self.waves = self._build_waves(graph)
+        # Solo cuentan las dependencias con oleadas anteriores (las internas de un ciclo se ignoran)
+        wave_of = {table: index for index, wave in enumerate(self.waves) for table in wave}
+        self.parents = {
+            table: {parent for parent in parents if wave_of[parent] < wave_of[table]}
+            for table, parents in graph.items()
+        }
+
+    def _build_waves(self, graph: Dict[str, Set[str]]) -> List[List[str]]:
+        """
+        Oleadas topológicas (Kahn por niveles): cada una contiene las tablas cuyas
+        dependencias están todas en oleadas anteriores, en el orden de `tables`.
+        """
+        waves, placed = [], set()
+        while len(placed) < len(self.tables):
+            wave = [table for table in self.tables if table not in placed and graph[table] <= placed]
+            if not wave:
+                pending = [table for table in self.tables if table not in placed]
+                wave = [min(pending, key=lambda table: len(graph[table] - placed))]
+                logging.warning(f"Dependencias circulares entre las tablas {', '.join(pending)}: "
+                                f"'{wave[0]}' se carga antes que las tablas a las que referencia.")
+            waves.append(wave)
+            placed.update(wave)
+        return waves
+
+    def ready(self, finished: Iterable[str], started: Iterable[str]) -> List[str]:
+        """
+        Tablas que aún no han empezado y cuyas dependencias ya han terminado, en el
+        orden de `tables` (las mayores primero si así se ordenaron).
+        """
+        finished, started = set(finished), set(started)
+        return [table for table in self.tables if table not in started and self.parents[table] <= finished]
+
+    def foreign_keys_ready(self, succeeded: Iterable[str]) -> List[dict]:
+        """
+        Claves foráneas cuyas dos tablas se han sincronizado correctamente.
+        """
+        succeeded = set(succeeded)
+        return [fk for fk in self.foreign_keys if fk['table'] in succeeded and fk['referenced_table'] in succeeded]
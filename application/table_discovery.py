@@ -0,0 +1,54 @@
+# application/table_discovery.py
+
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, List
+
+from domain.entities import SourceTable
+
+
+def matches_any(table_name: str, patterns: Iterable[str]) -> bool:
+    """
+    Indica si el nombre cumple algún patrón estilo shell (obr*, *_hist, ?li),
+    sin distinguir mayúsculas como los nombres de SQL Server.
+    """
+    return any(fnmatchcase(table_name.lower(), pattern.lower()) for pattern in patterns)
+
+
+def filter_tables(tables: List[SourceTable], include: Iterable[str] = (),
+                  exclude: Iterable[str] = ()) -> List[SourceTable]:
+    """
+    Se queda con las tablas que cumplen algún patrón de `include` (todas si está
+    vacío) y ninguno de `exclude`.
+    """
+    include, exclude = list(include), list(exclude)
+    return [
+        table for table in tables
+        if (not include or matches_any(table.name, include)) and not matches_any(table.name, exclude)
+    ]
+
+
+def order_largest_first(tables: List[SourceTable]) -> List[SourceTable]:
+    """
+    Ordena las tablas de mayor a menor espacio reservado (y filas en caso de
+    empate). Repartidas en ese orden entre los workers (LPT), la tabla más grande
+    empieza la primera y no alarga el final de la ejecución.
+    """
+    return sorted(tables, key=lambda table: (table.reserved_bytes, table.rows), reverse=True)
+
+
+def plan_tables(available: List[SourceTable], requested: List[str] = None, include: Iterable[str] = (),
+                exclude: Iterable[str] = (), largest_first: bool = True) -> List[SourceTable]:
+    """
+    Decide qué tablas se sincronizan y en qué orden. Con `requested` se usan esas
+    tablas (las que no están en el catálogo quedan con tamaño 0); sin él, todas
+    las tablas descubiertas que pasan los filtros de `include` y `exclude`.
+    """
+    sizes: Dict[str, SourceTable] = {table.name.lower(): table for table in available}
+    if requested:
+        tables = []
+        for name in requested:
+            known = sizes.get(name.lower())
+            tables.append(SourceTable(name, known.rows, known.reserved_bytes) if known else SourceTable(name))
+    else:
+        tables = filter_tables(available, include, exclude)
+    return order_largest_first(tables) if largest_first else tables
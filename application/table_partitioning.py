@@ -0,0 +1,84 @@
+# application/table_partitioning.py
+
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from infrastructure.table_stream import quote_postgres_identifier, quote_sql_server_identifier
+
+
+@dataclass(frozen=True)
+class KeyRange:
+    """
+    Rango semiabierto [lower, upper) sobre la clave de partición. Un límite a None
+    significa "sin límite"; `nulls` identifica la partición de filas con clave NULL.
+    """
+    lower: Optional[Any] = None
+    upper: Optional[Any] = None
+    nulls: bool = False
+
+    def to_where(self, key: str, dialect: str = 'mssql') -> Tuple[str, tuple]:
+        """
+        Devuelve el predicado WHERE y sus parámetros para SQL Server ('mssql', con ?)
+        o para PostgreSQL ('postgresql', con %s).
+        """
+        if dialect == 'postgresql':
+            column, placeholder = quote_postgres_identifier(key), "%s"
+        else:
+            column, placeholder = quote_sql_server_identifier(key), "?"
+        if self.nulls:
+            return f"{column} IS NULL", ()
+        conditions, params = [], []
+        if self.lower is not None:
+            conditions.append(f"{column} >= {placeholder}")
+            params.append(self.lower)
+        if self.upper is not None:
+            conditions.append(f"{column} < {placeholder}")
+            params.append(self.upper)
+        if not conditions:
+            return f"{column} IS NOT NULL", ()
+        return " AND ".join(conditions), tuple(params)
+
+    @property
+    def label(self) -> str:
+        if self.nulls:
+            return "NULL"
+        return f"[{'' if self.lower is None else self.lower}, {'' if self.upper is None else self.upper})"
+
+
+def split_key_range(min_value: int, max_value: int, partitions: int) -> List[KeyRange]:
+    """
+    Divide el intervalo entero [min_value, max_value] en `partitions` rangos de igual
+    anchura. El primero y el último quedan abiertos para no perder filas.
+    """
+    if partitions < 1:
+        raise ValueError("El número de particiones debe ser al menos 1.")
+    span = max_value - min_value + 1
+    partitions = min(partitions, span)
+    width = -(-span // partitions)  # División entera redondeando hacia arriba
+    bounds = [min_value + i * width for i in range(1, partitions) if min_value + i * width <= max_value]
+    return ranges_from_boundaries(bounds)
+
+
+def ranges_from_boundaries(boundaries: List[Any]) -> List[KeyRange]:
+    """
+    Convierte una lista ordenada de cortes en rangos contiguos que cubren toda la clave.
+    Los cortes repetidos se descartan, así un valor nunca cae en dos particiones.
+    """
+    cuts = sorted(set(boundaries))
+    lowers = [None] + cuts
+    uppers = cuts + [None]
+    return [KeyRange(lower, upper) for lower, upper in zip(lowers, uppers)]
+
+
+def chunk_key_range(bucket: Optional[int], width: int) -> KeyRange:
+    """
+    Rango de clave del trozo `bucket` = clave / width (división entera de SQL Server,
+    que trunca hacia cero). El trozo None agrupa las claves NULL.
+    """
+    if bucket is None:
+        return KeyRange(nulls=True)
+    if bucket > 0:
+        return KeyRange(bucket * width, (bucket + 1) * width)
+    if bucket < 0:
+        return KeyRange(bucket * width - width + 1, bucket * width + 1)
+    return KeyRange(-width + 1, width)
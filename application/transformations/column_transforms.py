@@ -0,0 +1,151 @@
+# application/transformations/column_transforms.py
+
+from typing import Dict, Type
+
+import pandas as pd
+
+from application.transformations.date_transformation import decode_yyyymmdd
+
+# Registro de transformaciones de columna por nombre (el 'type' de cada paso en table_config)
+TRANSFORMS: Dict[str, Type['ColumnTransform']] = {}
+
+
+def register_transform(name: str):
+    """
+    Decorador que registra una transformación de columna con el nombre indicado.
+    """
+    def decorator(cls):
+        cls.name = name
+        TRANSFORMS[name] = cls
+        return cls
+    return decorator
+
+
+class ColumnTransform:
+    """
+    Transformación de una columna: recibe la Series del lote y devuelve la nueva.
+    `output_column` describe cómo cambia la columna en la tabla destino.
+    """
+    name = None
+
+    def apply(self, series: pd.Series) -> pd.Series:
+        return series
+
+    def output_column(self, column: dict) -> dict:
+        return column
+
+
+@register_transform('rename')
+class RenameTransform(ColumnTransform):
+    """
+    Cambia el nombre de la columna en destino sin tocar los valores.
+    """
+
+    def __init__(self, to: str):
+        self.to = to
+
+    def output_column(self, column: dict) -> dict:
+        return {**column, 'name': self.to}
+
+
+# Tipo PostgreSQL -> dtype de pandas para 'cast' (los enteros admiten NULL)
+_CAST_DTYPES = {
+    'smallint': 'Int16',
+    'integer': 'Int32',
+    'bigint': 'Int64',
+    'real': 'Float32',
+    'double precision': 'Float64',
+    'boolean': 'boolean',
+    'text': 'string',
+    'varchar': 'string',
+    'character varying': 'string',
+}
+
+
+@register_transform('cast')
+class CastTransform(ColumnTransform):
+    """
+    Convierte la columna al tipo PostgreSQL indicado en `to` (integer, bigint,
+    numeric(12,2), text, date, timestamp...). Los valores no convertibles en
+    fechas quedan como NULL; en números producen un error.
+    """
+
+    def __init__(self, to: str):
+        self.to = to
+        self.base_type = to.split('(')[0].strip().lower()
+        if self.base_type not in _CAST_DTYPES and self.base_type not in ('numeric', 'date', 'timestamp'):
+            raise ValueError(f"Tipo de 'cast' no soportado: {to}")
+
+    def apply(self, series: pd.Series) -> pd.Series:
+        if self.base_type == 'numeric':
+            return pd.to_numeric(series)
+        if self.base_type == 'date':
+            return pd.to_datetime(series, errors='coerce').dt.normalize()
+        if self.base_type == 'timestamp':
+            return pd.to_datetime(series, errors='coerce')
+        dtype = _CAST_DTYPES[self.base_type]
+        if dtype.startswith(('Int', 'Float')) and not pd.api.types.is_numeric_dtype(series):
+            series = pd.to_numeric(series)
+        return series.astype(dtype)
+
+    def output_column(self, column: dict) -> dict:
+        return {**column, 'type': self.to}
+
+
+@register_transform('date')
+class DateDecodeTransform(ColumnTransform):
+    """
+    Decodifica enteros yyyymmdd en fechas; 0 y los valores inválidos pasan a NULL.
+    """
+
+    def apply(self, series: pd.Series) -> pd.Series:
+        return pd.Series(decode_yyyymmdd(series), index=series.index, name=series.name)
+
+    def output_column(self, column: dict) -> dict:
+        return {**column, 'type': 'date', 'nullable': True}
+
+
+@register_transform('trim')
+class TrimTransform(ColumnTransform):
+    """
+    Quita espacios (o `chars`) al principio, al final o a ambos lados de los
+    textos, p. ej. el relleno de las columnas CHAR(n) de SQL Server.
+    """
+
+    def __init__(self, side: str = 'both', chars: str = None):
+        if side not in ('both', 'left', 'right'):
+            raise ValueError(f"Valor de 'side' no válido: {side}")
+        self.side = side
+        self.chars = chars
+
+    def apply(self, series: pd.Series) -> pd.Series:
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            return series
+        strip = {'both': series.str.strip, 'left': series.str.lstrip, 'right': series.str.rstrip}[self.side]
+        return strip(self.chars)
+
+
+_KEEP = object()
+
+
+@register_transform('map')
+class MapTransform(ColumnTransform):
+    """
+    Sustituye códigos por valores según `values`. Los códigos que no aparecen se
+    mantienen o, si se indica `default`, toman ese valor. `to` cambia el tipo destino.
+    """
+
+    def __init__(self, values: dict, default=_KEEP, to: str = None):
+        self.values = dict(values)
+        self.default = default
+        self.to = to
+
+    def apply(self, series: pd.Series) -> pd.Series:
+        mapped = series.map(self.values)
+        known = series.isin(list(self.values))
+        if self.default is _KEEP:
+            return mapped.where(known, series)
+        return mapped.where(known, self.default)
+
+    def output_column(self, column: dict) -> dict:
+        return {**column, 'type': self.to} if self.to else column
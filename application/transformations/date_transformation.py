@@ -0,0 +1,37 @@
+# application/transformations/date_transformation.py
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+# Columnas de fecha codificadas como entero yyyymmdd, por tabla: {columna origen: columna destino}.
+# Se pueden ampliar o sustituir por tabla con la opción 'date_columns' de table_config.
+DATE_COLUMNS: Dict[str, Dict[str, str]] = {
+    'obr': {
+        'fecinipre': 'fecha_inicio_prevista',
+        'fecfinpre': 'fecha_fin_prevista',
+        'fecinirea': 'fecha_inicio_real',
+        'fecfinrea': 'fecha_fin_real',
+    },
+}
+
+
+def decode_yyyymmdd(values) -> np.ndarray:
+    """
+    Convierte enteros yyyymmdd en fechas (datetime64[D]) con aritmética entera de
+    NumPy. 0, NULL y los valores que no son una fecha válida (mes 13, 31 de
+    febrero, decimales...) quedan como NaT. Admite enteros con NULL (Int64 o float64).
+    """
+    numeric = pd.to_numeric(pd.Series(values, copy=False), errors='coerce')
+    raw = numeric.to_numpy(dtype=np.float64, na_value=0.0)
+    valid = numeric.notna().to_numpy() & (raw == np.floor(raw))
+    numbers = np.where(valid, raw, 0).astype(np.int64)
+
+    year, month, day = numbers // 10000, numbers // 100 % 100, numbers % 100
+    valid &= (year >= 1) & (year <= 9999) & (month >= 1) & (month <= 12) & (day >= 1)
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    month_start = months.astype('datetime64[D]')
+    days_in_month = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    valid &= day <= days_in_month
+    return np.where(valid, month_start + (day - 1), np.datetime64('NaT', 'D'))
@@ -0,0 +1,87 @@
+# application/transformations/process_transform.py
+
+from concurrent.futures import Executor, Future
+from typing import Dict, List, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+from application.transformations.transformation_factory import TransformationFactory, TransformationPlan
+
+# Planes compilados dentro de cada proceso del pool, reutilizados entre lotes y tablas
+_factory = TransformationFactory()
+
+
+def record_batch_to_ipc(batch: pa.RecordBatch) -> bytes:
+    """
+    Serializa el RecordBatch en formato Arrow IPC (stream): los buffers de las
+    columnas se copian tal cual, sin pickle de objetos Python.
+    """
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def ipc_to_record_batch(payload: bytes) -> pa.RecordBatch:
+    return pa.ipc.open_stream(payload).read_next_batch()
+
+
+def transform_ipc_batch(table_name: str, date_columns: Dict[str, str], specs: List[dict],
+                        payload: bytes) -> Tuple[bytes, Dict[str, float]]:
+    """
+    Función que ejecuta el proceso del pool: deserializa el lote, aplica el plan de
+    la tabla y devuelve el lote transformado en IPC junto con los tiempos de cada paso.
+    """
+    plan = _factory.get_plan(table_name, date_columns, specs)
+    before = dict(plan.timings)
+    result = plan.apply(ipc_to_record_batch(payload))
+    timings = {label: seconds - before.get(label, 0.0) for label, seconds in plan.timings.items()}
+    return record_batch_to_ipc(result), timings
+
+
+class ProcessTransformStage:
+    """
+    Etapa de transformación en un pool de procesos compartido por toda la
+    ejecución. `submit` envía el lote en Arrow IPC y devuelve un Future; `collect`
+    espera el resultado y lo devuelve en el formato original (DataFrame o
+    RecordBatch). Separar ambos pasos permite tener varios lotes en vuelo por tabla.
+    """
+
+    def __init__(self, pool: Executor, plan: TransformationPlan, date_columns: Dict[str, str],
+                 specs: List[dict]):
+        self.pool = pool
+        self.plan = plan
+        self.date_columns = date_columns
+        self.specs = list(specs)
+
+    def submit(self, frame) -> Future:
+        is_frame = isinstance(frame, pd.DataFrame)
+        try:
+            batch = pa.RecordBatch.from_pandas(frame, preserve_index=False) if is_frame else frame
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Columnas que Arrow no sabe tipar: se transforma el lote en este proceso
+            future = Future()
+            future.set_result((self.plan.apply(frame), None, is_frame))
+            return future
+        future = self.pool.submit(transform_ipc_batch, self.plan.table_name, self.date_columns,
+                                  self.specs, record_batch_to_ipc(batch))
+        result = Future()
+
+        def done(completed: Future):
+            if completed.exception() is not None:
+                result.set_exception(completed.exception())
+            else:
+                payload, timings = completed.result()
+                result.set_result((payload, timings, is_frame))
+        future.add_done_callback(done)
+        return result
+
+    def collect(self, future: Future):
+        output, timings, is_frame = future.result()
+        if timings is None:
+            return output
+        self.plan.add_timings(timings)
+        batch = ipc_to_record_batch(output)
+        # date32 vuelve como datetime64, igual que si el plan se hubiera aplicado en el hilo
+        return batch.to_pandas(date_as_object=False) if is_frame else batch
@@ -0,0 +1,146 @@
+# application/transformations/transformation_factory.py
+
+import threading
+import time
+from typing import Dict, List
+
+import pandas as pd
+
+from application.transformations.column_transforms import TRANSFORMS, ColumnTransform
+from application.transformations.date_transformation import DATE_COLUMNS
+
+
+class TransformationPlan:
+    """
+    Plan compilado de una tabla: para cada columna afectada, la lista ordenada de
+    transformaciones. Se aplica a cada lote leído; las columnas que ningún paso
+    toca se comparten con el lote original sin copiarse. Acumula el tiempo de cada
+    paso en `timings` ("columna:transformación" -> segundos).
+    """
+
+    def __init__(self, table_name: str, steps: Dict[str, List[ColumnTransform]], columns: List[str] = ()):
+        self.table_name = table_name
+        self.steps = steps
+        self.timings: Dict[str, float] = {}
+        self._timings_lock = threading.Lock()
+        self.renames = {column: self.output_name(column) for column in steps}
+        # Las fechas van a Arrow como date32, igual que la columna DATE de destino (pandas las deja en timestamp)
+        self.dates = {column for column in steps
+                      if self.output_column({'name': column, 'type': None, 'nullable': True})['type'] == 'date'}
+        self.check_targets(columns)
+
+    def check_targets(self, columns: List[str]):
+        """
+        Comprueba que las columnas de origen (las que no toca ningún paso incluidas)
+        y las transformadas no acaban con el mismo nombre de destino.
+        """
+        targets = [self.output_name(column) for column in dict.fromkeys([*columns, *self.steps])]
+        repeated = sorted({target for target in targets if targets.count(target) > 1})
+        if repeated:
+            raise ValueError(
+                f"Transformaciones de '{self.table_name}' con columnas destino repetidas: {', '.join(repeated)}"
+            )
+
+    def output_name(self, column: str) -> str:
+        return self.output_column({'name': column, 'type': None, 'nullable': True})['name']
+
+    def output_column(self, column: dict) -> dict:
+        for transform in self.steps.get(column['name'], []):
+            column = transform.output_column(column)
+        return column
+
+    def output_columns(self, columns: List[dict]) -> List[dict]:
+        """
+        Ajusta las columnas traducidas del catálogo (nombre, tipo y NULL) a la salida del plan.
+        """
+        self.check_targets([column['name'] for column in columns])
+        return [self.output_column(column) for column in columns]
+
+    def add_timings(self, timings: Dict[str, float]):
+        """
+        Suma tiempos de pasos medidos (también los que llegan de otros procesos).
+        """
+        with self._timings_lock:
+            for label, seconds in timings.items():
+                self.timings[label] = self.timings.get(label, 0.0) + seconds
+
+    def _run(self, column: str, series: pd.Series) -> pd.Series:
+        elapsed = {}
+        for transform in self.steps[column]:
+            start = time.perf_counter()
+            series = transform.apply(series)
+            elapsed[f"{column}:{transform.name}"] = time.perf_counter() - start
+        self.add_timings(elapsed)
+        return series
+
+    def apply(self, frame):
+        """
+        Devuelve el lote (DataFrame o RecordBatch de Arrow) transformado.
+        """
+        names = [str(c) for c in frame.columns] if isinstance(frame, pd.DataFrame) else frame.schema.names
+        present = [column for column in self.steps if column in names]
+        if not present:
+            return frame
+        if any(self.renames[column] != column for column in present):
+            self.check_targets(names)
+        if isinstance(frame, pd.DataFrame):
+            result = frame.copy(deep=False)
+            for column in present:
+                result[column] = self._run(column, frame[column])
+            return result.rename(columns={column: self.renames[column] for column in present})
+
+        import pyarrow as pa
+        arrays = list(frame.columns)
+        for column in present:
+            index = names.index(column)
+            arrays[index] = pa.Array.from_pandas(self._run(column, arrays[index].to_pandas()),
+                                                 type=pa.date32() if column in self.dates else None)
+        return pa.RecordBatch.from_arrays(arrays, names=[self.renames.get(name, name) for name in names])
+
+
+class TransformationFactory:
+    """
+    Compila una vez por tabla el plan de transformaciones a partir de la
+    configuración declarativa: las columnas de fecha (DATE_COLUMNS u opción
+    'date_columns') y la lista de pasos de la opción 'transformations', p. ej.
+    [{'column': 'nombre', 'type': 'trim'}, {'column': 'tipo', 'type': 'map', 'values': {'A': 'Alta'}}].
+    """
+
+    def __init__(self):
+        self._plans: Dict[str, TransformationPlan] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_steps(table_name: str, date_columns: Dict[str, str] = None,
+                    specs: List[dict] = ()) -> Dict[str, List[ColumnTransform]]:
+        if date_columns is None:
+            date_columns = DATE_COLUMNS.get(table_name, {})
+        steps: Dict[str, List[ColumnTransform]] = {}
+        for column, target in date_columns.items():
+            steps.setdefault(column, []).append(TRANSFORMS['date']())
+            if target != column:
+                steps[column].append(TRANSFORMS['rename'](target))
+        for spec in specs:
+            options = {k: v for k, v in spec.items() if k not in ('column', 'type')}
+            transform_type = spec.get('type')
+            if transform_type not in TRANSFORMS:
+                raise ValueError(
+                    f"Transformación desconocida '{transform_type}' en '{table_name}'. "
+                    f"Opciones: {', '.join(TRANSFORMS)}"
+                )
+            steps.setdefault(spec['column'], []).append(TRANSFORMS[transform_type](**options))
+        return steps
+
+    def get_plan(self, table_name: str, date_columns: Dict[str, str] = None,
+                 specs: List[dict] = (), columns: List[str] = ()) -> TransformationPlan:
+        """
+        Devuelve el plan compilado de la tabla, creándolo la primera vez. Con `columns`
+        (las columnas de origen conocidas) se valida también que ningún renombrado
+        choca con una columna que no se transforma.
+        """
+        with self._lock:
+            if table_name not in self._plans:
+                self._plans[table_name] = TransformationPlan(
+                    table_name, self.build_steps(table_name, date_columns, specs), columns
+                )
+            return self._plans[table_name]
@@ -0,0 +1,244 @@
+# benchmarks/restore_profiles.py
+"""
+Compara perfiles de E/S del RESTORE (BUFFERCOUNT, MAXTRANSFERSIZE, BLOCKSIZE).
+
+En el servidor se restaura la copia con cada perfil y se graban los resultados y
+mensajes de cada sentencia (SqlServerExecutor):
+
+    python -m benchmarks.restore_profiles ruesma_1.bak ruesma_2.bak \
+        --profile base --profile b64:buffercount=64,maxtransfersize=4194304 --record restore.json
+
+En local se reproduce la grabación con el mismo caso de uso sobre un ejecutor
+falso, que vuelve a generar y validar las sentencias de cada perfil, sin SQL Server:
+
+    python -m benchmarks.restore_profiles --replay restore.json
+"""
+
+import argparse
+import json
+import logging
+import shutil
+import tempfile
+import time
+import uuid
+from dataclasses import asdict
+from datetime import date, datetime, time as time_of_day
+from decimal import Decimal
+from typing import Any, Dict, List
+
+from application.restore_sql_database_use_case import RestoreSQLDatabaseUseCase
+from domain.entities import RestoreProfile, RestoreResult
+from infrastructure.sql_server_executor import ResultSet, SqlServerError, SqlServerExecutor
+
+PROFILE_OPTIONS = {
+    'buffercount': 'buffer_count',
+    'maxtransfersize': 'max_transfer_size',
+    'blocksize': 'block_size',
+}
+
+
+def parse_profile(text: str) -> RestoreProfile:
+    """
+    'nombre' o 'nombre:buffercount=64,maxtransfersize=4194304,blocksize=65536'.
+    """
+    name, _, options = text.partition(':')
+    values = {}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        if key.strip().lower() not in PROFILE_OPTIONS:
+            raise ValueError(f"Opción de perfil desconocida '{key}' en '{text}'")
+        values[PROFILE_OPTIONS[key.strip().lower()]] = int(value)
+    return RestoreProfile(name, **values)
+
+
+def command_kind(statement: str) -> str:
+    """
+    Tipo de sentencia, para emparejar las respuestas grabadas.
+    """
+    statement = statement.upper()
+    for kind in ('HEADERONLY', 'FILELISTONLY'):
+        if kind in statement:
+            return kind.lower()
+    if 'RESTORE DATABASE' in statement:
+        return 'restore'
+    return 'status' if 'SYS.DATABASES' in statement else 'other'
+
+
+# Tipos de las filas de pyodbc sin equivalente en JSON: se graban como [tipo, texto]
+VALUE_TYPES = {
+    'decimal': (Decimal, str, Decimal),
+    'datetime': (datetime, datetime.isoformat, datetime.fromisoformat),
+    'date': (date, date.isoformat, date.fromisoformat),
+    'time': (time_of_day, time_of_day.isoformat, time_of_day.fromisoformat),
+    'uuid': (uuid.UUID, str, uuid.UUID),
+    'bytes': ((bytes, bytearray), bytes.hex, bytes.fromhex),
+}
+
+
+def dump_value(value: Any) -> Any:
+    """
+    Valor de una fila en JSON: None, bool, int, float y str tal cual; el resto como [tipo, texto].
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    for name, (python_type, to_text, _) in VALUE_TYPES.items():
+        if isinstance(value, python_type):
+            return [name, to_text(bytes(value) if name == 'bytes' else value)]
+    raise TypeError(f"Tipo no soportado en la grabación: {type(value).__name__}")
+
+
+def load_value(value: Any) -> Any:
+    if isinstance(value, list):
+        name, text = value
+        return VALUE_TYPES[name][2](text)
+    return value
+
+
+def dump_result_set(result: ResultSet) -> dict:
+    return {
+        'columns': result.columns,
+        'rows': [[dump_value(value) for value in row] for row in result.rows],
+        'messages': result.messages,
+    }
+
+
+def load_result_set(data: dict) -> ResultSet:
+    return ResultSet(
+        data['columns'], [tuple(load_value(value) for value in row) for row in data['rows']], data['messages']
+    )
+
+
+class RecordingExecutor(SqlServerExecutor):
+    """
+    Ejecutor real que además guarda cada sentencia con sus resultados, sus mensajes y su duración.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.commands: List[dict] = []
+
+    def execute(self, statement, params=()):
+        command = {'kind': command_kind(statement), 'result_sets': [], 'error': None, 'messages': []}
+        start = time.perf_counter()
+        try:
+            result_sets = super().execute(statement, params)
+            command['result_sets'] = [dump_result_set(result) for result in result_sets]
+            return result_sets
+        except SqlServerError as e:
+            command['error'], command['messages'] = str(e), e.messages
+            raise
+        finally:
+            command['seconds'] = time.perf_counter() - start
+            self.commands.append(command)
+
+
+class ReplayExecutor(SqlServerExecutor):
+    """
+    Sustituto local de SQL Server: responde a cada sentencia con los resultados
+    grabados del mismo tipo y acumula en `elapsed` la duración grabada.
+    """
+
+    def __init__(self, commands: List[dict]):
+        super().__init__()
+        self.responses: Dict[str, List[dict]] = {}
+        for command in commands:
+            self.responses.setdefault(command['kind'], []).append(command)
+        self.elapsed = 0.0
+        self.statements: List[str] = []
+
+    def execute(self, statement, params=()):
+        kind = command_kind(statement)
+        self.statements.append(statement)
+        queue = self.responses.get(kind) or []
+        if not queue:
+            raise RuntimeError(f"La grabación no tiene respuesta para la sentencia '{kind}'")
+        # La última respuesta de cada tipo se repite (p. ej. varias consultas de estado)
+        command = queue.pop(0) if len(queue) > 1 else queue[0]
+        self.elapsed += command['seconds']
+        if command['error']:
+            raise SqlServerError(command['error'], command['messages'])
+        return [load_result_set(result) for result in command['result_sets']]
+
+
+class ReplayRestore(RestoreSQLDatabaseUseCase):
+    """
+    Caso de uso sobre un ReplayExecutor: las bandas no tienen que existir en local.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.base_path = tempfile.mkdtemp(prefix='restore_replay_')
+
+    def missing_bak_files(self):
+        return []
+
+
+def record(bak_files: List[str], profiles: List[RestoreProfile], database_name: str) -> dict:
+    recording = {'bak_files': bak_files, 'database_name': database_name, 'profiles': []}
+    for profile in profiles:
+        executor = RecordingExecutor()
+        try:
+            result = RestoreSQLDatabaseUseCase(bak_files, database_name, profile=profile, executor=executor).execute()
+        finally:
+            executor.close()
+        recording['profiles'].append({'profile': asdict(profile), 'commands': executor.commands})
+        logging.info(f"Perfil '{profile.name}': {result.status}")
+    return recording
+
+
+def replay(recording: dict) -> List[dict]:
+    rows = []
+    for entry in recording['profiles']:
+        profile = RestoreProfile(**entry['profile'])
+        executor = ReplayExecutor(entry['commands'])
+        use_case = ReplayRestore(recording['bak_files'], recording['database_name'], profile=profile,
+                                 executor=executor)
+        try:
+            result: RestoreResult = use_case.execute()
+        finally:
+            shutil.rmtree(use_case.base_path, ignore_errors=True)
+        rows.append({
+            'profile': profile.name,
+            'options': ', '.join(profile.options()) or '(por defecto)',
+            'status': result.status,
+            'restore_seconds': result.seconds,
+            'mb_per_second': result.megabytes_per_second,
+            'sql_seconds': executor.elapsed,
+        })
+    return rows
+
+
+def format_report(rows: List[dict]) -> str:
+    lines = [f"{'perfil':<16}{'estado':<10}{'RESTORE s':>11}{'MB/s':>10}{'total s':>11}  opciones"]
+    for row in sorted(rows, key=lambda r: -(r['mb_per_second'] or 0)):
+        mb_per_second = f"{row['mb_per_second']:.1f}" if row['mb_per_second'] is not None else '-'
+        lines.append(f"{row['profile']:<16}{row['status']:<10}{row['restore_seconds']:>11.1f}"
+                     f"{mb_per_second:>10}{row['sql_seconds']:>11.1f}  {row['options']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara perfiles de E/S del RESTORE de SQL Server")
+    parser.add_argument('bak_files', nargs='*', help="Bandas de la copia de seguridad (modo grabación)")
+    parser.add_argument('--profile', action='append', default=[], type=parse_profile,
+                        help="Perfil 'nombre:buffercount=N,maxtransfersize=N,blocksize=N' (repetible)")
+    parser.add_argument('--database', default='RestoreBenchmarkDB', help="Base de datos de prueba")
+    parser.add_argument('--record', help="Restaura con cada perfil y guarda los resultados en este JSON")
+    parser.add_argument('--replay', help="Reproduce una grabación sin SQL Server")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        with open(args.replay, encoding='utf-8') as f:
+            recording = json.load(f)
+    else:
+        if not args.bak_files or not args.record:
+            parser.error("indica las bandas del .bak y --record, o --replay")
+        recording = record(args.bak_files, args.profile or [RestoreProfile()], args.database)
+        with open(args.record, 'w', encoding='utf-8') as f:
+            json.dump(recording, f, indent=2)
+    print(format_report(replay(recording)))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    main()
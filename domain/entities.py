@@ -0,0 +1,88 @@
+# domain/entities.py
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+
+@dataclass
+class SourceTable:
+    """
+    Tabla de usuario de la base de origen con su tamaño según el catálogo.
+    """
+    name: str
+    rows: int = 0
+    reserved_bytes: int = 0  # Páginas reservadas (datos, índices y LOB) * 8 KB
+
+
+@dataclass
+class RestoreProfile:
+    """
+    Ajustes de E/S del RESTORE. Un valor 0 deja el de SQL Server.
+    """
+    name: str = 'default'
+    buffer_count: int = 0
+    max_transfer_size: int = 0  # Bytes: múltiplo de 64 KB hasta 4 MB
+    block_size: int = 0  # Bytes: potencia de 2 entre 512 y 65536
+
+    def options(self) -> List[str]:
+        """
+        Opciones WITH del RESTORE para el perfil. Lanza ValueError si algún valor no es válido.
+        """
+        if self.buffer_count < 0:
+            raise ValueError(f"BUFFERCOUNT no válido en el perfil '{self.name}': {self.buffer_count}")
+        if self.max_transfer_size and (self.max_transfer_size % 65536 or not 0 < self.max_transfer_size <= 4194304):
+            raise ValueError(f"MAXTRANSFERSIZE debe ser múltiplo de 65536 hasta 4194304 en el perfil "
+                             f"'{self.name}': {self.max_transfer_size}")
+        if self.block_size and (self.block_size & (self.block_size - 1) or not 512 <= self.block_size <= 65536):
+            raise ValueError(f"BLOCKSIZE debe ser una potencia de 2 entre 512 y 65536 en el perfil "
+                             f"'{self.name}': {self.block_size}")
+        options = []
+        if self.buffer_count:
+            options.append(f"BUFFERCOUNT = {self.buffer_count}")
+        if self.max_transfer_size:
+            options.append(f"MAXTRANSFERSIZE = {self.max_transfer_size}")
+        if self.block_size:
+            options.append(f"BLOCKSIZE = {self.block_size}")
+        return options
+
+
+@dataclass
+class RestoreResult:
+    """
+    Resultado de restaurar la base temporal de SQL Server desde un .bak.
+    """
+    database_name: str
+    status: str  # 'restored', 'unchanged' (misma copia ya restaurada) o 'error'
+    fingerprint: Optional[str] = None  # Huella de la copia según RESTORE HEADERONLY
+    error: Optional[str] = None
+    seconds: float = 0.0  # Duración del RESTORE según SQL Server
+    megabytes_per_second: Optional[float] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status != 'error'
+
+    @property
+    def unchanged(self) -> bool:
+        return self.status == 'unchanged'
+
+
+@dataclass
+class TableSyncResult:
+    """
+    Resultado de sincronizar una tabla: estado, filas copiadas y duración.
+    """
+    table_name: str
+    status: str  # 'ok' o 'error'
+    rows: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    skipped_chunks: int = 0  # Trozos sin cambios que no se transfirieron (modo checksum)
+    bytes_saved: int = 0  # Bytes estimados que no se transfirieron gracias a los checksums
+    peak_memory_bytes: int = 0  # Pico de bytes de lotes en vuelo de la tabla
+    transform_timings: Dict[str, float] = field(default_factory=dict)  # "columna:transformación" -> segundos
+    resumed: bool = False  # Terminada en una ejecución anterior de la misma copia (--resume)
+
+    @property
+    def succeeded(self) -> bool:
+        return self.status == 'ok'
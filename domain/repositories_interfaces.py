@@ -10,7 +10,7 @@ class SQLServerRepositoryInterface(ABC):
         pass
 
     @abstractmethod
-    def read_table(self, table_name: str, columns: List[str] = None):
+    def read_table(self, table_name: str, columns: List[str] = None, chunksize: int = None):
         pass
 
     @abstractmethod
@@ -20,7 +20,7 @@ class SQLServerRepositoryInterface(ABC):
 
 class PostgresRepositoryInterface(ABC):
     @abstractmethod
-    def write_table(self, df, table_name: str):
+    def write_table(self, df, table_name: str, loader: str = None):
         pass
 
     @abstractmethod
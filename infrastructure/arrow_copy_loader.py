@@ -0,0 +1,179 @@
+# infrastructure/arrow_copy_loader.py
+
+import io
+from typing import List, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from infrastructure.postgres_copy_loader import (
+    _BINARY_ENCODERS, _BINARY_HEADER, _BINARY_TRAILER, PostgresCopyLoader
+)
+from infrastructure.table_stream import quote_postgres_identifier
+
+# Diferencia entre la época Unix (Arrow) y la de PostgreSQL (2000-01-01)
+_PG_EPOCH_DAYS = 10957
+_PG_EPOCH_MICROS = _PG_EPOCH_DAYS * 86400 * 1_000_000
+_EMPTY = pa.scalar(b"", pa.large_binary())
+
+# Tipos de ancho fijo: (tipo Arrow intermedio, dtype big-endian del valor en COPY)
+_FIXED_WIDTH = {
+    'int2': (pa.int16(), '>i2'),
+    'int4': (pa.int32(), '>i4'),
+    'int8': (pa.int64(), '>i8'),
+    'float4': (pa.float32(), '>f4'),
+    'float8': (pa.float64(), '>f8'),
+}
+_TEXT_TYPES = ('text', 'varchar', 'bpchar', 'name')
+
+
+def rows_to_record_batch(rows: Sequence[tuple], column_names: List[str]) -> pa.RecordBatch:
+    """
+    Convierte las filas de un fetchmany en un RecordBatch columna a columna, sin
+    pasar por DataFrames de tipo object. Una columna que Arrow no sabe tipar (p. ej.
+    enteros y flotantes mezclados) se guarda como texto.
+    """
+    columns = list(zip(*rows)) if rows else [() for _ in column_names]
+    arrays = []
+    for values in columns:
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(pa.array([None if v is None else str(v) for v in values], pa.large_string()))
+    return pa.RecordBatch.from_arrays(arrays, names=column_names)
+
+
+def _segments(lengths: np.ndarray, data: np.ndarray) -> pa.Array:
+    """
+    Construye un array large_binary a partir de las longitudes de cada elemento y
+    de sus bytes ya concatenados.
+    """
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return pa.Array.from_buffers(
+        pa.large_binary(), len(lengths), [None, pa.py_buffer(offsets), pa.py_buffer(data)]
+    )
+
+
+def _length_prefixes(lengths: np.ndarray) -> pa.Array:
+    """
+    Prefijo de longitud (int32 big-endian) de cada campo; -1 para NULL.
+    """
+    prefixes = lengths.astype('>i4').view(np.uint8)
+    return _segments(np.full(len(lengths), 4, dtype=np.int64), prefixes)
+
+
+def _fixed_width_fields(values: np.ndarray, valid: np.ndarray) -> pa.Array:
+    """
+    Campos de COPY (longitud + valor) de una columna de ancho fijo, vectorizado con NumPy.
+    """
+    width = values.dtype.itemsize
+    matrix = np.empty((len(values), 4 + width), dtype=np.uint8)
+    matrix[:, :4] = np.where(valid, width, -1).astype('>i4').view(np.uint8).reshape(-1, 4)
+    matrix[:, 4:] = values.view(np.uint8).reshape(-1, width)
+    mask = np.ones(matrix.shape, dtype=bool)
+    mask[~valid, 4:] = False
+    return _segments(np.where(valid, 4 + width, 4), matrix[mask])
+
+
+def _variable_width_fields(array: pa.Array, valid: np.ndarray) -> pa.Array:
+    """
+    Campos de COPY de una columna large_binary: prefijo de longitud seguido de los bytes.
+    """
+    offsets = np.frombuffer(array.buffers()[1], dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    lengths = np.where(valid, np.diff(offsets), -1)
+    return pc.binary_join_element_wise(_length_prefixes(lengths), array.fill_null(b""), _EMPTY)
+
+
+def _per_value_fields(array: pa.Array, type_name: str, valid: np.ndarray) -> pa.Array:
+    """
+    Tipos sin equivalente directo en Arrow (numeric, uuid...): cada valor se codifica
+    con el codificador binario del cargador de pandas.
+    """
+    encoder = _BINARY_ENCODERS[type_name]
+    encoded = pa.array([None if v is None else encoder(v) for v in array.to_pylist()], pa.large_binary())
+    return _variable_width_fields(encoded, valid)
+
+
+def _column_fields(array: pa.Array, type_name: str) -> pa.Array:
+    valid = np.ones(len(array), dtype=bool) if array.null_count == 0 else \
+        array.is_valid().to_numpy(zero_copy_only=False)
+    if array.null_count == len(array):
+        return _length_prefixes(np.full(len(array), -1, dtype=np.int64))
+    if type_name in _FIXED_WIDTH:
+        arrow_type, dtype = _FIXED_WIDTH[type_name]
+        values = pc.fill_null(array.cast(arrow_type), 0).to_numpy()
+        return _fixed_width_fields(values.astype(dtype), valid)
+    if type_name == 'bool':
+        values = pc.fill_null(array.cast(pa.bool_()), False).to_numpy(zero_copy_only=False)
+        return _fixed_width_fields(values.astype(np.uint8), valid)
+    if type_name == 'date':
+        days = pc.fill_null(array.cast(pa.date32()).cast(pa.int32()), 0).to_numpy()
+        return _fixed_width_fields((days - _PG_EPOCH_DAYS).astype('>i4'), valid)
+    if type_name in ('timestamp', 'timestamptz'):
+        if not pa.types.is_timestamp(array.type):
+            array = array.cast(pa.timestamp('us'))
+        # Un timestamp con zona horaria se guarda en UTC: el entero ya es UTC
+        micros = pc.fill_null(array.cast(pa.timestamp('us', array.type.tz)).cast(pa.int64()), 0).to_numpy()
+        return _fixed_width_fields((micros - _PG_EPOCH_MICROS).astype('>i8'), valid)
+    if type_name == 'time':
+        micros = pc.fill_null(array.cast(pa.time64('us')).cast(pa.int64()), 0).to_numpy()
+        return _fixed_width_fields(micros.astype('>i8'), valid)
+    if type_name in _TEXT_TYPES and (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+        return _variable_width_fields(array.cast(pa.large_binary()), valid)
+    if type_name == 'bytea' and (pa.types.is_binary(array.type) or pa.types.is_large_binary(array.type)):
+        return _variable_width_fields(array.cast(pa.large_binary()), valid)
+    if type_name in _BINARY_ENCODERS:
+        return _per_value_fields(array, type_name, valid)
+    raise ValueError(f"Tipo '{type_name}' no soportado en COPY binario.")
+
+
+def encode_record_batch(batch: pa.RecordBatch, column_types: List[str]) -> bytes:
+    """
+    Serializa el RecordBatch en el formato binario de COPY. Cada columna se convierte
+    en un array de campos (longitud + valor) con operaciones vectorizadas y las filas
+    se ensamblan uniendo esos arrays elemento a elemento, sin objetos Python por celda
+    salvo en los tipos sin equivalente en Arrow (numeric, uuid).
+    """
+    count = np.full(batch.num_rows, batch.num_columns, dtype='>i2').view(np.uint8)
+    fields = [_segments(np.full(batch.num_rows, 2, dtype=np.int64), count)]
+    for name, array, type_name in zip(batch.schema.names, batch.columns, column_types):
+        try:
+            fields.append(_column_fields(array, type_name))
+        except ValueError as e:
+            raise ValueError(f"Columna '{name}': {e}") from e
+    rows = pc.binary_join_element_wise(*fields, _EMPTY) if len(fields) > 1 else fields[0]
+    offsets = np.frombuffer(rows.buffers()[1], dtype=np.int64)[rows.offset:rows.offset + len(rows) + 1]
+    data = rows.buffers()[2]
+    body = data[offsets[0]:offsets[-1]] if data is not None else b""
+    return _BINARY_HEADER + memoryview(body).tobytes() + _BINARY_TRAILER
+
+
+class ArrowCopyLoader(PostgresCopyLoader):
+    """
+    Carga RecordBatch de Arrow con COPY binario. Sustituye al DataFrame de pandas en
+    el cargador 'arrow': las columnas viajan como buffers y no como objetos Python.
+    """
+
+    def __init__(self):
+        super().__init__('binary')
+
+    def copy_dataframe(self, connection, table_name: str, batch: pa.RecordBatch):
+        """
+        Envía el RecordBatch a la tabla con COPY binario. No hace commit.
+        """
+        if batch.num_rows == 0:
+            return
+        columns = batch.schema.names
+        column_list = ", ".join(quote_postgres_identifier(c) for c in columns)
+        cursor = connection.cursor()
+        try:
+            types = self.get_column_types(cursor, table_name)
+            payload = io.BytesIO(encode_record_batch(batch, [types[c] for c in columns]))
+            cursor.copy_expert(
+                f"COPY {quote_postgres_identifier(table_name)} ({column_list}) FROM STDIN WITH (FORMAT binary)",
+                payload
+            )
+        finally:
+            cursor.close()
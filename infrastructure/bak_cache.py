@@ -0,0 +1,165 @@
+# infrastructure/bak_cache.py
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import zipfile
+from typing import Callable, List, Optional
+
+from infrastructure.config import Config
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def bak_members(zip_file_path: str) -> List[tuple]:
+    """
+    (nombre, CRC, tamaño) de los .bak del ZIP según su directorio central, que está
+    al final del archivo: no se lee ni descomprime el contenido.
+    """
+    with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+        return sorted(
+            (info.filename, info.CRC, info.file_size) for info in zip_ref.infolist()
+            if not info.is_dir() and info.filename.lower().endswith('.bak')
+        )
+
+
+def zip_fingerprint(zip_file_path: str) -> str:
+    """
+    Huella de un ZIP de copia de seguridad: ruta, tamaño, fecha de modificación y
+    CRC de los .bak según el directorio central.
+    """
+    stat = os.stat(zip_file_path)
+    members = bak_members(zip_file_path)
+    payload = json.dumps([os.path.normcase(os.path.abspath(zip_file_path)), stat.st_size, stat.st_mtime_ns, members])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class BakCache:
+    """
+    Caché local de archivos .bak extraídos, direccionada por la huella del ZIP de
+    origen: cada entrada es un directorio `<huella>` con los .bak y un manifest.json
+    con su tamaño y su último uso. Si el ZIP no ha cambiado se reutilizan los .bak
+    sin copiar ni descomprimir nada. Las entradas se expulsan por menos uso reciente
+    (LRU) para que la caché no supere `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_config(cls, base_folder: str = None) -> Optional['BakCache']:
+        """
+        Caché configurada con BAK_CACHE_DIR y BAK_CACHE_MAX_GB, o None si BAK_CACHE_DIR está
+        vacío. Una ruta relativa se toma dentro de `base_folder` (la carpeta local del .bak).
+        """
+        if not Config.BAK_CACHE_DIR:
+            return None
+        cache_dir = Config.BAK_CACHE_DIR
+        if base_folder and not os.path.isabs(cache_dir):
+            cache_dir = os.path.join(base_folder, cache_dir)
+        return cls(cache_dir, int(Config.BAK_CACHE_MAX_GB * 1024 ** 3))
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def _read_manifest(self, key: str) -> Optional[dict]:
+        path = os.path.join(self._entry_path(key), MANIFEST_NAME)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, key: str, manifest: dict):
+        path = os.path.join(self._entry_path(key), MANIFEST_NAME)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(temp_path, path)
+
+    def entries(self) -> List[dict]:
+        """
+        Entradas completas de la caché (las que tienen manifest.json), con su huella en 'key'.
+        """
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            manifest = self._read_manifest(key)
+            if manifest is not None:
+                entries.append(dict(manifest, key=key))
+        return entries
+
+    def lookup(self, key: str) -> Optional[List[str]]:
+        """
+        Rutas de los .bak de la entrada si está completa (todos los archivos con su
+        tamaño), marcándola como usada; None si no está. Una entrada dañada se elimina.
+        """
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return None
+        entry = self._entry_path(key)
+        paths = [os.path.join(entry, name) for name in manifest['files']]
+        if not all(os.path.isfile(path) and os.path.getsize(path) == size
+                   for path, size in zip(paths, manifest['files'].values())):
+            logging.warning(f"Entrada de la caché de .bak incompleta, se descarta: {entry}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        manifest['last_used'] = time.time()
+        self._write_manifest(key, manifest)
+        logging.info(f"Caché de .bak: reutilizando {manifest['zip_file']} desde {entry}")
+        return paths
+
+    def make_room(self, required_bytes: int) -> bool:
+        """
+        Expulsa las entradas usadas hace más tiempo hasta que quepan `required_bytes`
+        dentro de la cuota. False si no caben ni con la caché vacía.
+        """
+        if required_bytes > self.max_bytes:
+            return False
+        entries = sorted(self.entries(), key=lambda e: e['last_used'])
+        used = sum(e['bytes'] for e in entries)
+        while entries and used + required_bytes > self.max_bytes:
+            entry = entries.pop(0)
+            shutil.rmtree(self._entry_path(entry['key']), ignore_errors=True)
+            used -= entry['bytes']
+            logging.info(f"Caché de .bak: expulsada {entry['zip_file']} ({entry['bytes'] / 1024 ** 2:.0f} MB)")
+        return True
+
+    def store(self, key: str, zip_file_path: str,
+              extract: Callable[[str], List[str]]) -> Optional[List[str]]:
+        """
+        Crea la entrada `key` llamando a `extract(carpeta)`, que debe dejar ahí los .bak
+        y devolver sus rutas. La extracción se hace en `<huella>.tmp` y se renombra al
+        terminar, así que una extracción interrumpida nunca queda como entrada válida.
+        Devuelve None sin extraer nada si los .bak del ZIP superan la cuota.
+        """
+        required_bytes = sum(size for _, _, size in bak_members(zip_file_path))
+        if not self.make_room(required_bytes):
+            logging.warning(f"El ZIP {zip_file_path} ({required_bytes / 1024 ** 2:.0f} MB) no cabe en la "
+                            f"caché de .bak ({self.max_bytes / 1024 ** 2:.0f} MB); se extrae sin caché.")
+            return None
+        entry = self._entry_path(key)
+        temp_entry = f"{entry}.tmp"
+        shutil.rmtree(temp_entry, ignore_errors=True)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.makedirs(temp_entry)
+        try:
+            paths = extract(temp_entry)
+        except BaseException:
+            shutil.rmtree(temp_entry, ignore_errors=True)
+            raise
+        files = {os.path.basename(path): os.path.getsize(path) for path in paths}
+        os.replace(temp_entry, entry)
+        self._write_manifest(key, {
+            'zip_file': zip_file_path,
+            'files': files,
+            'bytes': sum(files.values()),
+            'created': time.time(),
+            'last_used': time.time(),
+        })
+        return [os.path.join(entry, name) for name in files]
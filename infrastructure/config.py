@@ -11,6 +11,10 @@ class Config:
     SQL_SERVER = os.getenv('SQL_SERVER', 'localhost')
     SQL_DATABASE = os.getenv('SQL_DATABASE', 'TemporaryDB')  # Name for the temporary database
     SQL_DRIVER = os.getenv('SQL_DRIVER', 'ODBC Driver 17 for SQL Server')
+    # Perfil de E/S del RESTORE (0 = valor por defecto de SQL Server)
+    SQL_RESTORE_BUFFERCOUNT = int(os.getenv('SQL_RESTORE_BUFFERCOUNT', '0'))
+    SQL_RESTORE_MAXTRANSFERSIZE = int(os.getenv('SQL_RESTORE_MAXTRANSFERSIZE', '0'))  # Bytes: múltiplo de 64 KB hasta 4 MB
+    SQL_RESTORE_BLOCKSIZE = int(os.getenv('SQL_RESTORE_BLOCKSIZE', '0'))  # Bytes: potencia de 2 entre 512 y 65536
     SQL_CONNECTION_STRING = (
         f"mssql+pyodbc://@{SQL_SERVER}/{SQL_DATABASE}"
         f"?driver={SQL_DRIVER}&trusted_connection=yes"
@@ -26,6 +30,55 @@ class Config:
         f"postgresql+psycopg2://{PG_USER}:{PG_PASSWORD}@{PG_SERVER}:{PG_PORT}/{PG_DATABASE}"
     )
 
+    # Sincronización SQL Server -> PostgreSQL
+    # Tablas separadas por comas (vacío = descubrir todas las del catálogo) y patrones para filtrarlas
+    SYNC_TABLES = [t.strip() for t in os.getenv('SYNC_TABLES', 'prv,age,cli').split(',') if t.strip()]
+    SYNC_INCLUDE = [p.strip() for p in os.getenv('SYNC_INCLUDE', '').split(',') if p.strip()]
+    SYNC_EXCLUDE = [p.strip() for p in os.getenv('SYNC_EXCLUDE', '').split(',') if p.strip()]
+    SYNC_LARGEST_FIRST = os.getenv('SYNC_LARGEST_FIRST', 'true').lower() == 'true'  # Tablas grandes primero (LPT)
+    SYNC_CHUNK_SIZE = int(os.getenv('SYNC_CHUNK_SIZE', '50000'))  # Filas por lote fijas (con SYNC_ADAPTIVE_BATCH=false)
+    SYNC_LOADER = os.getenv('SYNC_LOADER', 'copy_text')  # to_sql, copy_text, copy_binary o arrow
+    SYNC_MAX_WORKERS = int(os.getenv('SYNC_MAX_WORKERS', '4'))  # Tablas sincronizadas en paralelo
+    SYNC_PARTITION_KEY = os.getenv('SYNC_PARTITION_KEY', 'ide')  # Clave entera para particionar tablas grandes
+    SYNC_PARTITION_WORKERS = int(os.getenv('SYNC_PARTITION_WORKERS', '4'))  # Particiones de una tabla en paralelo
+    # Tamaño de lote adaptativo por tabla: parte de SYNC_BATCH_TARGET_MB según el ancho de fila
+    # (o del tamaño guardado en la ejecución anterior) y busca el de más filas/s entre los límites
+    SYNC_ADAPTIVE_BATCH = os.getenv('SYNC_ADAPTIVE_BATCH', 'true').lower() == 'true'
+    SYNC_BATCH_TARGET_MB = int(os.getenv('SYNC_BATCH_TARGET_MB', '16'))
+    SYNC_BATCH_MIN_ROWS = int(os.getenv('SYNC_BATCH_MIN_ROWS', '1000'))
+    SYNC_BATCH_MAX_ROWS = int(os.getenv('SYNC_BATCH_MAX_ROWS', '1000000'))
+    # Lectura, transformación y carga solapadas en hilos, con colas de SYNC_PIPELINE_QUEUE_SIZE lotes
+    SYNC_PIPELINE = os.getenv('SYNC_PIPELINE', 'true').lower() == 'true'
+    SYNC_PIPELINE_QUEUE_SIZE = int(os.getenv('SYNC_PIPELINE_QUEUE_SIZE', '2'))
+    # Memoria máxima para los lotes en vuelo de todos los workers (lectura, colas y escritura)
+    SYNC_MEMORY_BUDGET_MB = int(os.getenv('SYNC_MEMORY_BUDGET_MB', '4096'))
+    # Procesos para las transformaciones (0 = en un hilo del pipeline); el pool se comparte entre tablas
+    SYNC_TRANSFORM_PROCESSES = int(os.getenv('SYNC_TRANSFORM_PROCESSES', '0'))
+    # Ajustes de sesión de las conexiones de carga (libpq options) y tablas de staging
+    SYNC_PG_SESSION_OPTIONS = os.getenv('SYNC_PG_SESSION_OPTIONS', '-c synchronous_commit=off')
+    # La staging se carga UNLOGGED y pasa a LOGGED antes de publicarse: una tabla UNLOGGED se vacía si
+    # PostgreSQL se cae. Con 'false' se publica UNLOGGED (más rápido, solo si se asume recargarla entera)
+    SYNC_STAGING_SET_LOGGED = os.getenv('SYNC_STAGING_SET_LOGGED', 'true').lower() == 'true'
+    # Estructura de las tablas destino: 'catalog' (DDL desde el catálogo de SQL Server) o 'pandas'
+    SYNC_SCHEMA_SOURCE = os.getenv('SYNC_SCHEMA_SOURCE', 'catalog')
+    SCHEMA_CACHE_DIR = os.getenv('SCHEMA_CACHE_DIR', 'schema_cache')  # Esquemas traducidos por huella de backup
+    # Construcción de índices tras la carga
+    SYNC_INDEX_WORKERS = int(os.getenv('SYNC_INDEX_WORKERS', '4'))  # Índices de una tabla creados en paralelo
+    SYNC_MAINTENANCE_WORK_MEM = os.getenv('SYNC_MAINTENANCE_WORK_MEM', '512MB')
+    # Claves foráneas de origen: orden de carga por dependencias y creación en destino
+    SYNC_FOREIGN_KEYS = os.getenv('SYNC_FOREIGN_KEYS', 'true').lower() == 'true'
+    SYNC_CHECKSUM_CHUNK_WIDTH = int(os.getenv('SYNC_CHECKSUM_CHUNK_WIDTH', '50000'))  # Ancho de clave de cada trozo con checksum
+    # Tablas con checksums y columnas text/ntext/image/xml: 'hash' (HASHBYTES de esas columnas) o 'full' (recarga completa)
+    SYNC_CHECKSUM_LOB = os.getenv('SYNC_CHECKSUM_LOB', 'hash')
+
+    # Extracción del .bak desde el ZIP: tamaño de bloque y espacio libre mínimo tras extraer
+    EXTRACT_BUFFER_MB = int(os.getenv('EXTRACT_BUFFER_MB', '16'))
+    EXTRACT_FREE_SPACE_MARGIN_MB = int(os.getenv('EXTRACT_FREE_SPACE_MARGIN_MB', '1024'))
+    # Caché de .bak extraídos por huella del ZIP, con expulsión LRU por cuota. Desactivada por defecto;
+    # una ruta relativa cuelga de la carpeta local del .bak (RESTORE lee de ella con la cuenta de SQL Server)
+    BAK_CACHE_DIR = os.getenv('BAK_CACHE_DIR', '')
+    BAK_CACHE_MAX_GB = float(os.getenv('BAK_CACHE_MAX_GB', '100'))
+
     # Network Share Credentials
     NETWORK_SHARE_USER = os.getenv('NETWORK_SHARE_USER')  # From .env
     NETWORK_SHARE_PASSWORD = os.getenv('NETWORK_SHARE_PASSWORD')  # From .env
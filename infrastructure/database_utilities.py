@@ -3,9 +3,14 @@
 import logging
 import subprocess
 from infrastructure.config import Config  # Importar solo la clase Config
+from infrastructure.sql_server_executor import SqlServerError, SqlServerExecutor
 import os
 import glob
+import hashlib
+import shutil
+import time
 import zipfile
+import zlib
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -65,44 +70,105 @@ class DatabaseUtilities:
         return latest_file
 
     @staticmethod
-    def extract_bak_from_zip(zip_file_path):
-        """
-        Extrae el archivo .bak del archivo ZIP especificado.
-        """
+    def extract_bak_from_zip(zip_file_path, destination_folder=None, buffer_size=None):
+        """
+        Extrae los archivos .bak del ZIP especificado directamente en `destination_folder`
+        (por defecto el directorio actual), sin copias intermedias. Cada miembro se
+        descomprime en bloques de `buffer_size` bytes (EXTRACT_BUFFER_MB) a un archivo
+        temporal junto al destino, calculando al vuelo su CRC-32 y su SHA-256; si el
+        CRC no coincide con el del ZIP se descarta. Antes de empezar se comprueba que
+        haya espacio libre para todos los miembros más EXTRACT_FREE_SPACE_MARGIN_MB.
+        """
+        destination_folder = os.path.abspath(destination_folder or os.getcwd())
+        buffer_size = buffer_size or Config.EXTRACT_BUFFER_MB * 1024 * 1024
+        os.makedirs(destination_folder, exist_ok=True)
         with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-            bak_files = [f for f in zip_ref.namelist() if f.lower().endswith('.bak')]
-            if not bak_files:
+            members = [
+                info for info in zip_ref.infolist()
+                if not info.is_dir() and info.filename.lower().endswith('.bak')
+            ]
+            if not members:
                 raise FileNotFoundError("No se encontraron archivos .bak en el archivo ZIP.")
-            zip_ref.extractall(members=bak_files)
-            logging.info(f"Archivos .bak extraídos: {bak_files}")
-            extracted_bak_files = [os.path.abspath(f) for f in bak_files]
+            DatabaseUtilities.check_free_space(destination_folder, sum(info.file_size for info in members))
+
+            extracted_bak_files = []
+            for info in members:
+                destination = os.path.join(destination_folder, os.path.basename(info.filename))
+                if os.path.exists(destination):
+                    logging.warning(f"El archivo ya existe en {destination}. Será sobrescrito.")
+                DatabaseUtilities._stream_member(zip_ref, info, destination, buffer_size)
+                extracted_bak_files.append(destination)
             return extracted_bak_files
 
     @staticmethod
-    def restore_database_from_bak(bak_file_path):
+    def check_free_space(folder, required_bytes):
+        """
+        Lanza OSError si `folder` no tiene `required_bytes` libres más el margen configurado.
+        """
+        margin = Config.EXTRACT_FREE_SPACE_MARGIN_MB * 1024 * 1024
+        free = shutil.disk_usage(folder).free
+        if free < required_bytes + margin:
+            raise OSError(
+                f"Espacio insuficiente en {folder}: se necesitan {(required_bytes + margin) / 1024 ** 2:.0f} MB "
+                f"({required_bytes / 1024 ** 2:.0f} MB de .bak y {margin / 1024 ** 2:.0f} MB de margen) "
+                f"y hay {free / 1024 ** 2:.0f} MB libres."
+            )
+
+    @staticmethod
+    def _stream_member(zip_ref, info, destination, buffer_size):
+        """
+        Descomprime un miembro del ZIP en `destination` por bloques y devuelve su SHA-256.
+        """
+        partial = destination + '.part'
+        crc, sha256, written = 0, hashlib.sha256(), 0
+        start = time.perf_counter()
+        try:
+            with zip_ref.open(info) as source, open(partial, 'wb', buffering=0) as target:
+                while True:
+                    block = source.read(buffer_size)
+                    if not block:
+                        break
+                    crc = zlib.crc32(block, crc)
+                    sha256.update(block)
+                    target.write(block)
+                    written += len(block)
+            if crc != info.CRC or written != info.file_size:
+                raise zipfile.BadZipFile(
+                    f"{info.filename} está corrupto: CRC {crc:08x} y {written} bytes, "
+                    f"se esperaban {info.CRC:08x} y {info.file_size} bytes."
+                )
+            os.replace(partial, destination)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        elapsed = time.perf_counter() - start
+        digest = sha256.hexdigest()
+        logging.info(
+            f"Archivo .bak extraído: {destination} ({written / 1024 ** 2:.0f} MB en {elapsed:.1f} s, "
+            f"{written / 1024 ** 2 / max(elapsed, 1e-6):.1f} MB/s, CRC {crc:08x}, SHA-256 {digest})"
+        )
+        return digest
+
+    @staticmethod
+    def restore_database_from_bak(bak_file_path, executor=None):
         """
         Restaura la base de datos SQL Server a partir de un archivo .bak.
         """
         if not os.path.exists(bak_file_path):
             raise FileNotFoundError(f"El archivo .bak no existe en la ruta especificada: {bak_file_path}")
 
+        bak_literal = bak_file_path.replace("'", "''")
         restore_script = f"""
         RESTORE DATABASE [{Config.SQL_DATABASE}] 
-        FROM DISK = N'{bak_file_path}' 
+        FROM DISK = N'{bak_literal}' 
         WITH FILE = 1, NOUNLOAD, REPLACE, STATS = 5;
         """
 
-        cmd = [
-            'sqlcmd',
-            '-S', Config.SQL_SERVER,
-            '-E',  # Usar autenticación de Windows
-            '-Q', restore_script
-        ]
-
         try:
-            subprocess.run(cmd, check=True, shell=False)
+            (executor or SqlServerExecutor.shared()).execute(restore_script)
             logging.info(f"Base de datos {Config.SQL_DATABASE} restaurada correctamente.")
-        except subprocess.CalledProcessError as e:
+        except SqlServerError as e:
             logging.error(f"Error al restaurar la base de datos: {e}")
             raise
 
@@ -128,7 +194,7 @@ class DatabaseUtilities:
         DatabaseUtilities.unmap_network_drive()
 
     @staticmethod
-    def delete_sql_server_database():
+    def delete_sql_server_database(executor=None):
         """
         Elimina la base de datos temporal de SQL Server.
         """
@@ -137,22 +203,15 @@ class DatabaseUtilities:
             f"DROP DATABASE [{Config.SQL_DATABASE}];"
         )
 
-        cmd = [
-            'sqlcmd',
-            '-S', Config.SQL_SERVER,
-            '-E',  # Usar autenticación de Windows
-            '-Q', delete_script
-        ]
-
         try:
-            # Ejecutar el comando sin pasarlo como una sola cadena con comillas
-            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-            print(f"Base de datos {Config.SQL_DATABASE} eliminada correctamente.")
-            print(result.stdout)
-        except subprocess.CalledProcessError as e:
-            print(f"Error al eliminar la base de datos {Config.SQL_DATABASE}: {e}")
-            print("Salida estándar:", e.stdout)
-            print("Salida de error:", e.stderr)
+            result_sets = (executor or SqlServerExecutor.shared()).execute(delete_script)
+            logging.info(f"Base de datos {Config.SQL_DATABASE} eliminada correctamente.")
+            for message in (m for result in result_sets for m in result.messages):
+                logging.info(message)
+        except SqlServerError as e:
+            logging.error(f"Error al eliminar la base de datos {Config.SQL_DATABASE}: {e}")
+            for message in e.messages:
+                logging.info(message)
             raise
 
     @staticmethod
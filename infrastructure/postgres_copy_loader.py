@@ -0,0 +1,379 @@
+# infrastructure/postgres_copy_loader.py
+
+import io
+import math
+import struct
+import uuid
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from infrastructure.table_stream import quote_postgres_identifier
+
+# Cargadores disponibles: el de pandas (INSERT por filas), COPY en formato texto o binario
+# desde DataFrames y 'arrow', que lee y escribe RecordBatch de Arrow con COPY binario
+LOADERS = ('to_sql', 'copy_text', 'copy_binary', 'arrow')
+
+_PG_EPOCH_DATE = date(2000, 1, 1)
+_PG_EPOCH = datetime(2000, 1, 1)
+_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_BINARY_TRAILER = struct.pack(">h", -1)
+_TEXT_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _is_null(value) -> bool:
+    if value is None or value is pd.NaT or value is pd.NA:
+        return True
+    if isinstance(value, float):
+        return math.isnan(value)
+    if isinstance(value, np.generic) or isinstance(value, Decimal):
+        try:
+            return bool(pd.isna(value))
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _to_datetime(value) -> datetime:
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    elif isinstance(value, np.datetime64):
+        value = pd.Timestamp(value).to_pydatetime()
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def format_text_value(value) -> str:
+    """
+    Convierte un valor Python/NumPy a su representación textual en PostgreSQL,
+    sin escapar. Los flotantes enteros se emiten sin decimales para que una
+    columna entera con NULL (float64 en pandas) se pueda cargar en INTEGER.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return 't' if value else 'f'
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        value = float(value)
+        if math.isinf(value):
+            return 'Infinity' if value > 0 else '-Infinity'
+        if value.is_integer() and abs(value) < 1e16:
+            return str(int(value))
+        return repr(value)
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (pd.Timestamp, np.datetime64, datetime)):
+        return _to_datetime(value).isoformat(sep=' ')
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (pd.Timedelta, timedelta)):
+        return f"{pd.Timedelta(value).total_seconds()} seconds"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    return str(value)
+
+
+def encode_text_value(value) -> str:
+    """
+    Codifica un valor para COPY en formato texto: NULL como \\N y tabuladores,
+    saltos de línea y barras invertidas escapados.
+    """
+    if _is_null(value):
+        return "\\N"
+    return format_text_value(value).translate(_TEXT_ESCAPES)
+
+
+def encode_text_rows(df: pd.DataFrame) -> str:
+    """
+    Serializa el DataFrame completo en formato texto de COPY (una línea por fila).
+    """
+    columns = [[encode_text_value(value) for value in df[column].tolist()] for column in df.columns]
+    return "".join("\t".join(row) + "\n" for row in zip(*columns))
+
+
+def encode_numeric(value) -> bytes:
+    """
+    Codifica un Decimal en el formato binario de NUMERIC (dígitos en base 10000).
+    """
+    value = Decimal(value)
+    if value.is_nan():
+        return struct.pack(">hhHH", 0, 0, 0xC000, 0)
+    sign, digits, exponent = value.as_tuple()
+    digits = "".join(str(d) for d in digits)
+    if exponent > 0:
+        digits += "0" * exponent
+        exponent = 0
+    dscale = -exponent
+    integer_length = len(digits) - dscale
+    if integer_length > 0:
+        integer_part, fraction_part = digits[:integer_length], digits[integer_length:]
+    else:
+        integer_part, fraction_part = "", "0" * -integer_length + digits
+    integer_part = integer_part.lstrip("0")
+    integer_part = "0" * (-len(integer_part) % 4) + integer_part
+    fraction_part = fraction_part + "0" * (-len(fraction_part) % 4)
+    groups = [int(integer_part[i:i + 4]) for i in range(0, len(integer_part), 4)]
+    groups += [int(fraction_part[i:i + 4]) for i in range(0, len(fraction_part), 4)]
+    weight = len(integer_part) // 4 - 1
+    while groups and groups[0] == 0:
+        groups.pop(0)
+        weight -= 1
+    while groups and groups[-1] == 0:
+        groups.pop()
+    if not groups:
+        return struct.pack(">hhHH", 0, 0, 0, dscale)
+    return struct.pack(f">hhHH{len(groups)}H", len(groups), weight, 0x4000 if sign else 0, dscale, *groups)
+
+
+def _encode_text_binary(value) -> bytes:
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return format_text_value(value).encode("utf-8")
+
+
+def _encode_timestamp(value) -> bytes:
+    return struct.pack(">q", (_to_datetime(value) - _PG_EPOCH) // timedelta(microseconds=1))
+
+
+def _encode_date(value) -> bytes:
+    if isinstance(value, (pd.Timestamp, np.datetime64, datetime)):
+        value = _to_datetime(value).date()
+    return struct.pack(">i", (value - _PG_EPOCH_DATE).days)
+
+
+def _encode_time(value) -> bytes:
+    micros = ((value.hour * 60 + value.minute) * 60 + value.second) * 1_000_000 + value.microsecond
+    return struct.pack(">q", micros)
+
+
+def _encode_numeric_value(value) -> bytes:
+    if isinstance(value, (float, np.floating)):
+        # repr da la representación decimal más corta que reproduce el flotante
+        value = repr(float(value))
+    elif isinstance(value, np.integer):
+        value = int(value)
+    return encode_numeric(value)
+
+
+def _encode_uuid(value) -> bytes:
+    return (value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))).bytes
+
+
+# Codificadores binarios por nombre de tipo (pg_type.typname)
+_BINARY_ENCODERS = {
+    'bool': lambda v: b"\x01" if v else b"\x00",
+    'int2': lambda v: struct.pack(">h", int(v)),
+    'int4': lambda v: struct.pack(">i", int(v)),
+    'int8': lambda v: struct.pack(">q", int(v)),
+    'float4': lambda v: struct.pack(">f", float(v)),
+    'float8': lambda v: struct.pack(">d", float(v)),
+    'numeric': _encode_numeric_value,
+    'text': _encode_text_binary,
+    'varchar': _encode_text_binary,
+    'bpchar': _encode_text_binary,
+    'name': _encode_text_binary,
+    'date': _encode_date,
+    'timestamp': _encode_timestamp,
+    'timestamptz': _encode_timestamp,
+    'time': _encode_time,
+    'bytea': lambda v: bytes(v),
+    'uuid': _encode_uuid,
+}
+
+
+def encode_binary_rows(df: pd.DataFrame, column_types: List[str]) -> bytes:
+    """
+    Serializa el DataFrame en el formato binario de COPY. `column_types` indica el
+    tipo PostgreSQL (typname) de cada columna, en el mismo orden que el DataFrame.
+    """
+    encoders = []
+    for column, type_name in zip(df.columns, column_types):
+        if type_name not in _BINARY_ENCODERS:
+            raise ValueError(f"Tipo '{type_name}' de la columna '{column}' no soportado en COPY binario.")
+        encoders.append(_BINARY_ENCODERS[type_name])
+
+    buffer = io.BytesIO()
+    buffer.write(_BINARY_HEADER)
+    field_count = struct.pack(">h", len(encoders))
+    null_field = struct.pack(">i", -1)
+    for row in df.itertuples(index=False, name=None):
+        buffer.write(field_count)
+        for value, encoder in zip(row, encoders):
+            if _is_null(value):
+                buffer.write(null_field)
+            else:
+                data = encoder(value)
+                buffer.write(struct.pack(">i", len(data)))
+                buffer.write(data)
+    buffer.write(_BINARY_TRAILER)
+    return buffer.getvalue()
+
+
+class PostgresCopyLoader:
+    """
+    Carga DataFrames en PostgreSQL con COPY ... FROM STDIN mediante copy_expert de psycopg2.
+    """
+
+    def __init__(self, copy_format: str = 'text'):
+        if copy_format not in ('text', 'binary'):
+            raise ValueError(f"Formato de COPY no soportado: {copy_format}")
+        self.copy_format = copy_format
+
+    @staticmethod
+    def get_column_types(cursor, table_name: str) -> Dict[str, str]:
+        """
+        Devuelve {columna: typname} de la tabla destino.
+        """
+        cursor.execute(
+            """
+            SELECT a.attname, t.typname
+            FROM pg_attribute a
+            JOIN pg_type t ON t.oid = a.atttypid
+            WHERE a.attrelid = %s::regclass AND a.attnum > 0 AND NOT a.attisdropped
+            ORDER BY a.attnum
+            """,
+            (quote_postgres_identifier(table_name),)
+        )
+        return dict(cursor.fetchall())
+
+    def copy_dataframe(self, connection, table_name: str, df: pd.DataFrame):
+        """
+        Envía el DataFrame a la tabla con COPY. No hace commit: lo decide quien llama.
+        """
+        if df.empty:
+            return
+        column_list = ", ".join(quote_postgres_identifier(str(c)) for c in df.columns)
+        statement = f"COPY {quote_postgres_identifier(table_name)} ({column_list}) FROM STDIN"
+        cursor = connection.cursor()
+        try:
+            if self.copy_format == 'binary':
+                types = self.get_column_types(cursor, table_name)
+                payload = io.BytesIO(encode_binary_rows(df, [types[str(c)] for c in df.columns]))
+                cursor.copy_expert(statement + " WITH (FORMAT binary)", payload)
+            else:
+                payload = io.StringIO(encode_text_rows(df))
+                cursor.copy_expert(statement, payload)
+        finally:
+            cursor.close()
+
+
+def make_copy_loader(loader: str) -> PostgresCopyLoader:
+    """
+    Devuelve el cargador COPY para el nombre de cargador indicado.
+    """
+    if loader == 'arrow':
+        from infrastructure.arrow_copy_loader import ArrowCopyLoader
+        return ArrowCopyLoader()
+    return PostgresCopyLoader('binary' if loader == 'copy_binary' else 'text')
+
+
+def _column_names(frame) -> List[str]:
+    if isinstance(frame, pd.DataFrame):
+        return [str(c) for c in frame.columns]
+    return list(frame.schema.names)
+
+
+def write_dataframe(engine, df, table_name: str, loader: str = 'copy_text', replace: bool = True):
+    """
+    Escribe el DataFrame (o el RecordBatch, con el cargador 'arrow') en PostgreSQL con
+    el cargador indicado. Con `replace` la tabla destino se recrea a partir de los tipos
+    del DataFrame.
+    """
+    if loader not in LOADERS:
+        raise ValueError(f"Cargador desconocido: {loader}. Opciones: {', '.join(LOADERS)}")
+    if loader == 'to_sql':
+        df.to_sql(table_name, engine, if_exists='replace' if replace else 'append', index=False)
+        return
+
+    if replace:
+        # Solo la estructura: los datos van por COPY
+        sample = df if isinstance(df, pd.DataFrame) else df.slice(0, 0).to_pandas()
+        sample.head(0).to_sql(table_name, engine, if_exists='replace', index=False)
+    connection = engine.raw_connection()
+    try:
+        make_copy_loader(loader).copy_dataframe(connection, table_name, df)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        logging.error(f"Error en COPY hacia la tabla '{table_name}'.")
+        raise
+    finally:
+        connection.close()
+
+
+def build_upsert_statement(table_name: str, source_table: str, columns: List[str],
+                           key_columns: List[str]) -> str:
+    """
+    Construye el INSERT ... ON CONFLICT que vuelca la tabla temporal sobre la destino.
+    """
+    column_list = ", ".join(quote_postgres_identifier(c) for c in columns)
+    key_list = ", ".join(quote_postgres_identifier(c) for c in key_columns)
+    updates = [f"{quote_postgres_identifier(c)} = EXCLUDED.{quote_postgres_identifier(c)}"
+               for c in columns if c not in key_columns]
+    conflict_action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+    return (
+        f"INSERT INTO {quote_postgres_identifier(table_name)} ({column_list}) "
+        f"SELECT {column_list} FROM {quote_postgres_identifier(source_table)} "
+        f"ON CONFLICT ({key_list}) {conflict_action}"
+    )
+
+
+def upsert_dataframe(engine, df, table_name: str, key_columns: List[str],
+                     loader: str = 'copy_text'):
+    """
+    Inserta o actualiza las filas del DataFrame (o RecordBatch) según `key_columns`. Las
+    filas se cargan con COPY en una tabla temporal y se vuelcan con un único INSERT ... ON CONFLICT.
+    """
+    if len(df) == 0:
+        return
+    temp_table = f"etl_upsert_{table_name}"[:63]
+    columns = _column_names(df)
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(
+            f"CREATE TEMP TABLE {quote_postgres_identifier(temp_table)} "
+            f"(LIKE {quote_postgres_identifier(table_name)} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        make_copy_loader(loader).copy_dataframe(connection, temp_table, df)
+        cursor.execute(build_upsert_statement(table_name, temp_table, columns, key_columns))
+        cursor.close()
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        logging.error(f"Error en el upsert sobre la tabla '{table_name}'.")
+        raise
+    finally:
+        connection.close()
+
+
+def replace_rows(engine, frames, table_name: str, delete_where: str, delete_params: tuple = (),
+                 loader: str = 'copy_text') -> int:
+    """
+    Borra las filas de la tabla que cumplen `delete_where` y carga en su lugar los
+    DataFrames (o RecordBatch) de `frames`, todo en una misma transacción. Devuelve las
+    filas cargadas.
+    """
+    copy_loader = make_copy_loader(loader)
+    total_rows = 0
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f"DELETE FROM {quote_postgres_identifier(table_name)} WHERE {delete_where}", delete_params)
+        cursor.close()
+        for df in frames:
+            copy_loader.copy_dataframe(connection, table_name, df)
+            total_rows += len(df)
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        logging.error(f"Error al reemplazar filas de la tabla '{table_name}'.")
+        raise
+    finally:
+        connection.close()
+    return total_rows
@@ -4,14 +4,18 @@ from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from domain.repositories_interfaces import PostgresRepositoryInterface
 from infrastructure import config
+from infrastructure.postgres_copy_loader import write_dataframe
 
 
 class PostgresRepository(PostgresRepositoryInterface):
     def __init__(self):
         self.engine: Engine = create_engine(config.PG_CONNECTION_STRING)
 
-    def write_table(self, df, table_name: str):
-        df.to_sql(table_name, self.engine, if_exists='replace', index=False)
+    def write_table(self, df, table_name: str, loader: str = None):
+        """
+        Recrea la tabla y carga el DataFrame con el cargador indicado (COPY por defecto).
+        """
+        write_dataframe(self.engine, df, table_name, loader or config.Config.SYNC_LOADER)
 
     def close_connection(self):
         self.engine.dispose()
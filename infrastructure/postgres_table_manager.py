@@ -0,0 +1,267 @@
+# infrastructure/postgres_table_manager.py
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import pandas as pd
+from sqlalchemy import Numeric, text
+from infrastructure.schema_translator import build_create_table
+from infrastructure.table_stream import quote_postgres_identifier
+
+
+class PostgresTableManager:
+    """
+    Operaciones de estructura sobre las tablas destino de PostgreSQL.
+    """
+
+    STAGING_SUFFIX = "__staging"
+    OLD_SUFFIX = "__old"
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    @classmethod
+    def staging_name(cls, table_name: str) -> str:
+        """
+        Nombre de la tabla de staging donde se carga una tabla antes del intercambio.
+        """
+        return f"{table_name}{cls.STAGING_SUFFIX}"
+
+    def drop_table(self, table_name: str):
+        with self.engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {quote_postgres_identifier(table_name)}"))
+
+    def create_table_from_frame(self, table_name: str, frame, unlogged: bool = True):
+        """
+        (Re)crea una tabla vacía con la estructura que pandas deduce del DataFrame.
+        UNLOGGED evita escribir WAL durante la carga masiva. Las columnas de Decimal
+        se crean como NUMERIC (pandas las crearía como TEXT).
+        """
+        self.drop_table(table_name)
+        decimals = {column: Numeric() for column in frame.columns
+                    if pd.api.types.infer_dtype(frame[column], skipna=True) == 'decimal'}
+        frame.head(0).to_sql(table_name, self.engine, if_exists='replace', index=False, dtype=decimals or None)
+        if unlogged:
+            with self.engine.begin() as connection:
+                connection.execute(text(f"ALTER TABLE {quote_postgres_identifier(table_name)} SET UNLOGGED"))
+
+    def execute_ddl(self, statement: str):
+        with self.engine.begin() as connection:
+            connection.execute(text(statement))
+
+    def create_table_from_schema(self, table_name: str, columns: List[dict], unlogged: bool = True):
+        """
+        (Re)crea una tabla vacía con los tipos traducidos del catálogo de SQL Server.
+        """
+        self.drop_table(table_name)
+        self.execute_ddl(build_create_table(table_name, columns, unlogged=unlogged))
+
+    def set_logged(self, table_name: str):
+        """
+        Convierte la tabla en LOGGED para que sobreviva a una caída del servidor.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {quote_postgres_identifier(table_name)} SET LOGGED"))
+
+    def dependent_views(self, connection, table_name: str) -> List[tuple]:
+        """
+        Vistas (y vistas materializadas) que dependen de la tabla, directa o
+        indirectamente, con su definición: [(nombre, relkind, definición)] en el
+        orden en que hay que volver a crearlas.
+        """
+        return connection.execute(
+            text(
+                """
+                WITH RECURSIVE views (oid, level) AS (
+                    SELECT r.ev_class, 1
+                    FROM pg_depend d JOIN pg_rewrite r ON r.oid = d.objid
+                    WHERE d.classid = 'pg_rewrite'::regclass AND d.refclassid = 'pg_class'::regclass
+                      AND d.refobjid = to_regclass(:table_name) AND r.ev_class <> d.refobjid
+                    UNION ALL
+                    SELECT r.ev_class, v.level + 1
+                    FROM views v
+                    JOIN pg_depend d ON d.refobjid = v.oid AND d.classid = 'pg_rewrite'::regclass
+                                    AND d.refclassid = 'pg_class'::regclass
+                    JOIN pg_rewrite r ON r.oid = d.objid
+                    WHERE r.ev_class <> v.oid
+                )
+                SELECT c.oid::regclass::text, c.relkind, pg_get_viewdef(c.oid)
+                FROM views v JOIN pg_class c ON c.oid = v.oid
+                GROUP BY c.oid, c.relkind
+                ORDER BY MAX(v.level), c.oid
+                """
+            ),
+            {"table_name": quote_postgres_identifier(table_name)}
+        ).fetchall()
+
+    @staticmethod
+    def create_view_statement(view_name: str, relkind: str, definition: str) -> str:
+        kind = "MATERIALIZED VIEW" if relkind == 'm' else "VIEW"
+        return f"CREATE {kind} {view_name} AS {definition.strip().rstrip(';')}"
+
+    def swap_tables(self, staging_table: str, table_name: str):
+        """
+        Sustituye la tabla publicada por la de staging en una única transacción: los
+        lectores ven la versión anterior completa hasta el COMMIT y la nueva después.
+        Los índices de staging se renombran al nombre definitivo. Las vistas que
+        dependen de la tabla se eliminan con la versión anterior y se vuelven a crear
+        sobre la nueva en la misma transacción (si alguna ya no es válida, el
+        intercambio falla y la tabla publicada no cambia). Las claves foráneas de
+        otras tablas que apuntan a la versión anterior se eliminan y se vuelven a
+        crear cuando esas tablas terminan de sincronizarse.
+        """
+        live = quote_postgres_identifier(table_name)
+        old_name = f"{table_name}{self.OLD_SUFFIX}"
+        old = quote_postgres_identifier(old_name)
+        with self.engine.begin() as connection:
+            connection.execute(text("SET LOCAL synchronous_commit = on"))
+            # Las definiciones se leen antes del RENAME, mientras apuntan al nombre publicado
+            views = self.dependent_views(connection, table_name)
+            connection.execute(text(f"DROP TABLE IF EXISTS {old}"))
+            connection.execute(text(f"ALTER TABLE IF EXISTS {live} RENAME TO {old}"))
+            connection.execute(text(
+                f"ALTER TABLE {quote_postgres_identifier(staging_table)} RENAME TO {live}"
+            ))
+            dependents = connection.execute(
+                text(
+                    "SELECT conrelid::regclass::text || '.' || conname FROM pg_constraint "
+                    "WHERE contype = 'f' AND confrelid = to_regclass(:old) AND conrelid <> confrelid"
+                ),
+                {"old": old}
+            ).scalars().all()
+            if dependents:
+                logging.info(f"Tabla '{table_name}': se eliminan las claves foráneas que apuntaban a la "
+                             f"versión anterior ({', '.join(dependents)}).")
+            if views:
+                logging.info(f"Tabla '{table_name}': se eliminan y se vuelven a crear las vistas dependientes "
+                             f"({', '.join(name for name, _, _ in views)}).")
+            # CASCADE solo si hay dependencias conocidas: cualquier otra hace fallar el intercambio
+            cascade = " CASCADE" if dependents or views else ""
+            connection.execute(text(f"DROP TABLE IF EXISTS {old}{cascade}"))
+            for view_name, relkind, definition in views:
+                connection.execute(text(self.create_view_statement(view_name, relkind, definition)))
+            index_names = connection.execute(
+                text(
+                    "SELECT indexname FROM pg_indexes "
+                    "WHERE schemaname = current_schema() AND tablename = :table_name"
+                ),
+                {"table_name": table_name}
+            ).scalars().all()
+            for index_name in index_names:
+                if index_name.startswith(staging_table):
+                    new_name = (table_name + index_name[len(staging_table):])[:63]
+                    connection.execute(text(
+                        f"ALTER INDEX {quote_postgres_identifier(index_name)} "
+                        f"RENAME TO {quote_postgres_identifier(new_name)}"
+                    ))
+        logging.info(f"Tabla '{table_name}' publicada (intercambio con '{staging_table}').")
+
+    def table_exists(self, table_name: str) -> bool:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                text("SELECT to_regclass(:name) IS NOT NULL"),
+                {"name": quote_postgres_identifier(table_name)}
+            ).scalar()
+
+    def is_unlogged(self, table_name: str) -> bool:
+        """
+        True si la tabla es UNLOGGED: PostgreSQL la vacía tras una caída del servidor.
+        """
+        with self.engine.connect() as connection:
+            return bool(connection.execute(
+                text("SELECT relpersistence = 'u' FROM pg_class WHERE oid = to_regclass(:name)"),
+                {"name": quote_postgres_identifier(table_name)}
+            ).scalar())
+
+    def count_rows(self, table_name: str) -> int:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                text(f"SELECT COUNT(*) FROM {quote_postgres_identifier(table_name)}")
+            ).scalar()
+
+    def drop_indexes(self, table_name: str):
+        """
+        Elimina la clave primaria, las restricciones únicas y los índices de la tabla,
+        p. ej. los que quedaron a medias en una staging que se va a reutilizar.
+        """
+        with self.engine.begin() as connection:
+            constraints = connection.execute(
+                text("SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:table_name) "
+                     "AND contype IN ('p', 'u')"),
+                {"table_name": quote_postgres_identifier(table_name)}
+            ).scalars().all()
+            for constraint in constraints:
+                connection.execute(text(
+                    f"ALTER TABLE {quote_postgres_identifier(table_name)} "
+                    f"DROP CONSTRAINT {quote_postgres_identifier(constraint)}"
+                ))
+            index_names = connection.execute(
+                text("SELECT indexname FROM pg_indexes "
+                     "WHERE schemaname = current_schema() AND tablename = :table_name"),
+                {"table_name": table_name}
+            ).scalars().all()
+            for index_name in index_names:
+                connection.execute(text(f"DROP INDEX IF EXISTS {quote_postgres_identifier(index_name)}"))
+
+    def foreign_key_exists(self, table_name: str, constraint_name: str) -> bool:
+        with self.engine.connect() as connection:
+            return connection.execute(
+                text(
+                    "SELECT EXISTS (SELECT 1 FROM pg_constraint "
+                    "WHERE contype = 'f' AND conrelid = to_regclass(:table_name) AND conname = :name)"
+                ),
+                {"table_name": quote_postgres_identifier(table_name), "name": constraint_name[:63]}
+            ).scalar()
+
+    @staticmethod
+    def unique_key_index_statement(table_name: str, key_columns: List[str]) -> str:
+        """
+        CREATE UNIQUE INDEX sobre la clave que usa el upsert (ON CONFLICT).
+        """
+        index_name = f"{table_name}_etl_key"[:63]
+        columns = ", ".join(quote_postgres_identifier(c) for c in key_columns)
+        return (
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_postgres_identifier(index_name)} "
+            f"ON {quote_postgres_identifier(table_name)} ({columns})"
+        )
+
+    def create_unique_key_index(self, table_name: str, key_columns: List[str]):
+        """
+        Crea el índice único sobre la clave del upsert si no existe.
+        """
+        self.execute_ddl(self.unique_key_index_statement(table_name, key_columns))
+        logging.info(f"Índice único sobre ({', '.join(key_columns)}) disponible en '{table_name}'.")
+
+    def _execute_maintenance(self, statement: str, maintenance_work_mem: str = None):
+        with self.engine.begin() as connection:
+            if maintenance_work_mem:
+                connection.execute(text("SELECT set_config('maintenance_work_mem', :value, true)"),
+                                   {"value": maintenance_work_mem})
+            connection.execute(text(statement))
+
+    def build_indexes(self, table_name: str, primary_key_statement: str = None, index_statements: List[str] = (),
+                      workers: int = 1, maintenance_work_mem: str = None):
+        """
+        Construye la clave primaria y después los índices de la tabla ya cargada. La
+        clave primaria va sola (ALTER TABLE bloquea la tabla); los índices son
+        independientes y se crean en paralelo, cada uno en su propia conexión.
+        """
+        if primary_key_statement:
+            self._execute_maintenance(primary_key_statement, maintenance_work_mem)
+        index_statements = [statement for statement in index_statements if statement]
+        if not index_statements:
+            return
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(index_statements))),
+                                thread_name_prefix=f'{table_name}-idx') as pool:
+            for future in [pool.submit(self._execute_maintenance, statement, maintenance_work_mem)
+                           for statement in index_statements]:
+                future.result()
+        logging.info(f"Tabla '{table_name}': {len(index_statements)} índices creados.")
+
+    def analyze(self, table_name: str):
+        """
+        Actualiza las estadísticas del planificador para la tabla.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text(f"ANALYZE {quote_postgres_identifier(table_name)}"))
@@ -0,0 +1,201 @@
+# infrastructure/schema_translator.py
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+from infrastructure.table_stream import quote_postgres_identifier
+
+# Tipos de SQL Server sin parámetros y su equivalente en PostgreSQL
+_SIMPLE_TYPES = {
+    'bit': 'boolean',
+    'tinyint': 'smallint',
+    'smallint': 'smallint',
+    'int': 'integer',
+    'bigint': 'bigint',
+    'real': 'real',
+    'money': 'numeric(19,4)',
+    'smallmoney': 'numeric(10,4)',
+    'date': 'date',
+    'smalldatetime': 'timestamp(0)',
+    'datetime': 'timestamp(3)',
+    'text': 'text',
+    'ntext': 'text',
+    'xml': 'text',
+    'binary': 'bytea',
+    'varbinary': 'bytea',
+    'image': 'bytea',
+    'timestamp': 'bytea',
+    'rowversion': 'bytea',
+    'uniqueidentifier': 'uuid',
+}
+
+
+def translate_column_type(data_type: str, max_length: Optional[int] = None, precision: Optional[int] = None,
+                          scale: Optional[int] = None, datetime_precision: Optional[int] = None) -> str:
+    """
+    Traduce un tipo de INFORMATION_SCHEMA.COLUMNS de SQL Server al tipo exacto de PostgreSQL.
+    """
+    data_type = data_type.lower()
+    if data_type in _SIMPLE_TYPES:
+        return _SIMPLE_TYPES[data_type]
+    if data_type in ('decimal', 'numeric'):
+        return f"numeric({int(precision)},{int(scale or 0)})"
+    if data_type == 'float':
+        return 'real' if precision is not None and int(precision) <= 24 else 'double precision'
+    if data_type in ('datetime2', 'datetimeoffset', 'time'):
+        # PostgreSQL admite hasta microsegundos; SQL Server llega a 100 ns
+        fraction = min(int(datetime_precision if datetime_precision is not None else 6), 6)
+        base = {'datetime2': 'timestamp', 'datetimeoffset': 'timestamptz', 'time': 'time'}[data_type]
+        return f"{base}({fraction})"
+    if data_type in ('char', 'nchar', 'varchar', 'nvarchar'):
+        if max_length is None or int(max_length) == -1:
+            return 'text'
+        base = 'char' if data_type in ('char', 'nchar') else 'varchar'
+        return f"{base}({int(max_length)})"
+    logging.warning(f"Tipo de SQL Server '{data_type}' sin traducción exacta; se usará text.")
+    return 'text'
+
+
+def build_create_table(table_name: str, columns: List[dict], unlogged: bool = False) -> str:
+    """
+    Genera el CREATE TABLE de PostgreSQL para la lista de columnas traducidas.
+    """
+    definitions = [
+        f"{quote_postgres_identifier(c['name'])} {c['type']}{'' if c['nullable'] else ' NOT NULL'}"
+        for c in columns
+    ]
+    return (
+        f"CREATE {'UNLOGGED ' if unlogged else ''}TABLE {quote_postgres_identifier(table_name)} "
+        f"(\n    " + ",\n    ".join(definitions) + "\n)"
+    )
+
+
+def build_primary_key(table_name: str, key_columns: List[str]) -> str:
+    """
+    Genera el ALTER TABLE que añade la clave primaria.
+    """
+    constraint = quote_postgres_identifier(f"{table_name}_pkey"[:63])
+    column_list = ", ".join(quote_postgres_identifier(c) for c in key_columns)
+    return (
+        f"ALTER TABLE {quote_postgres_identifier(table_name)} "
+        f"ADD CONSTRAINT {constraint} PRIMARY KEY ({column_list})"
+    )
+
+
+def build_foreign_key(foreign_key: dict) -> str:
+    """
+    Genera el ALTER TABLE que añade una clave foránea de SQL Server. Se crea
+    DEFERRABLE INITIALLY DEFERRED y sin acciones en cascada: la réplica borra y
+    vuelve a insertar filas de la tabla referenciada (recargas por trozos) dentro
+    de una transacción, y un ON DELETE CASCADE borraría también las filas hijas.
+    Si SQL Server no la tenía comprobada (NOCHECK), se añade NOT VALID.
+    """
+    constraint = quote_postgres_identifier(foreign_key['name'][:63])
+    columns = ", ".join(quote_postgres_identifier(c) for c in foreign_key['columns'])
+    referenced = ", ".join(quote_postgres_identifier(c) for c in foreign_key['referenced_columns'])
+    statement = (
+        f"ALTER TABLE {quote_postgres_identifier(foreign_key['table'])} "
+        f"ADD CONSTRAINT {constraint} FOREIGN KEY ({columns}) "
+        f"REFERENCES {quote_postgres_identifier(foreign_key['referenced_table'])} ({referenced}) "
+        f"DEFERRABLE INITIALLY DEFERRED"
+    )
+    if not foreign_key.get('trusted', True):
+        statement += " NOT VALID"
+    return statement
+
+
+def build_index(table_name: str, index: dict) -> Optional[str]:
+    """
+    Genera el CREATE INDEX de PostgreSQL para un índice de SQL Server. Los índices
+    filtrados se omiten porque su predicado está en sintaxis T-SQL.
+    """
+    if index.get('filter'):
+        logging.warning(f"Índice filtrado '{index['name']}' de '{table_name}' omitido: {index['filter']}")
+        return None
+    name = quote_postgres_identifier(f"{table_name}_{index['name']}"[:63])
+    columns = ", ".join(
+        quote_postgres_identifier(column) + (" DESC" if descending else "")
+        for column, descending in index['columns']
+    )
+    statement = (
+        f"CREATE {'UNIQUE ' if index['unique'] else ''}INDEX {name} "
+        f"ON {quote_postgres_identifier(table_name)} ({columns})"
+    )
+    if index.get('include'):
+        statement += f" INCLUDE ({', '.join(quote_postgres_identifier(c) for c in index['include'])})"
+    return statement
+
+
+class SchemaTranslator:
+    """
+    Traduce la estructura de las tablas de SQL Server (INFORMATION_SCHEMA.COLUMNS y
+    sys.indexes) a PostgreSQL: columnas, clave primaria e índices secundarios. Los
+    esquemas traducidos se guardan en un JSON por huella de backup: mientras no
+    cambie la copia restaurada no se vuelve a leer el catálogo.
+    """
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._fingerprint_loaded = False
+        self._schemas: Dict[str, dict] = {}
+
+    def _cache_path(self) -> Optional[str]:
+        if not self.cache_dir or not self._fingerprint:
+            return None
+        return os.path.join(self.cache_dir, f"schemas_{self._fingerprint}.json")
+
+    def _load_cache(self, catalog):
+        self._fingerprint = catalog.get_backup_fingerprint()
+        self._fingerprint_loaded = True
+        path = self._cache_path()
+        if path and os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._schemas = json.load(f)
+            logging.info(f"Esquemas traducidos cargados de la caché {path} ({len(self._schemas)} tablas).")
+
+    def _save_cache(self):
+        path = self._cache_path()
+        if not path:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._schemas, f, indent=2)
+        os.replace(temp_path, path)
+
+    def get_table_schema(self, catalog, table_name: str) -> dict:
+        """
+        Devuelve {'columns': [{'name', 'type', 'nullable'}], 'primary_key': [...], 'indexes': [...]}.
+        """
+        with self._lock:
+            if not self._fingerprint_loaded:
+                self._load_cache(catalog)
+            if 'indexes' in self._schemas.get(table_name, {}):
+                return self._schemas[table_name]
+
+        columns = [
+            {
+                'name': name,
+                'type': translate_column_type(data_type, max_length, precision, scale, datetime_precision),
+                'nullable': is_nullable == 'YES',
+            }
+            for name, data_type, max_length, precision, scale, datetime_precision, is_nullable
+            in catalog.get_columns(table_name)
+        ]
+        if not columns:
+            raise ValueError(f"No se encontraron columnas para la tabla '{table_name}' en SQL Server.")
+        indexes = [
+            {**index, 'columns': [list(column) for column in index['columns']]}
+            for index in catalog.get_indexes(table_name)
+        ]
+        schema = {'columns': columns, 'primary_key': catalog.get_primary_key(table_name), 'indexes': indexes}
+
+        with self._lock:
+            self._schemas[table_name] = schema
+            self._save_cache()
+        return schema
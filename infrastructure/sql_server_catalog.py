@@ -0,0 +1,325 @@
+# infrastructure/sql_server_catalog.py
+
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from domain.entities import SourceTable
+from infrastructure.table_stream import quote_sql_server_identifier
+
+# Tipos que BINARY_CHECKSUM ignora: sus cambios no alteran el checksum de la fila
+LOB_TYPES = ('text', 'ntext', 'image', 'xml')
+# Tipos enteros válidos como clave de trozos de checksums (división entera por el ancho)
+INTEGER_KEY_TYPES = ('tinyint', 'smallint', 'int', 'bigint')
+
+
+class SQLServerCatalog:
+    """
+    Consultas de metadatos y estadísticas sobre la base de datos de origen.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def fetch_all(self, query: str, params: tuple = ()) -> List[tuple]:
+        """
+        Ejecuta una consulta con parámetros posicionales (?) y devuelve todas las filas.
+        """
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if params:
+                cursor.execute(query, tuple(params))
+            else:
+                cursor.execute(query)
+            rows = [tuple(row) for row in cursor.fetchall()]
+            cursor.close()
+            return rows
+        finally:
+            connection.close()
+
+    def get_table_sizes(self) -> List[SourceTable]:
+        """
+        Devuelve las tablas de usuario del esquema actual con sus filas (montón o
+        índice clúster en sys.partitions) y el espacio reservado de todas sus
+        unidades de asignación (sys.allocation_units), incluidos índices y LOB.
+        """
+        rows = self.fetch_all(
+            """
+            SELECT t.name,
+                   (SELECT SUM(p.rows) FROM sys.partitions p
+                    WHERE p.object_id = t.object_id AND p.index_id IN (0, 1)),
+                   (SELECT SUM(au.total_pages) FROM sys.partitions p
+                    JOIN sys.allocation_units au ON au.container_id =
+                        CASE WHEN au.type IN (1, 3) THEN p.hobt_id ELSE p.partition_id END
+                    WHERE p.object_id = t.object_id) * 8192
+            FROM sys.tables t
+            WHERE t.is_ms_shipped = 0 AND t.schema_id = SCHEMA_ID()
+            ORDER BY t.name
+            """
+        )
+        return [SourceTable(name, int(rows or 0), int(reserved or 0)) for name, rows, reserved in rows]
+
+    def get_key_range(self, table_name: str, key: str) -> Tuple[Optional[Any], Optional[Any]]:
+        """
+        Devuelve (mínimo, máximo) de la columna clave. (None, None) si la tabla está vacía.
+        """
+        column = quote_sql_server_identifier(key)
+        rows = self.fetch_all(
+            f"SELECT MIN({column}), MAX({column}) FROM {quote_sql_server_identifier(table_name)}"
+        )
+        return rows[0][0], rows[0][1]
+
+    def get_ntile_boundaries(self, table_name: str, key: str, buckets: int) -> List[Any]:
+        """
+        Devuelve el primer valor de clave de cada cubo NTILE (salvo el primero), de
+        modo que los rangos resultantes tengan un número de filas similar.
+        """
+        column = quote_sql_server_identifier(key)
+        query = (
+            f"SELECT MIN(k) FROM ("
+            f"SELECT {column} AS k, NTILE({int(buckets)}) OVER (ORDER BY {column}) AS bucket "
+            f"FROM {quote_sql_server_identifier(table_name)} WHERE {column} IS NOT NULL"
+            f") AS t GROUP BY bucket ORDER BY bucket"
+        )
+        starts = [row[0] for row in self.fetch_all(query)]
+        return starts[1:]
+
+    def count_rows(self, table_name: str, where: str = None, params: tuple = ()) -> int:
+        """
+        Cuenta las filas de la tabla, opcionalmente con un filtro.
+        """
+        query = f"SELECT COUNT_BIG(*) FROM {quote_sql_server_identifier(table_name)}"
+        if where:
+            query += f" WHERE {where}"
+        return int(self.fetch_all(query, params)[0][0])
+
+    def get_columns(self, table_name: str) -> List[tuple]:
+        """
+        Devuelve la definición de columnas de INFORMATION_SCHEMA.COLUMNS, en orden:
+        (nombre, tipo, longitud, precisión, escala, precisión de fecha, admite NULL).
+        """
+        return self.fetch_all(
+            """
+            SELECT COLUMN_NAME, DATA_TYPE, CHARACTER_MAXIMUM_LENGTH, NUMERIC_PRECISION,
+                   NUMERIC_SCALE, DATETIME_PRECISION, IS_NULLABLE
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_NAME = ? AND TABLE_SCHEMA = SCHEMA_NAME()
+            ORDER BY ORDINAL_POSITION
+            """,
+            (table_name,)
+        )
+
+    def get_schema_hash(self, table_name: str) -> str:
+        """
+        Huella de la estructura de la tabla; cambia si se añade, quita o modifica una columna.
+        """
+        return compute_schema_hash(self.get_columns(table_name))
+
+    def get_lob_columns(self, table_name: str, columns: List[str] = None) -> List[str]:
+        """
+        Columnas text, ntext, image o xml de la tabla (de entre `columns` si se indican).
+        """
+        selected = {column.lower() for column in columns} if columns else None
+        return [
+            column[0] for column in self.get_columns(table_name)
+            if column[1].lower() in LOB_TYPES and (selected is None or column[0].lower() in selected)
+        ]
+
+    def get_max_value(self, table_name: str, column: str, where: str = None, params: tuple = ()):
+        """
+        Devuelve el valor máximo de la columna (None si no hay filas).
+        """
+        query = (
+            f"SELECT MAX({quote_sql_server_identifier(column)}) "
+            f"FROM {quote_sql_server_identifier(table_name)}"
+        )
+        if where:
+            query += f" WHERE {where}"
+        return self.fetch_all(query, params)[0][0]
+
+    def get_table_checksum(self, table_name: str, columns: List[str] = None, where: str = None,
+                           params: tuple = (), lob_columns: List[str] = ()) -> Tuple[int, Optional[int]]:
+        """
+        Devuelve (filas, checksum) de la tabla completa, o de las `columns` y filas que
+        cumplan `where` si se indican. El checksum suma el BINARY_CHECKSUM de cada fila
+        (ver `row_checksum` para las columnas LOB).
+        """
+        query = (
+            f"SELECT COUNT_BIG(*), {checksum_aggregate(columns, lob_columns)} "
+            f"FROM {quote_sql_server_identifier(table_name)}"
+        )
+        if where:
+            query += f" WHERE {where}"
+        rows = self.fetch_all(query, params)
+        return int(rows[0][0]), rows[0][1]
+
+    def get_chunk_checksums(self, table_name: str, key: str, width: int, columns: List[str] = None,
+                            where: str = None, params: tuple = (),
+                            lob_columns: List[str] = ()) -> Dict[Optional[int], Tuple[int, int]]:
+        """
+        Devuelve {trozo: (filas, checksum)} agrupando la tabla (o las filas que cumplan
+        `where`) por clave / width. El trozo None contiene las filas con clave NULL.
+        """
+        bucket = f"{quote_sql_server_identifier(key)} / {int(width)}"
+        query = (
+            f"SELECT {bucket}, COUNT_BIG(*), {checksum_aggregate(columns, lob_columns)} "
+            f"FROM {quote_sql_server_identifier(table_name)}"
+        )
+        if where:
+            query += f" WHERE {where}"
+        rows = self.fetch_all(query + f" GROUP BY {bucket}", params)
+        return {row[0]: (int(row[1]), row[2]) for row in rows}
+
+    def get_average_row_bytes(self, table_name: str) -> float:
+        """
+        Tamaño medio de fila en bytes según las páginas usadas (sys.dm_db_partition_stats).
+        """
+        rows = self.fetch_all(
+            """
+            SELECT SUM(used_page_count) * 8192.0 / NULLIF(SUM(CASE WHEN index_id IN (0, 1) THEN row_count END), 0)
+            FROM sys.dm_db_partition_stats
+            WHERE object_id = OBJECT_ID(?)
+            """,
+            (table_name,)
+        )
+        return float(rows[0][0] or 0)
+
+    def get_primary_key(self, table_name: str) -> List[str]:
+        """
+        Devuelve las columnas de la clave primaria en orden (lista vacía si no tiene).
+        """
+        rows = self.fetch_all(
+            """
+            SELECT c.name
+            FROM sys.indexes i
+            JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.object_id = OBJECT_ID(?) AND i.is_primary_key = 1
+            ORDER BY ic.key_ordinal
+            """,
+            (table_name,)
+        )
+        return [row[0] for row in rows]
+
+    def get_indexes(self, table_name: str) -> List[dict]:
+        """
+        Devuelve los índices de la tabla distintos de la clave primaria (sys.indexes):
+        [{'name', 'unique', 'columns': [(columna, descendente)], 'include': [...], 'filter'}].
+        """
+        rows = self.fetch_all(
+            """
+            SELECT i.name, i.is_unique, c.name, ic.is_descending_key, ic.is_included_column,
+                   i.filter_definition
+            FROM sys.indexes i
+            JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+            JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+            WHERE i.object_id = OBJECT_ID(?) AND i.is_primary_key = 0 AND i.is_hypothetical = 0
+              AND i.is_disabled = 0 AND i.type IN (1, 2)
+            ORDER BY i.index_id, ic.is_included_column, ic.key_ordinal, ic.index_column_id
+            """,
+            (table_name,)
+        )
+        indexes = {}
+        for index_name, is_unique, column, descending, included, filter_definition in rows:
+            index = indexes.setdefault(index_name, {
+                'name': index_name, 'unique': bool(is_unique), 'columns': [], 'include': [],
+                'filter': filter_definition,
+            })
+            if included:
+                index['include'].append(column)
+            else:
+                index['columns'].append((column, bool(descending)))
+        return list(indexes.values())
+
+    def get_foreign_keys(self) -> List[dict]:
+        """
+        Devuelve las claves foráneas activas de las tablas del esquema actual
+        (sys.foreign_keys): [{'name', 'table', 'columns', 'referenced_table',
+        'referenced_columns', 'trusted'}]. `trusted` es False si SQL Server no ha
+        comprobado las filas existentes (WITH NOCHECK).
+        """
+        rows = self.fetch_all(
+            """
+            SELECT fk.name, tp.name, cp.name, tr.name, cr.name, fk.is_not_trusted
+            FROM sys.foreign_keys fk
+            JOIN sys.foreign_key_columns fkc ON fkc.constraint_object_id = fk.object_id
+            JOIN sys.tables tp ON tp.object_id = fk.parent_object_id
+            JOIN sys.columns cp ON cp.object_id = fkc.parent_object_id AND cp.column_id = fkc.parent_column_id
+            JOIN sys.tables tr ON tr.object_id = fk.referenced_object_id
+            JOIN sys.columns cr ON cr.object_id = fkc.referenced_object_id AND cr.column_id = fkc.referenced_column_id
+            WHERE tp.schema_id = SCHEMA_ID() AND fk.is_disabled = 0
+            ORDER BY fk.name, fkc.constraint_column_id
+            """
+        )
+        foreign_keys = {}
+        for name, table, column, referenced_table, referenced_column, not_trusted in rows:
+            foreign_key = foreign_keys.setdefault((table, name), {
+                'name': name, 'table': table, 'columns': [], 'referenced_table': referenced_table,
+                'referenced_columns': [], 'trusted': not not_trusted,
+            })
+            foreign_key['columns'].append(column)
+            foreign_key['referenced_columns'].append(referenced_column)
+        return list(foreign_keys.values())
+
+    def get_backup_fingerprint(self) -> Optional[str]:
+        """
+        Huella de la copia de seguridad restaurada en la base de datos actual, a partir
+        del historial de restauraciones de msdb. None si la base no viene de un RESTORE.
+        """
+        rows = self.fetch_all(
+            """
+            SELECT TOP (1) bs.backup_set_uuid, bs.backup_finish_date, bs.first_lsn, bs.last_lsn
+            FROM msdb.dbo.restorehistory rh
+            JOIN msdb.dbo.backupset bs ON bs.backup_set_id = rh.backup_set_id
+            WHERE rh.destination_database_name = DB_NAME()
+            ORDER BY rh.restore_date DESC
+            """
+        )
+        if not rows:
+            return None
+        return backup_fingerprint(*rows[0])
+
+
+def backup_fingerprint(backup_set_guid, backup_finish_date, first_lsn, last_lsn) -> str:
+    """
+    Identificador estable de una copia de seguridad (GUID del backup set, fecha de
+    fin y rango de LSN), válido tanto desde msdb como desde RESTORE HEADERONLY.
+    """
+    finish = backup_finish_date.strftime("%Y%m%d%H%M%S") if backup_finish_date else ""
+    payload = f"{str(backup_set_guid).lower()}|{finish}|{int(first_lsn or 0)}|{int(last_lsn or 0)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def row_checksum(columns: List[str] = None, lob_columns: List[str] = ()) -> str:
+    """
+    Expresión BINARY_CHECKSUM de una fila sobre las columnas indicadas (todas si no
+    hay lista). BINARY_CHECKSUM ignora text, ntext, image y xml: las `lob_columns`
+    entran por su HASHBYTES('SHA2_256') y entonces hace falta la lista de columnas.
+    """
+    if not columns:
+        if lob_columns:
+            raise ValueError("Para incluir columnas LOB en el checksum hay que indicar todas las columnas.")
+        return "BINARY_CHECKSUM(*)"
+    lob = {column.lower() for column in lob_columns}
+    arguments = [
+        f"HASHBYTES('SHA2_256', CAST({quote_sql_server_identifier(c)} AS varbinary(max)))"
+        if c.lower() in lob else quote_sql_server_identifier(c)
+        for c in columns
+    ]
+    return f"BINARY_CHECKSUM({', '.join(arguments)})"
+
+
+def checksum_aggregate(columns: List[str] = None, lob_columns: List[str] = ()) -> str:
+    """
+    Suma en bigint de los checksums de fila. A diferencia de CHECKSUM_AGG (XOR), dos
+    filas con el mismo cambio no se anulan entre sí.
+    """
+    return f"SUM(CAST({row_checksum(columns, lob_columns)} AS bigint))"
+
+
+def compute_schema_hash(columns: List[tuple]) -> str:
+    """
+    Calcula la huella SHA-256 de una lista de definiciones de columna.
+    """
+    payload = "|".join(",".join("" if v is None else str(v) for v in column) for column in columns)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,140 @@
+# infrastructure/sql_server_executor.py
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence
+
+from infrastructure.config import Config
+
+
+class SqlServerError(Exception):
+    """
+    Error de SQL Server al ejecutar una sentencia, con los mensajes recibidos hasta el fallo.
+    """
+
+    def __init__(self, message: str, messages: List[str] = None):
+        super().__init__(message)
+        self.messages = messages or []
+
+
+@dataclass
+class ResultSet:
+    """
+    Conjunto de resultados de una sentencia: columnas, filas con sus tipos de
+    Python (datetime, Decimal...) y mensajes informativos (PRINT, STATS del RESTORE).
+    """
+    columns: List[str] = field(default_factory=list)
+    rows: List[tuple] = field(default_factory=list)
+    messages: List[str] = field(default_factory=list)
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def scalar(self) -> Any:
+        return self.rows[0][0] if self.rows else None
+
+
+class SqlServerExecutor:
+    """
+    Ejecuta sentencias de administración (RESTORE, DROP DATABASE, consultas a
+    sys.databases...) sobre una única conexión pyodbc a `master` en modo
+    autocommit, que se abre al primer uso y se reutiliza entre llamadas y casos
+    de uso. Si la conexión se pierde se reabre en la siguiente llamada.
+    """
+
+    _shared: Dict[tuple, 'SqlServerExecutor'] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, server: str = None, driver: str = None, database: str = 'master'):
+        self.server = server or Config.SQL_SERVER
+        self.driver = driver or Config.SQL_DRIVER
+        self.database = database
+        self._connection = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, server: str = None, driver: str = None) -> 'SqlServerExecutor':
+        """
+        Ejecutor compartido por todo el proceso para ese servidor y driver.
+        """
+        key = (server or Config.SQL_SERVER, driver or Config.SQL_DRIVER)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(*key)
+            return cls._shared[key]
+
+    def _connect(self):
+        import pyodbc
+
+        connection_string = (
+            f"DRIVER={{{self.driver}}};"
+            f"SERVER={self.server};"
+            f"DATABASE={self.database};"
+            f"Trusted_Connection=yes;"
+        )
+        # Autocommit: RESTORE y DROP/ALTER DATABASE no admiten transacciones de usuario
+        connection = pyodbc.connect(connection_string, autocommit=True)
+        connection.timeout = 0  # Sin límite: un RESTORE puede durar horas
+        logging.info(f"Conexión de administración a SQL Server abierta ({self.server}/{self.database}).")
+        return connection
+
+    def execute(self, statement: str, params: Sequence = ()) -> List[ResultSet]:
+        """
+        Ejecuta un lote con parámetros posicionales (?) y devuelve todos sus
+        conjuntos de resultados. Se consumen todos: un RESTORE no termina hasta
+        leer sus mensajes. Lanza SqlServerError si SQL Server devuelve un error.
+        """
+        import pyodbc
+
+        with self._lock:
+            try:
+                if self._connection is None:
+                    self._connection = self._connect()
+                cursor = self._connection.cursor()
+            except pyodbc.Error as e:
+                self._connection = None
+                raise SqlServerError(f"No se pudo conectar a SQL Server ({self.server}): {e}") from e
+            result_sets: List[ResultSet] = []
+            try:
+                cursor.execute(statement, *params) if params else cursor.execute(statement)
+                while True:
+                    result = ResultSet(messages=[text for _, text in (getattr(cursor, 'messages', None) or [])])
+                    if cursor.description:
+                        result.columns = [column[0] for column in cursor.description]
+                        result.rows = [tuple(row) for row in cursor.fetchall()]
+                    result_sets.append(result)
+                    if not cursor.nextset():
+                        break
+            except pyodbc.Error as e:
+                messages = [m for result in result_sets for m in result.messages]
+                if isinstance(e, (pyodbc.OperationalError, pyodbc.InterfaceError)):
+                    self._discard_connection()
+                raise SqlServerError(str(e), messages) from e
+            finally:
+                try:
+                    cursor.close()
+                except pyodbc.Error:
+                    pass
+            return result_sets
+
+    def query(self, statement: str, params: Sequence = ()) -> ResultSet:
+        """
+        Primer conjunto de resultados con filas (o vacío) de la sentencia.
+        """
+        result_sets = self.execute(statement, params)
+        return next((result for result in result_sets if result.columns), ResultSet(
+            messages=[m for result in result_sets for m in result.messages]
+        ))
+
+    def _discard_connection(self):
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._discard_connection()
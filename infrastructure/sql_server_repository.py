@@ -4,6 +4,7 @@ from sqlalchemy import create_engine, inspect
 from sqlalchemy.engine import Engine
 from domain.repositories_interfaces import SQLServerRepositoryInterface
 from infrastructure import config
+from infrastructure.table_stream import stream_table_chunks
 import pandas as pd
 from typing import List
 
@@ -16,8 +17,20 @@ class SQLServerRepository(SQLServerRepositoryInterface):
         inspector = inspect(self.engine)
         return inspector.get_table_names()
 
-    def read_table(self, table_name: str, columns: List[str] = None):
-        return pd.read_sql_table(table_name, self.engine, columns=columns)
+    def read_table(self, table_name: str, columns: List[str] = None, chunksize: int = None):
+        """
+        Lee la tabla por streaming. Con `chunksize` devuelve un iterador de lotes;
+        sin él, concatena los lotes en un único DataFrame.
+        """
+        chunks = stream_table_chunks(
+            self.engine, table_name, chunksize or config.Config.SYNC_CHUNK_SIZE, columns=columns
+        )
+        if chunksize:
+            return chunks
+        frames = list(chunks)
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
 
     def close_connection(self):
         self.engine.dispose()
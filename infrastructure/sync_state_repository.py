@@ -0,0 +1,341 @@
+# infrastructure/sync_state_repository.py
+
+import logging
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+
+
+def serialize_watermark(value) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Convierte una marca de agua en (texto, tipo) para guardarla en la tabla de estado.
+    """
+    if value is None:
+        return None, None
+    if isinstance(value, bool):
+        return str(int(value)), 'int'
+    if isinstance(value, int):
+        return str(value), 'int'
+    if isinstance(value, Decimal):
+        return str(value), 'decimal'
+    if isinstance(value, datetime):
+        return value.isoformat(), 'datetime'
+    if isinstance(value, date):
+        return value.isoformat(), 'date'
+    return str(value), 'str'
+
+
+def deserialize_watermark(value: Optional[str], value_type: Optional[str]) -> Any:
+    """
+    Operación inversa de `serialize_watermark`.
+    """
+    if value is None:
+        return None
+    if value_type == 'int':
+        return int(value)
+    if value_type == 'decimal':
+        return Decimal(value)
+    if value_type == 'datetime':
+        return datetime.fromisoformat(value)
+    if value_type == 'date':
+        return date.fromisoformat(value)
+    return value
+
+
+class SyncStateRepository:
+    """
+    Estado persistente de la sincronización en PostgreSQL (marcas de agua por tabla).
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def ensure_schema(self):
+        """
+        Crea las tablas de estado si no existen.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(text(
+                """
+                CREATE TABLE IF NOT EXISTS etl_sync_state (
+                    table_name TEXT PRIMARY KEY,
+                    watermark_column TEXT,
+                    watermark_value TEXT,
+                    watermark_type TEXT,
+                    schema_hash TEXT,
+                    row_count BIGINT,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            ))
+            # Estados guardados antes de registrar el número de filas de la tabla destino
+            connection.execute(text("ALTER TABLE etl_sync_state ADD COLUMN IF NOT EXISTS row_count BIGINT"))
+            connection.execute(text(
+                """
+                CREATE TABLE IF NOT EXISTS etl_table_checksums (
+                    table_name TEXT NOT NULL,
+                    chunk_key TEXT NOT NULL,
+                    row_count BIGINT NOT NULL,
+                    checksum BIGINT,
+                    schema_hash TEXT,
+                    PRIMARY KEY (table_name, chunk_key)
+                )
+                """
+            ))
+            connection.execute(text(
+                """
+                CREATE TABLE IF NOT EXISTS etl_run_manifest (
+                    fingerprint TEXT NOT NULL,
+                    table_name TEXT NOT NULL,
+                    chunk_key TEXT NOT NULL,
+                    row_count BIGINT NOT NULL,
+                    completed_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    PRIMARY KEY (fingerprint, table_name, chunk_key)
+                )
+                """
+            ))
+            connection.execute(text(
+                """
+                CREATE TABLE IF NOT EXISTS etl_restored_backup (
+                    database_name TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    bak_file TEXT,
+                    restored_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            ))
+            connection.execute(text(
+                """
+                CREATE TABLE IF NOT EXISTS etl_batch_sizes (
+                    table_name TEXT PRIMARY KEY,
+                    batch_rows INTEGER NOT NULL,
+                    rows_per_second DOUBLE PRECISION,
+                    row_bytes DOUBLE PRECISION,
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                )
+                """
+            ))
+
+    def get_state(self, table_name: str) -> Optional[dict]:
+        """
+        Devuelve el estado guardado de la tabla o None si nunca se sincronizó.
+        """
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                text(
+                    "SELECT watermark_column, watermark_value, watermark_type, schema_hash, row_count "
+                    "FROM etl_sync_state WHERE table_name = :table_name"
+                ),
+                {"table_name": table_name}
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "watermark_column": row[0],
+            "watermark": deserialize_watermark(row[1], row[2]),
+            "schema_hash": row[3],
+            "row_count": row[4],
+        }
+
+    def save_state(self, table_name: str, watermark_column: str, watermark, schema_hash: str,
+                   row_count: int = None):
+        """
+        Guarda (o actualiza) la marca de agua, la huella de esquema y las filas de la tabla destino.
+        """
+        value, value_type = serialize_watermark(watermark)
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    """
+                    INSERT INTO etl_sync_state
+                        (table_name, watermark_column, watermark_value, watermark_type, schema_hash, row_count,
+                         updated_at)
+                    VALUES (:table_name, :column, :value, :value_type, :schema_hash, :row_count, now())
+                    ON CONFLICT (table_name) DO UPDATE SET
+                        watermark_column = EXCLUDED.watermark_column,
+                        watermark_value = EXCLUDED.watermark_value,
+                        watermark_type = EXCLUDED.watermark_type,
+                        schema_hash = EXCLUDED.schema_hash,
+                        row_count = EXCLUDED.row_count,
+                        updated_at = now()
+                    """
+                ),
+                {"table_name": table_name, "column": watermark_column, "value": value,
+                 "value_type": value_type, "schema_hash": schema_hash, "row_count": row_count}
+            )
+        logging.debug(f"Marca de agua de '{table_name}' guardada: {watermark_column} = {value}")
+
+    def clear_state(self, table_name: str):
+        """
+        Olvida la marca de agua de la tabla: la próxima carga será completa.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                text("DELETE FROM etl_sync_state WHERE table_name = :table_name"),
+                {"table_name": table_name}
+            )
+
+    def get_checksums(self, table_name: str) -> Tuple[Optional[str], Dict[str, Tuple[int, Optional[int]]]]:
+        """
+        Devuelve (huella de esquema, {trozo: (filas, checksum)}) de la última carga correcta.
+        """
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                text(
+                    "SELECT chunk_key, row_count, checksum, schema_hash "
+                    "FROM etl_table_checksums WHERE table_name = :table_name"
+                ),
+                {"table_name": table_name}
+            ).fetchall()
+        schema_hash = rows[0][3] if rows else None
+        return schema_hash, {row[0]: (int(row[1]), row[2]) for row in rows}
+
+    def save_checksums(self, table_name: str, checksums: Dict[str, Tuple[int, Optional[int]]], schema_hash: str):
+        """
+        Sustituye los checksums guardados de la tabla por los de la carga actual.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                text("DELETE FROM etl_table_checksums WHERE table_name = :table_name"),
+                {"table_name": table_name}
+            )
+            if checksums:
+                connection.execute(
+                    text(
+                        "INSERT INTO etl_table_checksums (table_name, chunk_key, row_count, checksum, schema_hash) "
+                        "VALUES (:table_name, :chunk_key, :row_count, :checksum, :schema_hash)"
+                    ),
+                    [{"table_name": table_name, "chunk_key": chunk_key, "row_count": rows,
+                      "checksum": checksum, "schema_hash": schema_hash}
+                     for chunk_key, (rows, checksum) in checksums.items()]
+                )
+
+    def clear_checksums(self, table_name: str):
+        """
+        Olvida los checksums de la tabla: la próxima carga será completa.
+        """
+        self.save_checksums(table_name, {}, None)
+
+    def get_batch_size(self, table_name: str) -> Optional[int]:
+        """
+        Devuelve las filas por lote elegidas en la última ejecución o None.
+        """
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                text("SELECT batch_rows FROM etl_batch_sizes WHERE table_name = :table_name"),
+                {"table_name": table_name}
+            ).fetchone()
+        return int(row[0]) if row else None
+
+    def save_batch_size(self, table_name: str, batch_rows: int, rows_per_second: float, row_bytes: float):
+        """
+        Guarda el tamaño de lote elegido para la tabla y el rendimiento medido con él.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    """
+                    INSERT INTO etl_batch_sizes (table_name, batch_rows, rows_per_second, row_bytes, updated_at)
+                    VALUES (:table_name, :batch_rows, :rows_per_second, :row_bytes, now())
+                    ON CONFLICT (table_name) DO UPDATE SET
+                        batch_rows = EXCLUDED.batch_rows,
+                        rows_per_second = EXCLUDED.rows_per_second,
+                        row_bytes = EXCLUDED.row_bytes,
+                        updated_at = now()
+                    """
+                ),
+                {"table_name": table_name, "batch_rows": int(batch_rows),
+                 "rows_per_second": rows_per_second, "row_bytes": row_bytes}
+            )
+        logging.debug(f"Tamaño de lote de '{table_name}' guardado: {batch_rows} filas")
+
+    def get_run_progress(self, fingerprint: str) -> Dict[str, Dict[str, int]]:
+        """
+        Devuelve el trabajo terminado de la ejecución de esa copia de seguridad:
+        {tabla: {trozo: filas}}, donde el trozo '*' indica la tabla completa.
+        """
+        with self.engine.connect() as connection:
+            rows = connection.execute(
+                text("SELECT table_name, chunk_key, row_count FROM etl_run_manifest WHERE fingerprint = :fingerprint"),
+                {"fingerprint": fingerprint}
+            ).fetchall()
+        progress: Dict[str, Dict[str, int]] = {}
+        for table_name, chunk_key, row_count in rows:
+            progress.setdefault(table_name, {})[chunk_key] = int(row_count)
+        return progress
+
+    def save_run_progress(self, fingerprint: str, table_name: str, chunk_key: str, row_count: int):
+        """
+        Marca como terminado un trozo (o la tabla, con '*') en el manifiesto de la ejecución.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    """
+                    INSERT INTO etl_run_manifest (fingerprint, table_name, chunk_key, row_count, completed_at)
+                    VALUES (:fingerprint, :table_name, :chunk_key, :row_count, now())
+                    ON CONFLICT (fingerprint, table_name, chunk_key) DO UPDATE SET
+                        row_count = EXCLUDED.row_count,
+                        completed_at = now()
+                    """
+                ),
+                {"fingerprint": fingerprint, "table_name": table_name, "chunk_key": chunk_key,
+                 "row_count": int(row_count)}
+            )
+
+    def clear_run_progress(self, fingerprint: str = None, table_name: str = None):
+        """
+        Borra el manifiesto: el de una tabla, el de todas las copias distintas de
+        `fingerprint` o, sin argumentos, entero.
+        """
+        if table_name is not None:
+            query, params = ("DELETE FROM etl_run_manifest WHERE fingerprint = :fingerprint "
+                             "AND table_name = :table_name"), {"fingerprint": fingerprint, "table_name": table_name}
+        elif fingerprint is not None:
+            query, params = "DELETE FROM etl_run_manifest WHERE fingerprint <> :fingerprint", {"fingerprint": fingerprint}
+        else:
+            query, params = "DELETE FROM etl_run_manifest", {}
+        with self.engine.begin() as connection:
+            connection.execute(text(query), params)
+
+    def get_restored_backup(self, database_name: str) -> Optional[str]:
+        """
+        Huella de la copia de seguridad restaurada en la base de SQL Server, o None.
+        """
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                text("SELECT fingerprint FROM etl_restored_backup WHERE database_name = :database_name"),
+                {"database_name": database_name}
+            ).fetchone()
+        return row[0] if row else None
+
+    def save_restored_backup(self, database_name: str, fingerprint: str, bak_file: str):
+        """
+        Registra la copia de seguridad que se acaba de restaurar en la base de SQL Server.
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                text(
+                    """
+                    INSERT INTO etl_restored_backup (database_name, fingerprint, bak_file, restored_at)
+                    VALUES (:database_name, :fingerprint, :bak_file, now())
+                    ON CONFLICT (database_name) DO UPDATE SET
+                        fingerprint = EXCLUDED.fingerprint,
+                        bak_file = EXCLUDED.bak_file,
+                        restored_at = now()
+                    """
+                ),
+                {"database_name": database_name, "fingerprint": fingerprint, "bak_file": bak_file}
+            )
+
+    def clear_restored_backup(self, database_name: str):
+        """
+        Olvida la copia restaurada (la base se va a sobrescribir o ya no existe).
+        """
+        with self.engine.begin() as connection:
+            connection.execute(
+                text("DELETE FROM etl_restored_backup WHERE database_name = :database_name"),
+                {"database_name": database_name}
+            )
@@ -0,0 +1,160 @@
+# infrastructure/table_stream.py
+
+import logging
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+
+def quote_sql_server_identifier(name: str) -> str:
+    """
+    Devuelve el identificador entre corchetes, escapando los corchetes de cierre.
+    """
+    return "[" + name.replace("]", "]]") + "]"
+
+
+def quote_postgres_identifier(name: str) -> str:
+    """
+    Devuelve el identificador entre comillas dobles, escapando las comillas internas.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+class TableStreamReader:
+    """
+    Lee una tabla de SQL Server por lotes usando un cursor de solo avance.
+
+    El cursor por defecto de pyodbc es un "firehose" de solo lectura: SQL Server
+    envía las filas a medida que se piden con fetchmany, por lo que en memoria
+    solo vive el lote actual y no la tabla completa.
+    """
+
+    def __init__(self, engine, table_name: str, columns: List[str] = None,
+                 where: str = None, params: tuple = (), limit: int = None):
+        self.engine = engine
+        self.table_name = table_name
+        self.columns = columns
+        self.where = where
+        self.params = params
+        self.limit = limit
+        self._connection = None
+        self._cursor = None
+        self.column_names: Optional[List[str]] = None
+
+    def build_query(self) -> str:
+        """
+        Construye la sentencia SELECT para la tabla.
+        """
+        if self.columns:
+            select_list = ", ".join(quote_sql_server_identifier(c) for c in self.columns)
+        else:
+            select_list = "*"
+        top = f"TOP ({int(self.limit)}) " if self.limit is not None else ""
+        query = f"SELECT {top}{select_list} FROM {quote_sql_server_identifier(self.table_name)}"
+        if self.where:
+            query += f" WHERE {self.where}"
+        return query
+
+    def open(self):
+        """
+        Abre una conexión dedicada y lanza la consulta.
+        """
+        query = self.build_query()
+        logging.debug(f"Consulta de lectura para '{self.table_name}': {query}")
+        self._connection = self.engine.raw_connection()
+        self._cursor = self._connection.cursor()
+        if self.params:
+            self._cursor.execute(query, tuple(self.params))
+        else:
+            self._cursor.execute(query)
+        self.column_names = [column[0] for column in self._cursor.description]
+        return self
+
+    def fetch(self, batch_size: int) -> Optional[pd.DataFrame]:
+        """
+        Devuelve el siguiente lote como DataFrame o None cuando no quedan filas.
+        """
+        rows = self._cursor.fetchmany(batch_size)
+        if not rows:
+            return None
+        # Sin coerce_float: los Decimal (decimal, numeric, money) llegan exactos a los codificadores
+        # de COPY en una columna object; como float64 se redondearían importes y claves > 2^53
+        return pd.DataFrame.from_records(
+            [tuple(row) for row in rows], columns=self.column_names, coerce_float=False
+        )
+
+    def fetch_record_batch(self, batch_size: int):
+        """
+        Devuelve el siguiente lote como RecordBatch de Arrow o None cuando no quedan filas.
+        """
+        from infrastructure.arrow_copy_loader import rows_to_record_batch
+        rows = self._cursor.fetchmany(batch_size)
+        if not rows:
+            return None
+        return rows_to_record_batch(rows, self.column_names)
+
+    def iter_record_batches(self, batch_size: int) -> Iterator:
+        """
+        Itera la tabla en RecordBatch de Arrow de tamaño fijo.
+        """
+        while True:
+            batch = self.fetch_record_batch(batch_size)
+            if batch is None:
+                return
+            yield batch
+
+    def fetch_frame(self, batch_size: int, loader: str):
+        """
+        Siguiente lote en el formato que espera el cargador (RecordBatch para 'arrow').
+        """
+        if loader == 'arrow':
+            return self.fetch_record_batch(batch_size)
+        return self.fetch(batch_size)
+
+    def iter_frames(self, chunk_size: int, loader: str) -> Iterator:
+        """
+        Itera la tabla en el formato que espera el cargador: RecordBatch para 'arrow'
+        y DataFrame para el resto.
+        """
+        if loader == 'arrow':
+            return self.iter_record_batches(chunk_size)
+        return self.iter_chunks(chunk_size)
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Itera la tabla en lotes de tamaño fijo.
+        """
+        while True:
+            chunk = self.fetch(chunk_size)
+            if chunk is None:
+                return
+            yield chunk
+
+    def close(self):
+        """
+        Cierra el cursor y devuelve la conexión al pool.
+        """
+        try:
+            if self._cursor is not None:
+                self._cursor.close()
+        finally:
+            self._cursor = None
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+
+def stream_table_chunks(engine, table_name: str, chunk_size: int,
+                        columns: List[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Generador que lee una tabla completa por lotes de `chunk_size` filas.
+    """
+    with TableStreamReader(engine, table_name, columns=columns) as reader:
+        yield from reader.iter_chunks(chunk_size)
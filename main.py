@@ -1,5 +1,6 @@
 # main.py
 
+import argparse
 import os
 import sys
 import logging
@@ -7,11 +8,35 @@ from application.restore_sql_database_use_case import RestoreSQLDatabaseUseCase
 from application.sync_sql_to_postgres import SyncSQLToPostgres
 from application.delete_sql_database_use_case import DeleteSQLDatabaseUseCase  # Importar el nuevo caso de uso
 from infrastructure.config import Config
+from infrastructure.sync_state_repository import SyncStateRepository
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def main():
+
+def parse_args(argv=None):
+    """
+    Opciones de la línea de comandos para elegir las tablas a sincronizar.
+    """
+    parser = argparse.ArgumentParser(description="ETL de Sigrid: SQL Server -> PostgreSQL")
+    parser.add_argument('--tables', nargs='+', default=None,
+                        help="Tablas a sincronizar (por defecto SYNC_TABLES)")
+    parser.add_argument('--all-tables', action='store_true',
+                        help="Descubre todas las tablas de usuario en el catálogo de SQL Server")
+    parser.add_argument('--include', nargs='+', default=None,
+                        help="Patrones de tablas a incluir al descubrir, p. ej. 'obr*' 'cli'")
+    parser.add_argument('--exclude', nargs='+', default=None,
+                        help="Patrones de tablas a excluir al descubrir, p. ej. '*_hist'")
+    parser.add_argument('--given-order', action='store_true',
+                        help="Reparte las tablas en el orden indicado en vez de las mayores primero")
+    parser.add_argument('--resume', action='store_true',
+                        help="Reanuda una ejecución interrumpida: no vuelve a restaurar la base y omite "
+                             "las tablas y particiones ya terminadas con la misma copia de seguridad")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     # Ruta del archivo .bak ya extraído en la nueva ubicación
     bak_file_path = r"C:\Program Files\Microsoft SQL Server\MSSQL16.MSSQLSERVER\MSSQL\Backup\ruesma202411070030.bak"
 
@@ -20,14 +45,9 @@ def main():
         if not os.path.exists(bak_file_path):
             raise FileNotFoundError(f"El archivo .bak especificado no existe: {bak_file_path}")
 
-        # Paso 1: Restaurar la base de datos en SQL Server desde el archivo .bak
-        logging.info(f"Iniciando restauración de la base de datos desde: {bak_file_path}...")
-        restore_sql_use_case = RestoreSQLDatabaseUseCase(bak_file_path)
-        restore_sql_use_case.execute()
-        logging.info("Base de datos restaurada correctamente en SQL Server.")
-
-        # Paso 2: Sincronizar la base de datos restaurada a PostgreSQL
-        logging.info("Iniciando sincronización de datos de SQL Server a PostgreSQL...")
+        # Con --all-tables, --include o --exclude (o SYNC_TABLES vacío) se descubren las tablas
+        discover = args.all_tables or args.include or args.exclude
+        tables = args.tables or (None if discover else Config.SYNC_TABLES) or None
         sync_process = SyncSQLToPostgres(
             sql_server_config={
                 "server": Config.SQL_SERVER,
@@ -41,8 +61,40 @@ def main():
                 "host": Config.PG_SERVER,
                 "port": Config.PG_PORT
             },
-            tables=['prv', 'age', 'cli']  # Define aquí las tablas que deseas sincronizar
+            tables=tables,
+            include=args.include,
+            exclude=args.exclude,
+            largest_first=False if args.given_order else None,
+            resume=args.resume
         )
+
+        # Paso 1: Restaurar la base de datos en SQL Server desde el archivo .bak
+        if args.resume:
+            # La base temporal sigue restaurada: una ejecución fallida no llega al paso 3
+            logging.info("Reanudación: se usa la base de datos ya restaurada en SQL Server.")
+        else:
+            logging.info(f"Iniciando restauración de la base de datos desde: {bak_file_path}...")
+            # La copia restaurada se registra en el estado de PostgreSQL para no repetir la restauración
+            sync_process.create_postgres_database_if_not_exists()
+            pg_engine = sync_process.create_postgres_engine()
+            try:
+                restore_sql_use_case = RestoreSQLDatabaseUseCase(
+                    bak_file_path, state_repository=SyncStateRepository(pg_engine)
+                )
+                restore_result = restore_sql_use_case.execute()
+            finally:
+                pg_engine.dispose()
+            if not restore_result.succeeded:
+                raise RuntimeError(f"No se pudo restaurar la base de datos: {restore_result.error}")
+            if restore_result.unchanged:
+                # Misma copia que la ejecución anterior, que no terminó: se reanuda su sincronización
+                logging.info("La copia de seguridad no ha cambiado: se reanuda la sincronización anterior.")
+                sync_process.resume = True
+            else:
+                logging.info("Base de datos restaurada correctamente en SQL Server.")
+
+        # Paso 2: Sincronizar la base de datos restaurada a PostgreSQL
+        logging.info("Iniciando sincronización de datos de SQL Server a PostgreSQL...")
         sync_process.execute()
         logging.info("Sincronización de datos completada correctamente.")
 
@@ -3,6 +3,7 @@
 import os
 import pytest
 from application.extract_bak_use_case import ExtractBakUseCase
+from infrastructure.config import Config
 from infrastructure.database_utilities import DatabaseUtilities
 
 @pytest.fixture
@@ -10,6 +11,9 @@ def mock_environment(mocker):
     """
     Configura los mocks necesarios para simular el entorno
     """
+    # Sin caché de .bak
+    mocker.patch.object(Config, "BAK_CACHE_DIR", "")
+
     # Mock para mapear y desmapear la unidad de red
     mocker.patch.object(DatabaseUtilities, "map_network_drive")
     mocker.patch.object(DatabaseUtilities, "unmap_network_drive")
@@ -20,9 +24,6 @@ def mock_environment(mocker):
     # Mock para extraer archivos .bak
     mocker.patch.object(DatabaseUtilities, "extract_bak_from_zip", return_value=["test.bak"])
 
-    # Mock para mover archivos extraídos
-    mocker.patch("os.rename")
-
     # Mock para crear directorios
     mocker.patch("os.makedirs")
 
@@ -48,7 +49,6 @@ def test_extract_bak_use_case(mock_environment):
     DatabaseUtilities.map_network_drive.assert_called_once()
     DatabaseUtilities.unmap_network_drive.assert_called_once()
     DatabaseUtilities.get_latest_zip_file.assert_called_once()
-    DatabaseUtilities.extract_bak_from_zip.assert_called_once_with("test.zip")
-    os.rename.assert_called_once_with("test.bak", os.path.join(local_folder, "test.bak"))
+    DatabaseUtilities.extract_bak_from_zip.assert_called_once_with("test.zip", local_folder)
 
     print("Test del caso de uso 'ExtractBakUseCase' completado con éxito.")
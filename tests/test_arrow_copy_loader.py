@@ -0,0 +1,54 @@
+# tests/test_arrow_copy_loader.py
+
+from datetime import date, datetime, time
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from infrastructure.arrow_copy_loader import encode_record_batch, rows_to_record_batch
+from infrastructure.postgres_copy_loader import encode_binary_rows
+
+ROWS = [
+    (1, "obra ñ", Decimal("12.3400"), datetime(2024, 1, 31, 10, 20, 30, 500000), date(2024, 1, 31), True, 2.5),
+    (2, None, None, None, None, None, None),
+    (3, "", Decimal("-0.0001"), datetime(1999, 12, 31), date(1970, 1, 1), False, -1.0),
+]
+NAMES = ["ide", "nombre", "importe", "fecha", "dia", "activa", "ratio"]
+TYPES = ["int4", "varchar", "numeric", "timestamp", "date", "bool", "float8"]
+
+
+def test_rows_to_record_batch_tipa_las_columnas():
+    batch = rows_to_record_batch(ROWS, NAMES)
+
+    assert batch.num_rows == 3
+    assert batch.schema.field("ide").type == pa.int64()
+    assert pa.types.is_decimal(batch.schema.field("importe").type)
+    assert batch.column(1).null_count == 1
+
+
+def test_columnas_mixtas_se_guardan_como_texto():
+    batch = rows_to_record_batch([(1,), ("a",)], ["valor"])
+
+    assert batch.column(0).to_pylist() == ["1", "a"]
+
+
+def test_encode_record_batch_coincide_con_el_codificador_de_pandas():
+    batch = rows_to_record_batch(ROWS, NAMES)
+    df = pd.DataFrame.from_records(ROWS, columns=NAMES)
+
+    assert encode_record_batch(batch, TYPES) == encode_binary_rows(df, TYPES)
+
+
+def test_encode_record_batch_con_columna_de_nulos_y_hora():
+    batch = rows_to_record_batch([(None, time(1, 2, 3)), (None, None)], ["vacia", "hora"])
+    df = pd.DataFrame({"vacia": [None, None], "hora": [time(1, 2, 3), None]})
+
+    assert encode_record_batch(batch, ["text", "time"]) == encode_binary_rows(df, ["text", "time"])
+
+
+def test_encode_record_batch_rechaza_tipos_desconocidos():
+    batch = rows_to_record_batch([(1,)], ["ide"])
+
+    with pytest.raises(ValueError, match="ide"):
+        encode_record_batch(batch, ["tsvector"])
@@ -0,0 +1,99 @@
+# tests/test_bak_cache.py
+
+import os
+import zipfile
+
+import pytest
+
+from application.extract_bak_use_case import ExtractBakUseCase
+from infrastructure.bak_cache import BakCache, zip_fingerprint
+from infrastructure.config import Config
+from infrastructure.database_utilities import DatabaseUtilities
+
+
+def build_zip(path, size, fill=b'\0'):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        zip_ref.writestr('ruesma.bak', fill * size)
+    return str(path)
+
+
+@pytest.fixture
+def shared(tmp_path, mocker):
+    """
+    Carpeta compartida simulada en disco; el mapeo de red no hace nada.
+    """
+    mocker.patch.object(DatabaseUtilities, "map_network_drive")
+    mocker.patch.object(DatabaseUtilities, "unmap_network_drive")
+    folder = tmp_path / 'compartida'
+    folder.mkdir()
+    return folder
+
+
+def run(shared, tmp_path, mocker, zip_path, cache):
+    mocker.patch.object(DatabaseUtilities, "get_latest_zip_file", return_value=zip_path)
+    return ExtractBakUseCase(str(shared), str(tmp_path / 'local'), cache).execute()
+
+
+def test_la_huella_cambia_con_el_contenido_del_zip(tmp_path):
+    zip_path = build_zip(tmp_path / 'copia.zip', 1000)
+    first = zip_fingerprint(zip_path)
+
+    assert zip_fingerprint(zip_path) == first
+    build_zip(tmp_path / 'copia.zip', 1000, b'\1')
+    assert zip_fingerprint(zip_path) != first
+
+
+def test_un_zip_ya_extraido_no_se_vuelve_a_descomprimir(shared, tmp_path, mocker):
+    cache = BakCache(str(tmp_path / 'cache'), 10 ** 6)
+    zip_path = build_zip(shared / 'copia.zip', 1000)
+    extract = mocker.spy(DatabaseUtilities, 'extract_bak_from_zip')
+
+    first = run(shared, tmp_path, mocker, zip_path, cache)
+    second = run(shared, tmp_path, mocker, zip_path, cache)
+
+    assert first == second and open(second[0], 'rb').read() == b'\0' * 1000
+    assert extract.call_count == 1
+    assert not os.path.exists(tmp_path / 'local' / 'ruesma.bak')
+
+
+def test_expulsa_las_entradas_menos_usadas_para_respetar_la_cuota(shared, tmp_path, mocker):
+    cache = BakCache(str(tmp_path / 'cache'), 2500)
+    zips = [build_zip(shared / f'copia{i}.zip', 1000, bytes([i])) for i in range(3)]
+    run(shared, tmp_path, mocker, zips[0], cache)
+    run(shared, tmp_path, mocker, zips[1], cache)
+    run(shared, tmp_path, mocker, zips[0], cache)  # copia0 pasa a ser la más reciente
+
+    run(shared, tmp_path, mocker, zips[2], cache)
+
+    assert sorted(entry['zip_file'] for entry in cache.entries()) == [zips[0], zips[2]]
+
+
+def test_sin_cuota_suficiente_se_extrae_en_la_carpeta_local(shared, tmp_path, mocker):
+    cache = BakCache(str(tmp_path / 'cache'), 500)
+    zip_path = build_zip(shared / 'copia.zip', 1000)
+
+    files = run(shared, tmp_path, mocker, zip_path, cache)
+
+    assert files == [str(tmp_path / 'local' / 'ruesma.bak')]
+    assert cache.entries() == []
+
+
+def test_una_entrada_incompleta_se_descarta(shared, tmp_path, mocker):
+    cache = BakCache(str(tmp_path / 'cache'), 10 ** 6)
+    zip_path = build_zip(shared / 'copia.zip', 1000)
+    files = run(shared, tmp_path, mocker, zip_path, cache)
+    with open(files[0], 'wb') as f:
+        f.write(b'truncado')
+
+    assert cache.lookup(zip_fingerprint(zip_path)) is None
+    assert run(shared, tmp_path, mocker, zip_path, cache) == files
+    assert os.path.getsize(files[0]) == 1000
+
+
+def test_la_cache_esta_desactivada_por_defecto_y_cuelga_de_la_carpeta_local(tmp_path, mocker):
+    assert BakCache.from_config(str(tmp_path)) is None
+
+    mocker.patch.object(Config, 'BAK_CACHE_DIR', 'bak_cache')
+    assert BakCache.from_config(str(tmp_path)).cache_dir == str(tmp_path / 'bak_cache')
+    mocker.patch.object(Config, 'BAK_CACHE_DIR', str(tmp_path / 'otra'))
+    assert BakCache.from_config(str(tmp_path / 'local')).cache_dir == str(tmp_path / 'otra')
@@ -0,0 +1,83 @@
+# tests/test_batch_pipeline.py
+
+import threading
+import time
+
+import pytest
+from application.batch_pipeline import BatchPipeline
+
+
+def test_el_pipeline_conserva_el_orden_y_aplica_las_etapas():
+    result = list(BatchPipeline(queue_size=1).iterate(range(20), [lambda x: x * 2, lambda x: x + 1]))
+
+    assert result == [x * 2 + 1 for x in range(20)]
+
+
+def test_lectura_y_carga_se_solapan():
+    def source():
+        for i in range(10):
+            time.sleep(0.03)
+            yield i
+
+    start = time.perf_counter()
+    for _ in BatchPipeline(queue_size=2).iterate(source()):
+        time.sleep(0.03)
+    elapsed = time.perf_counter() - start
+
+    # En serie serían ~0.6 s; solapadas, algo más que la etapa más lenta (~0.3 s)
+    assert elapsed < 0.5
+
+
+def test_la_cola_acotada_frena_la_lectura():
+    produced = []
+
+    def source():
+        for i in range(100):
+            produced.append(i)
+            yield i
+
+    batches = BatchPipeline(queue_size=2).iterate(source())
+    next(batches)
+    time.sleep(0.2)
+
+    assert len(produced) <= 5
+    batches.close()
+
+
+def test_los_errores_de_una_etapa_se_propagan_y_cierran_la_lectura():
+    closed = threading.Event()
+
+    def source():
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            closed.set()
+
+    def stage(x):
+        if x == 3:
+            raise ValueError("lote no válido")
+        return x
+
+    with pytest.raises(ValueError, match="lote no válido"):
+        list(BatchPipeline().iterate(source(), [stage]))
+    assert closed.is_set()
+
+
+def test_un_error_en_la_carga_detiene_la_lectura():
+    closed = threading.Event()
+
+    def source():
+        try:
+            for i in range(1000):
+                yield i
+        finally:
+            closed.set()
+
+    batches = BatchPipeline().iterate(source())
+    with pytest.raises(RuntimeError):
+        for batch in batches:
+            if batch == 2:
+                raise RuntimeError("fallo en COPY")
+    batches.close()
+    assert closed.is_set()
@@ -0,0 +1,60 @@
+# tests/test_batch_size_controller.py
+
+import math
+
+from application.batch_size_controller import BatchSizeController
+
+
+def peak_at(best_rows):
+    return lambda rows: 100000 / (1 + abs(math.log2(rows / best_rows)))
+
+
+def run(controller, throughput, batches=200, limit=None):
+    """
+    Simula lotes escritos con un rendimiento (filas/s) que depende del tamaño de lote.
+    """
+    for _ in range(batches):
+        rows = controller.next_rows(limit)
+        controller.record(rows, rows / throughput(rows), rows * 100)
+        if controller.converged:
+            break
+
+
+def test_crece_hasta_el_tamano_de_mejor_rendimiento():
+    controller = BatchSizeController(1000, min_rows=1000, max_rows=1000000, samples=2)
+
+    # El rendimiento mejora hasta 16000 filas por lote y luego empeora
+    run(controller, peak_at(16000))
+
+    assert controller.converged
+    assert controller.chosen_rows == 16000
+    assert controller.next_rows() == 16000
+
+
+def test_reduce_el_tamano_si_crecer_no_mejora():
+    controller = BatchSizeController(64000, min_rows=1000, max_rows=1000000, samples=2)
+
+    run(controller, peak_at(8000))
+
+    assert controller.converged
+    assert controller.chosen_rows == 8000
+    assert set(controller.measured) == {64000, 128000, 32000, 16000, 8000, 4000}
+
+
+def test_el_limite_de_memoria_frena_el_crecimiento():
+    controller = BatchSizeController(1000, min_rows=1000, max_rows=1000000, samples=1)
+
+    run(controller, lambda rows: rows, limit=5000)
+
+    assert controller.chosen_rows == 5000
+    assert max(controller.measured) == 5000
+
+
+def test_ignora_lotes_incompletos_y_mide_la_memoria_por_fila():
+    controller = BatchSizeController(2000, samples=2)
+
+    controller.record(2000, 1.0, 200000)
+    controller.record(700, 0.1, 70000)  # Último lote de la tabla
+
+    assert controller.chosen_rows is None
+    assert controller.row_bytes == 100
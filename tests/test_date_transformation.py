@@ -0,0 +1,61 @@
+# tests/test_date_transformation.py
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from application.transformations.date_transformation import decode_yyyymmdd
+from application.transformations.transformation_factory import TransformationFactory
+
+
+def date_plan():
+    return TransformationFactory().get_plan("obr", {"fecinipre": "fecha_inicio_prevista"})
+
+
+def test_decode_yyyymmdd_convierte_ceros_nulos_e_invalidos_en_nat():
+    values = pd.Series([20240131, 0, None, 20230229, 20240229, 20241301, 20240100], dtype="Int64")
+
+    result = decode_yyyymmdd(values)
+
+    expected = np.array(["2024-01-31", "NaT", "NaT", "NaT", "2024-02-29", "NaT", "NaT"], dtype="datetime64[D]")
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_decode_yyyymmdd_admite_flotantes_con_nan():
+    result = decode_yyyymmdd(pd.Series([19991231.0, np.nan, 20240131.5]))
+
+    np.testing.assert_array_equal(result, np.array(["1999-12-31", "NaT", "NaT"], dtype="datetime64[D]"))
+
+
+def test_date_transformation_renombra_y_no_copia_el_resto_de_columnas():
+    df = pd.DataFrame({"ide": [1, 2], "fecinipre": [20240131, 0]})
+    plan = date_plan()
+
+    result = plan.apply(df)
+
+    assert list(result.columns) == ["ide", "fecha_inicio_prevista"]
+    assert result["fecha_inicio_prevista"].iloc[0] == pd.Timestamp("2024-01-31")
+    assert pd.isna(result["fecha_inicio_prevista"].iloc[1])
+    assert np.shares_memory(result["ide"].to_numpy(), df["ide"].to_numpy())
+    assert list(df.columns) == ["ide", "fecinipre"]
+    assert set(plan.timings) == {"fecinipre:date", "fecinipre:rename"}
+
+
+def test_date_transformation_sobre_record_batch():
+    batch = pa.RecordBatch.from_arrays([pa.array([1, 2]), pa.array([20240131, None])], names=["ide", "fecinipre"])
+
+    result = date_plan().apply(batch)
+
+    assert result.schema.names == ["ide", "fecha_inicio_prevista"]
+    assert result.column(1).type == pa.date32()
+    assert result.column(1).null_count == 1
+    assert result.column(0).buffers()[1].address == batch.column(0).buffers()[1].address
+
+
+def test_output_columns_ajusta_nombre_y_tipo():
+    columns = [{"name": "ide", "type": "integer", "nullable": False},
+               {"name": "fecinipre", "type": "integer", "nullable": False}]
+
+    result = date_plan().output_columns(columns)
+
+    assert result[1] == {"name": "fecha_inicio_prevista", "type": "date", "nullable": True}
+    assert result[0] == columns[0]
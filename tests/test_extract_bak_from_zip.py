@@ -0,0 +1,62 @@
+# tests/test_extract_bak_from_zip.py
+
+import hashlib
+import os
+import zipfile
+from collections import namedtuple
+
+import pytest
+
+from infrastructure.database_utilities import DatabaseUtilities
+
+Usage = namedtuple('Usage', 'total used free')
+
+
+def build_zip(path, members):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for name, data in members.items():
+            zip_ref.writestr(name, data)
+    return str(path)
+
+
+def test_extrae_los_bak_directamente_en_la_carpeta_destino(tmp_path, caplog):
+    data = os.urandom(300_000) + b'\0' * 500_000
+    zip_path = build_zip(tmp_path / 'copia.zip', {'copias/ruesma.BAK': data, 'leeme.txt': b'x'})
+    destination = tmp_path / 'backup'
+
+    with caplog.at_level('INFO'):
+        files = DatabaseUtilities.extract_bak_from_zip(zip_path, str(destination), buffer_size=64 * 1024)
+
+    assert files == [str(destination / 'ruesma.BAK')]
+    assert open(files[0], 'rb').read() == data
+    assert sorted(os.listdir(destination)) == ['ruesma.BAK']
+    assert hashlib.sha256(data).hexdigest() in caplog.text and 'MB/s' in caplog.text
+
+
+def test_sin_espacio_libre_no_empieza_la_extraccion(tmp_path, mocker):
+    zip_path = build_zip(tmp_path / 'copia.zip', {'ruesma.bak': b'\0' * 1024})
+    mocker.patch('shutil.disk_usage', return_value=Usage(0, 0, 1024))
+
+    with pytest.raises(OSError, match='Espacio insuficiente'):
+        DatabaseUtilities.extract_bak_from_zip(zip_path, str(tmp_path / 'backup'))
+
+    assert os.listdir(tmp_path / 'backup') == []
+
+
+def test_un_miembro_corrupto_no_deja_archivos(tmp_path):
+    zip_path = build_zip(tmp_path / 'copia.zip', {'ruesma.bak': b'datos de la copia' * 1000})
+    with zipfile.ZipFile(zip_path) as zip_ref:
+        info = zip_ref.getinfo('ruesma.bak')
+        # Alterar el CRC esperado en la cabecera local y en el directorio central
+        offsets = [info.header_offset + 14]
+    raw = bytearray(open(zip_path, 'rb').read())
+    central = raw.rfind(b'PK\x01\x02')
+    offsets.append(central + 16)
+    for offset in offsets:
+        raw[offset:offset + 4] = b'\xde\xad\xbe\xef'
+    open(zip_path, 'wb').write(bytes(raw))
+
+    with pytest.raises(zipfile.BadZipFile):
+        DatabaseUtilities.extract_bak_from_zip(zip_path, str(tmp_path / 'backup'))
+
+    assert os.listdir(tmp_path / 'backup') == []
@@ -0,0 +1,121 @@
+# tests/test_memory_governor.py
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pyarrow as pa
+from application.memory_governor import MemoryGovernor, MemoryWaitCancelled, estimate_frame_bytes
+from application.sync_sql_to_postgres import SyncSQLToPostgres
+
+
+def test_acquire_espera_hasta_que_se_libera_memoria():
+    governor = MemoryGovernor(100)
+    governor.acquire("obr", 80)
+    acquired = threading.Event()
+
+    def worker():
+        governor.acquire("cli", 50)
+        acquired.set()
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    time.sleep(0.1)
+    assert not acquired.is_set()
+
+    governor.release("obr", 80)
+    thread.join(timeout=2)
+    assert acquired.is_set()
+    assert governor.in_flight == 50
+
+
+def test_un_lote_mayor_que_el_presupuesto_pasa_si_no_hay_nada_en_vuelo():
+    governor = MemoryGovernor(100)
+
+    governor.acquire("obr", 500)
+
+    assert governor.in_flight == 500
+
+
+def test_picos_por_tabla_y_ajuste_al_tamano_real():
+    governor = MemoryGovernor(1000)
+    governor.acquire("obr", 100)
+    governor.adjust("obr", 100, 300)
+    governor.acquire("cli", 200)
+    governor.release("obr", 300)
+
+    assert governor.table_peak("obr") == 300
+    assert governor.table_peak("cli") == 200
+    assert governor.peak == 500
+    assert governor.in_flight == 200
+
+
+def test_batch_rows_reduce_el_lote_para_que_quepan_los_lotes_simultaneos():
+    governor = MemoryGovernor(1_000_000)
+
+    assert governor.batch_rows(50000, 100, 4) == 2500
+    assert governor.batch_rows(1000, 100, 4) == 1000
+    assert governor.batch_rows(50000, 0, 4) == 50000
+
+
+def test_estimate_frame_bytes_cuenta_las_columnas_de_texto():
+    df = pd.DataFrame({"ide": range(1000), "nombre": ["x" * 100] * 1000}, dtype=object)
+    batch = pa.RecordBatch.from_pandas(pd.DataFrame({"ide": range(1000)}), preserve_index=False)
+
+    assert estimate_frame_bytes(df) > 100 * 1000
+    assert estimate_frame_bytes(batch) == 8000
+
+
+def test_acquire_cancelado_deja_de_esperar():
+    governor = MemoryGovernor(100)
+    governor.acquire("obr", 100)
+    cancel = threading.Event()
+    errors = []
+
+    def worker():
+        try:
+            governor.acquire("obr", 50, cancel)
+        except MemoryWaitCancelled as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    cancel.set()
+    thread.join(timeout=2)
+
+    assert not thread.is_alive() and len(errors) == 1
+    assert governor.in_flight == 100
+
+
+def test_un_fallo_de_la_carga_con_una_etapa_activa_no_bloquea_la_lectura():
+    frame = pd.DataFrame({"ide": range(100), "nombre": [" a "] * 100})
+    sync = SyncSQLToPostgres(
+        sql_server_config={}, postgres_config={}, tables=['cli'], max_workers=1,
+        table_config={'cli': {'pipeline': True, 'pipeline_queue_size': 2, 'adaptive_batch': False,
+                              'transformations': [{'column': 'nombre', 'type': 'trim'}]}},
+    )
+    # Caben 4 lotes: la lectura se queda esperando memoria con las colas llenas
+    sync.memory_governor = MemoryGovernor(4 * estimate_frame_bytes(frame))
+    errors = []
+
+    def load():
+        try:
+            with sync.read_frames(MagicMock(), 'cli', 'copy_text') as frames:
+                for written, _ in enumerate(frames):
+                    if written == 1:
+                        time.sleep(0.3)
+                        raise RuntimeError("fallo de escritura")
+        except RuntimeError as e:
+            errors.append(e)
+
+    with patch('application.sync_sql_to_postgres.TableStreamReader') as reader, \
+         patch.object(SyncSQLToPostgres, 'estimate_row_bytes', return_value=estimate_frame_bytes(frame) / 100):
+        reader.return_value.__enter__.return_value.fetch_frame.side_effect = lambda rows, loader: frame.copy()
+        thread = threading.Thread(target=load, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert [str(e) for e in errors] == ["fallo de escritura"]
+    assert sync.memory_governor.in_flight == 0
@@ -0,0 +1,73 @@
+# tests/test_postgres_copy_loader.py
+
+import struct
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+from infrastructure.postgres_copy_loader import (
+    build_upsert_statement, encode_binary_rows, encode_numeric, encode_text_rows, encode_text_value
+)
+
+
+def test_codificacion_texto_de_nulos_y_caracteres_especiales():
+    assert encode_text_value(None) == "\\N"
+    assert encode_text_value(np.nan) == "\\N"
+    assert encode_text_value(pd.NaT) == "\\N"
+    assert encode_text_value("a\tb\nc\\d\re") == "a\\tb\\nc\\\\d\\re"
+
+
+def test_codificacion_texto_de_fechas_decimales_y_enteros_con_nulos():
+    assert encode_text_value(date(2024, 1, 31)) == "2024-01-31"
+    assert encode_text_value(pd.Timestamp("2024-01-31 10:20:30.5")) == "2024-01-31 10:20:30.500000"
+    assert encode_text_value(Decimal("12.3400")) == "12.3400"
+    # Una columna entera con NULL llega como float64: 3.0 debe escribirse como 3
+    assert encode_text_value(3.0) == "3"
+    assert encode_text_value(True) == "t"
+
+
+def test_encode_text_rows_genera_una_linea_por_fila():
+    df = pd.DataFrame({"ide": [1, 2], "nombre": ["obra\n1", None]})
+    assert encode_text_rows(df) == "1\tobra\\n1\n2\t\\N\n"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("0", (0, 0, 0, 0, ())),
+    ("12.3400", (2, 0, 0x0000, 4, (12, 3400))),
+    ("-0.0001", (1, -1, 0x4000, 4, (1,))),
+    ("100000", (1, 1, 0x0000, 0, (10,))),
+])
+def test_encode_numeric(value, expected):
+    data = encode_numeric(Decimal(value))
+    ndigits, weight, sign, dscale = struct.unpack(">hhHH", data[:8])
+    digits = struct.unpack(f">{ndigits}H", data[8:])
+    assert (ndigits, weight, sign, dscale, digits) == expected
+
+
+def test_encode_binary_rows_cabecera_nulos_y_cola():
+    df = pd.DataFrame({"ide": [7, None], "fecha": [datetime(2000, 1, 2), None]})
+    data = encode_binary_rows(df, ["int4", "timestamp"])
+
+    assert data.startswith(b"PGCOPY\n\xff\r\n\x00")
+    assert data.endswith(struct.pack(">h", -1))
+    body = data[19:-2]
+    first_row = struct.pack(">hi", 2, 4) + struct.pack(">i", 7) + struct.pack(">iq", 8, 86_400_000_000)
+    second_row = struct.pack(">hii", 2, -1, -1)
+    assert body == first_row + second_row
+
+
+def test_encode_binary_rows_rechaza_tipos_no_soportados():
+    with pytest.raises(ValueError):
+        encode_binary_rows(pd.DataFrame({"geo": ["x"]}), ["geometry"])
+
+
+def test_build_upsert_statement():
+    statement = build_upsert_statement("cli", "etl_upsert_cli", ["ide", "nombre"], ["ide"])
+
+    assert statement == (
+        'INSERT INTO "cli" ("ide", "nombre") SELECT "ide", "nombre" FROM "etl_upsert_cli" '
+        'ON CONFLICT ("ide") DO UPDATE SET "nombre" = EXCLUDED."nombre"'
+    )
+    assert build_upsert_statement("cli", "tmp", ["ide"], ["ide"]).endswith("DO NOTHING")
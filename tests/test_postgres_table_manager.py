@@ -0,0 +1,106 @@
+# tests/test_postgres_table_manager.py
+
+from contextlib import contextmanager
+
+import pytest
+from infrastructure.postgres_table_manager import PostgresTableManager
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+    def scalars(self):
+        return FakeResult([row[0] for row in self.rows])
+
+    def all(self):
+        return self.rows
+
+    def scalar(self):
+        return self.rows[0][0] if self.rows else None
+
+
+class FakeEngine:
+    """
+    Motor que guarda las sentencias ejecutadas y responde a las consultas de catálogo
+    con las filas de `responses` (por fragmento de la sentencia).
+    """
+
+    def __init__(self, responses=None, fail_on=None):
+        self.responses = responses or {}
+        self.fail_on = fail_on
+        self.statements = []
+        self.committed = False
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError(f"fallo simulado en: {sql}")
+        return FakeResult(next((rows for fragment, rows in self.responses.items() if fragment in sql), []))
+
+    @contextmanager
+    def begin(self):
+        yield self
+        self.committed = True
+
+    connect = begin
+
+
+def ddl(engine):
+    return [s for s in engine.statements if not s.startswith("SELECT") and not s.startswith("WITH")]
+
+
+def test_intercambio_sin_dependencias_no_usa_cascade():
+    engine = FakeEngine({"FROM pg_indexes": [("cli__staging_pkey",), ("cli__staging_ide_idx",)]})
+
+    PostgresTableManager(engine).swap_tables("cli__staging", "cli")
+
+    assert ddl(engine) == [
+        "SET LOCAL synchronous_commit = on",
+        'DROP TABLE IF EXISTS "cli__old"',
+        'ALTER TABLE IF EXISTS "cli" RENAME TO "cli__old"',
+        'ALTER TABLE "cli__staging" RENAME TO "cli"',
+        'DROP TABLE IF EXISTS "cli__old"',
+        'ALTER INDEX "cli__staging_pkey" RENAME TO "cli_pkey"',
+        'ALTER INDEX "cli__staging_ide_idx" RENAME TO "cli_ide_idx"',
+    ]
+    assert engine.committed
+
+
+def test_intercambio_recrea_las_vistas_dependientes_en_la_misma_transaccion():
+    engine = FakeEngine({
+        "pg_rewrite": [("v_clientes", "v", " SELECT cli.ide\n   FROM cli;"),
+                       ("mv_resumen", "m", " SELECT count(*) AS n\n   FROM v_clientes;")],
+        "contype = 'f'": [("obr.obr_cli_fkey",)],
+    })
+
+    PostgresTableManager(engine).swap_tables("cli__staging", "cli")
+
+    statements = ddl(engine)
+    # Las definiciones se leen antes de renombrar la tabla publicada
+    assert engine.statements.index(next(s for s in engine.statements if "pg_rewrite" in s)) \
+        < engine.statements.index('ALTER TABLE IF EXISTS "cli" RENAME TO "cli__old"')
+    assert statements[4:] == [
+        'DROP TABLE IF EXISTS "cli__old" CASCADE',
+        "CREATE VIEW v_clientes AS SELECT cli.ide FROM cli",
+        "CREATE MATERIALIZED VIEW mv_resumen AS SELECT count(*) AS n FROM v_clientes",
+    ]
+
+
+def test_una_vista_que_no_se_puede_recrear_deshace_el_intercambio():
+    engine = FakeEngine({"pg_rewrite": [("v_clientes", "v", "SELECT cli.nombre FROM cli;")]},
+                        fail_on="CREATE VIEW")
+
+    with pytest.raises(RuntimeError, match="CREATE VIEW"):
+        PostgresTableManager(engine).swap_tables("cli__staging", "cli")
+
+    assert not engine.committed
+
+
+def test_is_unlogged():
+    assert PostgresTableManager(FakeEngine({"relpersistence": [(True,)]})).is_unlogged("cli")
+    assert not PostgresTableManager(FakeEngine()).is_unlogged("no_existe")
@@ -0,0 +1,59 @@
+# tests/test_process_transform.py
+
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from application.transformations.process_transform import (
+    ProcessTransformStage, ipc_to_record_batch, record_batch_to_ipc, transform_ipc_batch
+)
+from application.transformations.transformation_factory import TransformationFactory
+
+DATE_COLUMNS = {"fecinipre": "fecha_inicio_prevista"}
+SPECS = [{"column": "nombre", "type": "trim"}]
+
+
+def test_transform_ipc_batch_devuelve_el_lote_transformado_y_sus_tiempos():
+    batch = pa.RecordBatch.from_arrays(
+        [pa.array([20240131, 0]), pa.array([" a ", "b "])], names=["fecinipre", "nombre"]
+    )
+
+    payload, timings = transform_ipc_batch("obr", DATE_COLUMNS, SPECS, record_batch_to_ipc(batch))
+    result = ipc_to_record_batch(payload)
+
+    assert result.schema.names == ["fecha_inicio_prevista", "nombre"]
+    assert result.column(1).to_pylist() == ["a", "b"]
+    assert set(timings) == {"fecinipre:date", "fecinipre:rename", "nombre:trim"}
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def test_la_etapa_en_procesos_conserva_el_formato_del_lote(pool):
+    plan = TransformationFactory().get_plan("obr", DATE_COLUMNS, SPECS)
+    stage = ProcessTransformStage(pool, plan, DATE_COLUMNS, SPECS)
+    df = pd.DataFrame({"ide": [1, 2], "fecinipre": [20240131, 0], "nombre": [" a", None]})
+
+    futures = [stage.submit(df), stage.submit(df)]  # Varios lotes en vuelo
+    results = [stage.collect(future) for future in futures]
+
+    for result in results:
+        assert isinstance(result, pd.DataFrame)
+        assert list(result.columns) == ["ide", "fecha_inicio_prevista", "nombre"]
+        assert result["fecha_inicio_prevista"].iloc[0] == pd.Timestamp("2024-01-31")
+        assert result["nombre"].iloc[0] == "a"
+    assert plan.timings["nombre:trim"] > 0
+
+
+def test_lotes_que_arrow_no_sabe_tipar_se_transforman_en_el_proceso_actual(pool):
+    plan = TransformationFactory().get_plan("obr", DATE_COLUMNS, SPECS)
+    stage = ProcessTransformStage(pool, plan, DATE_COLUMNS, SPECS)
+    df = pd.DataFrame({"fecinipre": [20240131, 0], "nombre": ["a ", 1]})
+
+    result = stage.collect(stage.submit(df))
+
+    assert list(result.columns) == ["fecha_inicio_prevista", "nombre"]
@@ -0,0 +1,200 @@
+# tests/test_restore_sql_database_use_case.py
+
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from application.restore_sql_database_use_case import RestoreSQLDatabaseUseCase
+from benchmarks.restore_profiles import dump_result_set, format_report, load_result_set, parse_profile, replay
+from domain.entities import RestoreProfile
+from infrastructure.config import Config
+from infrastructure.database_utilities import DatabaseUtilities
+from infrastructure.sql_server_executor import ResultSet, SqlServerError
+
+HEADERONLY = ResultSet(
+    ['BackupName', 'Position', 'BackupSetGUID', 'FirstLSN', 'LastLSN', 'BackupFinishDate'],
+    [(None, 1, uuid.UUID('8d0b6a6e-3c4b-4f0e-9d43-0b1b3c2d1e0f'), Decimal('41000000012800037'),
+      Decimal('41000000013600001'), datetime(2024, 11, 7, 0, 35, 12))]
+)
+FILELISTONLY = ResultSet(
+    ['LogicalName', 'PhysicalName', 'Type', 'FileGroupName'],
+    [('ruesma', 'C:\\Data\\ruesma.mdf', 'D', 'PRIMARY'),
+     ('ruesma_2', 'C:\\Data\\ruesma_2.ndf', 'D', 'SECUNDARIO'),
+     ('ruesma_log', 'C:\\Data\\ruesma_log.ldf', 'L', None)]
+)
+RESTORE_MESSAGES = ["[01000] [SQL Server]100 percent processed.",
+                    "[01000] [SQL Server]RESTORE DATABASE successfully processed 131072 pages in 8.000 seconds "
+                    "(128.000 MB/sec)."]
+
+
+class FakeSqlServerExecutor:
+    """
+    Ejecutor en memoria con la interfaz de SqlServerExecutor: responde según el
+    tipo de sentencia y guarda las sentencias recibidas.
+    """
+
+    def __init__(self, state='ONLINE', restore_error=None):
+        self.state = state
+        self.restore_error = restore_error
+        self.statements = []
+
+    def execute(self, statement, params=()):
+        self.statements.append(statement)
+        if 'HEADERONLY' in statement:
+            return [HEADERONLY]
+        if 'FILELISTONLY' in statement:
+            return [FILELISTONLY]
+        if 'sys.databases' in statement:
+            return [ResultSet(['state_desc'], [(self.state,)] if self.state else [])]
+        if statement.startswith('RESTORE DATABASE') and self.restore_error:
+            raise SqlServerError(self.restore_error, RESTORE_MESSAGES[:1])
+        return [ResultSet(messages=RESTORE_MESSAGES)]
+
+    def query(self, statement, params=()):
+        return self.execute(statement, params)[0]
+
+
+class MemoryRestoreState:
+    """
+    Estado de la copia restaurada en memoria con la interfaz de SyncStateRepository.
+    """
+
+    def __init__(self, fingerprint=None):
+        self.fingerprint = fingerprint
+
+    def ensure_schema(self):
+        pass
+
+    def get_restored_backup(self, database_name):
+        return self.fingerprint
+
+    def save_restored_backup(self, database_name, fingerprint, bak_file):
+        self.fingerprint = fingerprint
+
+    def clear_restored_backup(self, database_name):
+        self.fingerprint = None
+
+
+@pytest.fixture
+def use_case(tmp_path):
+    bak_file = tmp_path / 'ruesma.bak'
+    bak_file.write_bytes(b'\0')
+
+    def build(state, executor):
+        case = RestoreSQLDatabaseUseCase(str(bak_file), state_repository=state, executor=executor)
+        case.base_path = str(tmp_path)
+        return case
+    return build
+
+
+def restores(executor):
+    return [s for s in executor.statements if s.startswith('RESTORE DATABASE')]
+
+
+def test_la_misma_copia_online_no_se_vuelve_a_restaurar(use_case):
+    executor = FakeSqlServerExecutor()
+    state = MemoryRestoreState()
+    case = use_case(state, executor)
+    state.fingerprint = case.read_backup_fingerprint()
+
+    result = case.execute()
+
+    assert result.unchanged and result.succeeded and result.fingerprint == state.fingerprint
+    assert restores(executor) == []
+
+
+def test_otra_copia_se_restaura_y_queda_registrada(use_case):
+    executor = FakeSqlServerExecutor()
+    state = MemoryRestoreState('otra-copia')
+
+    result = use_case(state, executor).execute()
+
+    assert result.status == 'restored' and result.megabytes_per_second == 128.0
+    assert state.fingerprint == result.fingerprint != 'otra-copia'
+    assert len(restores(executor)) == 1
+
+
+def test_un_fallo_de_restauracion_no_deja_copia_registrada(use_case):
+    state = MemoryRestoreState('otra-copia')
+
+    result = use_case(state, FakeSqlServerExecutor(restore_error='Error 3201')).execute()
+
+    assert not result.succeeded and result.error == 'Error 3201' and state.fingerprint is None
+
+
+def test_base_que_no_queda_online(use_case):
+    result = use_case(None, FakeSqlServerExecutor(state=None)).execute()
+
+    assert result.status == 'error'
+
+
+def test_restaura_todas_las_bandas_con_un_move_por_archivo_y_el_perfil():
+    case = RestoreSQLDatabaseUseCase(['E:\\copias\\ruesma_1.bak', 'F:\\copias\\ruesma_2.bak'],
+                                     profile=RestoreProfile('b64', 64, 4194304, 65536),
+                                     executor=FakeSqlServerExecutor())
+    case.base_path = 'C:\\MSSQL'
+    logical_files = case.parse_logical_names(FILELISTONLY)
+
+    command = case.build_restore_command(logical_files)
+
+    assert [f["logical_name"] for f in logical_files] == ['ruesma', 'ruesma_2', 'ruesma_log']
+    assert "FROM DISK = N'E:\\copias\\ruesma_1.bak', DISK = N'F:\\copias\\ruesma_2.bak'" in command
+    assert command.count("MOVE ") == 3 and "TemporaryDB_ruesma_2.ndf" in command
+    assert "BUFFERCOUNT = 64,\n    MAXTRANSFERSIZE = 4194304,\n    BLOCKSIZE = 65536" in command
+
+
+def test_perfiles_no_validos():
+    with pytest.raises(ValueError, match='MAXTRANSFERSIZE'):
+        RestoreProfile('malo', max_transfer_size=100000).options()
+    with pytest.raises(ValueError, match='BLOCKSIZE'):
+        RestoreProfile('malo', block_size=3000).options()
+    assert RestoreProfile().options() == []
+
+
+def test_eliminar_la_base_temporal_usa_el_ejecutor(mocker):
+    mocker.patch.object(Config, 'SQL_DATABASE', 'TemporaryDB')
+    executor = FakeSqlServerExecutor()
+
+    DatabaseUtilities.delete_sql_server_database(executor)
+
+    assert executor.statements == [
+        "ALTER DATABASE [TemporaryDB] SET SINGLE_USER WITH ROLLBACK IMMEDIATE; DROP DATABASE [TemporaryDB];"
+    ]
+
+
+def test_el_banco_de_pruebas_reproduce_los_resultados_grabados():
+    def restore(seconds, rate):
+        return ResultSet(messages=[f"RESTORE DATABASE successfully processed 131072 pages in {seconds} seconds "
+                                   f"({rate} MB/sec)."])
+
+    def command(kind, result, seconds):
+        return {'kind': kind, 'result_sets': [dump_result_set(result)], 'error': None, 'messages': [],
+                'seconds': seconds}
+
+    recording = {'bak_files': ['E:\\ruesma_1.bak', 'F:\\ruesma_2.bak'], 'database_name': 'BenchDB', 'profiles': [
+        {'profile': {'name': name, 'buffer_count': buffers, 'max_transfer_size': 0, 'block_size': 0}, 'commands': [
+            command('headeronly', HEADERONLY, 0.2),
+            command('filelistonly', FILELISTONLY, 0.3),
+            command('restore', restore(seconds, rate), float(seconds) + 1),
+            command('status', ResultSet(['state_desc'], [('ONLINE',)]), 0.1),
+        ]} for name, buffers, seconds, rate in [('base', 0, '20.000', '51.200'), ('b64', 64, '8.000', '128.000')]
+    ]}
+
+    rows = replay(recording)
+
+    assert [(r['profile'], r['status'], r['mb_per_second']) for r in rows] == [
+        ('base', 'restored', 51.2), ('b64', 'restored', 128.0)
+    ]
+    assert rows[1]['options'] == 'BUFFERCOUNT = 64' and rows[1]['sql_seconds'] == pytest.approx(9.6)
+    assert format_report(rows).splitlines()[1].startswith('b64')
+    assert parse_profile('b64:buffercount=64,MaxTransferSize=4194304') == RestoreProfile('b64', 64, 4194304)
+
+
+def test_la_grabacion_conserva_los_tipos_de_las_filas():
+    result = ResultSet(['valor'] * 8, [(HEADERONLY.rows[0][2], Decimal('41000000012800037'), 2.5, b'\x00\xff',
+                                        date(2024, 11, 7), HEADERONLY.rows[0][5], True, None)], ['aviso'])
+
+    assert load_result_set(json.loads(json.dumps(dump_result_set(result)))) == result
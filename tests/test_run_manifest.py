@@ -0,0 +1,71 @@
+# tests/test_run_manifest.py
+
+from application.run_manifest import RunManifest
+
+
+class MemoryStateRepository:
+    """
+    Repositorio de estado en memoria con la interfaz del manifiesto de SyncStateRepository.
+    """
+
+    def __init__(self):
+        self.rows = {}
+
+    def get_run_progress(self, fingerprint):
+        progress = {}
+        for (fp, table_name, chunk_key), rows in self.rows.items():
+            if fp == fingerprint:
+                progress.setdefault(table_name, {})[chunk_key] = rows
+        return progress
+
+    def save_run_progress(self, fingerprint, table_name, chunk_key, row_count):
+        self.rows[(fingerprint, table_name, chunk_key)] = row_count
+
+    def clear_run_progress(self, fingerprint=None, table_name=None):
+        for key in list(self.rows):
+            if table_name is not None:
+                drop = key[0] == fingerprint and key[1] == table_name
+            elif fingerprint is not None:
+                drop = key[0] != fingerprint
+            else:
+                drop = True
+            if drop:
+                del self.rows[key]
+
+
+def test_reanudar_con_la_misma_copia_omite_lo_terminado():
+    repository = MemoryStateRepository()
+    first = RunManifest(repository, 'fp-1')
+    first.record_table('age', 120)
+    first.record_chunk('obr', 'partition:range:4:[1, 100)', 99)
+
+    resumed = RunManifest(repository, 'fp-1', resume=True)
+
+    assert resumed.completed_table('age') == 120
+    assert resumed.completed_table('obr') is None
+    assert resumed.completed_chunks('obr', 'partition:range:4:') == {'partition:range:4:[1, 100)': 99}
+    assert resumed.completed_chunks('obr', 'checksum:') == {}
+
+
+def test_otra_copia_o_una_ejecucion_nueva_empiezan_de_cero():
+    repository = MemoryStateRepository()
+    RunManifest(repository, 'fp-1').record_table('age', 120)
+
+    assert RunManifest(repository, 'fp-2', resume=True).completed_table('age') is None
+    assert repository.rows == {}
+
+    RunManifest(repository, 'fp-2').record_table('age', 120)
+    assert RunManifest(repository, 'fp-2').completed_table('age') is None
+
+
+def test_reset_table_y_manifiesto_sin_huella():
+    repository = MemoryStateRepository()
+    manifest = RunManifest(repository, 'fp-1')
+    manifest.record_chunk('obr', 'partition:range:4:NULL', 0)
+    manifest.reset_table('obr')
+
+    assert repository.rows == {}
+
+    disabled = RunManifest(repository, None, resume=True)
+    disabled.record_table('age', 1)
+    assert not disabled.enabled and repository.rows == {}
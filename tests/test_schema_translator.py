@@ -0,0 +1,114 @@
+# tests/test_schema_translator.py
+
+import json
+
+import pytest
+from unittest.mock import MagicMock
+from infrastructure.schema_translator import (
+    SchemaTranslator, build_create_table, build_foreign_key, build_index, build_primary_key,
+    translate_column_type
+)
+
+
+@pytest.mark.parametrize("column, expected", [
+    (("bit",), "boolean"),
+    (("tinyint",), "smallint"),
+    (("int",), "integer"),
+    (("decimal", None, 18, 4), "numeric(18,4)"),
+    (("money",), "numeric(19,4)"),
+    (("float", None, 53), "double precision"),
+    (("float", None, 24), "real"),
+    (("datetime",), "timestamp(3)"),
+    (("datetime2", None, None, None, 7), "timestamp(6)"),
+    (("date",), "date"),
+    (("nvarchar", 50), "varchar(50)"),
+    (("varchar", -1), "text"),
+    (("nchar", 3), "char(3)"),
+    (("uniqueidentifier",), "uuid"),
+    (("varbinary", -1), "bytea"),
+])
+def test_translate_column_type(column, expected):
+    assert translate_column_type(*column) == expected
+
+
+def test_build_create_table_y_clave_primaria():
+    columns = [
+        {"name": "ide", "type": "integer", "nullable": False},
+        {"name": "nombre", "type": "varchar(50)", "nullable": True},
+    ]
+
+    assert build_create_table("obr", columns, unlogged=True) == (
+        'CREATE UNLOGGED TABLE "obr" (\n    "ide" integer NOT NULL,\n    "nombre" varchar(50)\n)'
+    )
+    assert build_primary_key("obr", ["ide"]) == 'ALTER TABLE "obr" ADD CONSTRAINT "obr_pkey" PRIMARY KEY ("ide")'
+
+
+def fake_catalog(fingerprint="abc123"):
+    catalog = MagicMock()
+    catalog.get_backup_fingerprint.return_value = fingerprint
+    catalog.get_columns.return_value = [
+        ("ide", "int", None, 10, 0, None, "NO"),
+        ("fecinipre", "int", None, 10, 0, None, "YES"),
+    ]
+    catalog.get_primary_key.return_value = ["ide"]
+    catalog.get_indexes.return_value = [
+        {"name": "IX_obr_fec", "unique": False, "columns": [("fecinipre", True)], "include": [], "filter": None},
+    ]
+    return catalog
+
+
+def test_los_esquemas_se_cachean_por_huella_de_backup(tmp_path):
+    catalog = fake_catalog()
+    schema = SchemaTranslator(str(tmp_path)).get_table_schema(catalog, "obr")
+
+    assert schema["primary_key"] == ["ide"]
+    assert (tmp_path / "schemas_abc123.json").exists()
+
+    # Otra ejecución con la misma copia restaurada no vuelve a leer el catálogo
+    other_catalog = fake_catalog()
+    assert SchemaTranslator(str(tmp_path)).get_table_schema(other_catalog, "obr") == schema
+    other_catalog.get_columns.assert_not_called()
+
+    # Con otra copia de seguridad se vuelve a traducir
+    new_backup = fake_catalog("def456")
+    SchemaTranslator(str(tmp_path)).get_table_schema(new_backup, "obr")
+    new_backup.get_columns.assert_called_once_with("obr")
+
+
+def test_build_index_traduce_columnas_descendentes_e_include():
+    index = {"name": "IX_obr_cli", "unique": True, "columns": [("cli", False), ("fec", True)],
+             "include": ["imp"], "filter": None}
+
+    assert build_index("obr", index) == (
+        'CREATE UNIQUE INDEX "obr_IX_obr_cli" ON "obr" ("cli", "fec" DESC) INCLUDE ("imp")'
+    )
+
+
+def test_build_index_omite_indices_filtrados():
+    index = {"name": "IX_obr_activas", "unique": False, "columns": [("cli", False)],
+             "include": [], "filter": "([baja]=(0))"}
+
+    assert build_index("obr", index) is None
+
+
+def test_build_foreign_key_diferida_y_not_valid_si_no_estaba_comprobada():
+    foreign_key = {'name': 'fk_obr_cli', 'table': 'obr', 'columns': ['ide_cli'], 'referenced_table': 'cli',
+                   'referenced_columns': ['ide'], 'trusted': True}
+
+    assert build_foreign_key(foreign_key) == (
+        'ALTER TABLE "obr" ADD CONSTRAINT "fk_obr_cli" FOREIGN KEY ("ide_cli") '
+        'REFERENCES "cli" ("ide") DEFERRABLE INITIALLY DEFERRED'
+    )
+    assert build_foreign_key({**foreign_key, 'trusted': False}).endswith(" NOT VALID")
+
+
+def test_un_esquema_cacheado_sin_indices_se_vuelve_a_leer(tmp_path):
+    (tmp_path / "schemas_abc123.json").write_text(
+        json.dumps({"obr": {"columns": [], "primary_key": ["ide"]}})
+    )
+    catalog = fake_catalog()
+
+    schema = SchemaTranslator(str(tmp_path)).get_table_schema(catalog, "obr")
+
+    assert schema["indexes"][0]["columns"] == [["fecinipre", True]]
+    catalog.get_indexes.assert_called_once_with("obr")
@@ -0,0 +1,187 @@
+# tests/test_sync_sql_to_postgres.py
+
+import threading
+import pytest
+from unittest.mock import MagicMock, patch
+from application.sync_sql_to_postgres import SyncSQLToPostgres
+from domain.entities import SourceTable
+
+
+def build_sync(tables, **kwargs):
+    return SyncSQLToPostgres(
+        sql_server_config={"server": "localhost", "database": "TemporaryDB", "driver": "ODBC Driver 17 for SQL Server"},
+        postgres_config={"dbname": "clone_sigrid", "user": "postgres", "password": "", "host": "localhost", "port": "5432"},
+        tables=tables,
+        **kwargs
+    )
+
+
+@pytest.fixture
+def engines():
+    with patch.object(SyncSQLToPostgres, 'create_postgres_database_if_not_exists'), \
+         patch.object(SyncSQLToPostgres, 'prepare_state'), \
+         patch.object(SyncSQLToPostgres, 'create_sql_engine', side_effect=lambda: MagicMock()) as sql_engine, \
+         patch.object(SyncSQLToPostgres, 'create_postgres_engine', side_effect=lambda: MagicMock()) as pg_engine:
+        yield sql_engine, pg_engine
+
+
+def test_execute_aisla_los_errores_por_tabla(engines):
+    sync = build_sync(['prv', 'age', 'cli'], max_workers=2)
+
+    def fake_process_table(sql_engine, pg_engine, table_name):
+        if table_name == 'age':
+            raise ValueError("fallo simulado")
+        return 10
+
+    with patch.object(SyncSQLToPostgres, 'process_table', side_effect=fake_process_table):
+        with pytest.raises(RuntimeError, match="age"):
+            sync.execute()
+
+    with patch.object(SyncSQLToPostgres, 'process_table', side_effect=fake_process_table):
+        results = {table_name: sync.sync_table(table_name) for table_name in ['prv', 'age', 'cli']}
+
+    assert results['prv'].succeeded and results['prv'].rows == 10
+    assert results['cli'].succeeded
+    assert not results['age'].succeeded and "fallo simulado" in results['age'].error
+
+
+def test_cada_worker_usa_sus_propios_motores(engines):
+    sync = build_sync(['t1', 't2', 't3', 't4'], max_workers=2)
+    used = {}
+    barrier = threading.Barrier(2)
+
+    def fake_process_table(sql_engine, pg_engine, table_name):
+        if table_name in ('t1', 't2'):
+            barrier.wait(timeout=5)  # Fuerza que dos workers trabajen a la vez
+        used.setdefault(threading.current_thread().name, set()).add((id(sql_engine), id(pg_engine)))
+        return 1
+
+    with patch.object(SyncSQLToPostgres, 'process_table', side_effect=fake_process_table):
+        results = sync.execute()
+
+    assert len(results) == 4 and all(r.succeeded for r in results)
+    assert len(used) == 2
+    engine_pairs = [pairs for pairs in used.values()]
+    assert all(len(pairs) == 1 for pairs in engine_pairs)
+    assert engine_pairs[0] != engine_pairs[1]
+
+
+def test_execute_reparte_las_tablas_de_mayor_a_menor(engines):
+    sync = build_sync(['prv', 'age', 'cli'], max_workers=1)
+    sizes = [SourceTable('age', 10, 8192), SourceTable('cli', 900, 4 * 8192), SourceTable('prv', 100, 2 * 8192)]
+    order = []
+
+    def fake_process_table(sql_engine, pg_engine, table_name):
+        order.append(table_name)
+        return 1
+
+    with patch('application.sync_sql_to_postgres.SQLServerCatalog.get_table_sizes', return_value=sizes), \
+         patch.object(SyncSQLToPostgres, 'process_table', side_effect=fake_process_table):
+        sync.execute()
+
+    assert order == ['cli', 'prv', 'age']
+
+
+def test_filtro_de_tabla_se_combina_con_el_de_la_lectura():
+    sync = build_sync(['obr'], table_config={'obr': {'where': "fecinirea >= ?", 'where_params': [20200101]}})
+
+    assert sync.source_filter('obr') == ("fecinirea >= ?", (20200101,))
+    assert sync.source_filter('obr', "[ide] >= ?", (10,)) == ("(fecinirea >= ?) AND ([ide] >= ?)", (20200101, 10))
+    assert sync.source_filter('cli', "[ide] >= ?", (10,)) == ("[ide] >= ?", (10,))
+
+
+def test_proyeccion_de_columnas_y_exclusion_de_lob():
+    sync = build_sync(['obr', 'doc'], table_config={
+        'obr': {'columns': ['ide', 'nombre']},
+        'doc': {'exclude_columns': ['CONTENIDO']},
+    })
+    columns = [("ide", "int"), ("nombre", "varchar"), ("contenido", "varbinary")]
+
+    with patch('application.sync_sql_to_postgres.SQLServerCatalog.get_columns', return_value=columns):
+        assert sync.get_source_columns(MagicMock(), 'obr') == ['ide', 'nombre']
+        assert sync.get_source_columns(MagicMock(), 'doc') == ['ide', 'nombre']
+        assert sync.get_source_columns(MagicMock(), 'cli') is None
+        assert not sync.reads_columns(MagicMock(), 'obr', ['contenido'])
+
+
+def test_la_proyeccion_debe_conservar_las_columnas_clave():
+    with pytest.raises(ValueError, match="fecha_mod"):
+        build_sync(['cli'], table_config={'cli': {
+            'mode': 'incremental', 'watermark_column': 'fecha_mod', 'key_columns': ['ide'], 'columns': ['ide', 'nombre'],
+        }})
+    with pytest.raises(ValueError, match="ide"):
+        build_sync(['obr'], table_config={'obr': {'partitions': 4, 'exclude_columns': ['ide']}})
+
+
+@pytest.fixture
+def table_manager():
+    with patch('application.sync_sql_to_postgres.PostgresTableManager') as manager_class:
+        manager_class.return_value.staging_name.side_effect = lambda name: f"{name}__staging"
+        yield manager_class.return_value
+
+
+def test_recarga_completa_carga_en_staging_y_publica_con_el_intercambio(table_manager):
+    sync = build_sync(['cli'])
+
+    with patch.object(SyncSQLToPostgres, 'copy_rows', return_value=5) as copy_rows, \
+         patch.object(SyncSQLToPostgres, 'build_target_indexes') as build_indexes:
+        rows = sync.load_full_table(MagicMock(), MagicMock(), 'cli', 'cli', 'copy_text')
+
+    assert rows == 5
+    assert copy_rows.call_args.args[3] == 'cli__staging' and copy_rows.call_args.kwargs == {'create_target': True}
+    assert build_indexes.call_args.args[3] == 'cli__staging'
+    # La staging pasa a LOGGED antes de publicarse
+    assert [(name, args) for name, args, _ in table_manager.method_calls if name != 'staging_name'] == [
+        ('analyze', ('cli__staging',)), ('set_logged', ('cli__staging',)), ('swap_tables', ('cli__staging', 'cli')),
+    ]
+    table_manager.drop_table.assert_not_called()
+
+
+def test_recarga_completa_sin_set_logged_es_opcional(table_manager):
+    sync = build_sync(['cli'])
+
+    with patch('application.sync_sql_to_postgres.Config.SYNC_STAGING_SET_LOGGED', False), \
+         patch.object(SyncSQLToPostgres, 'copy_rows', return_value=5), \
+         patch.object(SyncSQLToPostgres, 'build_target_indexes'):
+        sync.load_full_table(MagicMock(), MagicMock(), 'cli', 'cli', 'copy_text')
+
+    table_manager.set_logged.assert_not_called()
+    table_manager.swap_tables.assert_called_once_with('cli__staging', 'cli')
+
+
+def test_recarga_completa_fallida_elimina_la_staging_sin_tocar_la_tabla_publicada(table_manager):
+    sync = build_sync(['cli'])
+
+    with patch.object(SyncSQLToPostgres, 'copy_rows', return_value=5), \
+         patch.object(SyncSQLToPostgres, 'build_target_indexes', side_effect=RuntimeError("índice duplicado")):
+        with pytest.raises(RuntimeError, match="índice duplicado"):
+            sync.load_full_table(MagicMock(), MagicMock(), 'cli', 'cli', 'copy_text')
+
+    table_manager.drop_table.assert_called_once_with('cli__staging')
+    table_manager.swap_tables.assert_not_called()
+
+
+def test_recarga_por_particiones_fallida_conserva_la_staging_para_reanudar(table_manager):
+    sync = build_sync(['obr'], table_config={'obr': {'partitions': 4}})
+    sync.run_manifest = MagicMock(enabled=True)
+
+    with patch.object(SyncSQLToPostgres, 'process_partitioned_table', side_effect=RuntimeError("corte")):
+        with pytest.raises(RuntimeError):
+            sync.load_full_table(MagicMock(), MagicMock(), 'obr', 'obr', 'copy_text')
+
+    table_manager.drop_table.assert_not_called()
+
+
+@pytest.mark.parametrize("unlogged, target_rows, reason", [
+    (True, 10, "UNLOGGED"),
+    (False, 0, "0 filas"),
+])
+def test_tabla_destino_vaciada_tras_una_caida_fuerza_la_recarga(table_manager, unlogged, target_rows, reason):
+    sync = build_sync(['cli'])
+    table_manager.is_unlogged.return_value = unlogged
+    table_manager.count_rows.return_value = target_rows
+
+    assert reason in sync.target_reload_reason(table_manager, 'cli', 10)
+    table_manager.is_unlogged.return_value = False
+    table_manager.count_rows.return_value = 10
+    assert sync.target_reload_reason(table_manager, 'cli', 10) is None
@@ -0,0 +1,167 @@
+# tests/test_sync_state_repository.py
+
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+from application.sync_sql_to_postgres import SyncSQLToPostgres
+from infrastructure.sql_server_catalog import compute_schema_hash
+from infrastructure.sync_state_repository import deserialize_watermark, serialize_watermark
+
+
+class MemorySyncState:
+    """
+    Estado de sincronización en memoria con la interfaz de SyncStateRepository.
+    """
+
+    def __init__(self, state=None, checksums=None, schema_hash=None):
+        self.state = state
+        self.checksums = checksums or {}
+        self.checksum_schema_hash = schema_hash
+        self.loads = []  # Estado guardado al empezar cada recarga completa
+
+    def get_state(self, table_name):
+        return self.state
+
+    def save_state(self, table_name, watermark_column, watermark, schema_hash, row_count=None):
+        self.state = {"watermark_column": watermark_column, "watermark": watermark,
+                      "schema_hash": schema_hash, "row_count": row_count}
+
+    def clear_state(self, table_name):
+        self.state = None
+
+    def get_checksums(self, table_name):
+        return self.checksum_schema_hash, dict(self.checksums)
+
+    def save_checksums(self, table_name, checksums, schema_hash):
+        self.checksums, self.checksum_schema_hash = dict(checksums), schema_hash
+
+    def clear_checksums(self, table_name):
+        self.save_checksums(table_name, {}, None)
+
+
+@pytest.fixture
+def incremental():
+    """
+    Sincronización incremental de 'cli' por 'fecha_mod' con el catálogo, el estado y
+    las tablas destino sustituidos; devuelve una función que la ejecuta.
+    """
+    def run(state, max_watermark, key_columns=('ide',), unlogged=False, target_rows=10, schema_hash='h1'):
+        sync = SyncSQLToPostgres(
+            sql_server_config={}, postgres_config={}, tables=['cli'],
+            table_config={'cli': {'mode': 'incremental', 'watermark_column': 'fecha_mod',
+                                  'key_columns': list(key_columns)}},
+        )
+        repository = MemorySyncState(state)
+        with patch('application.sync_sql_to_postgres.SyncStateRepository', return_value=repository), \
+             patch('application.sync_sql_to_postgres.SQLServerCatalog') as catalog, \
+             patch('application.sync_sql_to_postgres.PostgresTableManager') as tables, \
+             patch.object(SyncSQLToPostgres, 'get_source_hash', return_value=schema_hash), \
+             patch.object(SyncSQLToPostgres, 'load_full_table',
+                          side_effect=lambda *a, **k: repository.loads.append(repository.state) or 10) as load_full_table, \
+             patch.object(SyncSQLToPostgres, 'copy_rows', return_value=3) as copy_rows:
+            catalog.return_value.get_max_value.return_value = max_watermark
+            tables.return_value.table_exists.return_value = True
+            tables.return_value.is_unlogged.return_value = unlogged
+            tables.return_value.count_rows.return_value = target_rows
+            rows = sync.process_incremental_table(MagicMock(), MagicMock(), 'cli', 'cli', 'copy_text')
+        return rows, repository, load_full_table, copy_rows
+    return run
+
+
+def saved_state(watermark, row_count=10, schema_hash='h1'):
+    return {"watermark_column": "fecha_mod", "watermark": watermark, "schema_hash": schema_hash,
+            "row_count": row_count}
+
+
+@pytest.mark.parametrize("value", [
+    496412, Decimal("12.50"), datetime(2024, 11, 7, 0, 30), date(2024, 11, 7), "A-001", None,
+])
+def test_marca_de_agua_ida_y_vuelta(value):
+    assert deserialize_watermark(*serialize_watermark(value)) == value
+
+
+def test_huella_de_esquema_detecta_cambios_de_columna():
+    columns = [("ide", "int", None, 10, 0, None, "NO"), ("nombre", "varchar", 50, None, None, None, "YES")]
+    widened = [columns[0], ("nombre", "varchar", 100, None, None, None, "YES")]
+
+    assert compute_schema_hash(columns) == compute_schema_hash(list(columns))
+    assert compute_schema_hash(columns) != compute_schema_hash(widened)
+
+
+@pytest.mark.parametrize("unlogged, target_rows", [(True, 10), (False, 0)])
+def test_tabla_destino_vaciada_tras_una_caida_descarta_la_marca_y_recarga(incremental, unlogged, target_rows):
+    rows, repository, load_full_table, copy_rows = incremental(
+        saved_state(datetime(2024, 11, 7)), datetime(2024, 11, 8), unlogged=unlogged, target_rows=target_rows
+    )
+
+    assert rows == 10
+    load_full_table.assert_called_once()
+    copy_rows.assert_not_called()
+    # Si la recarga falla no queda una marca de agua que no corresponde a la tabla destino
+    assert repository.loads == [None]
+    assert repository.state == saved_state(datetime(2024, 11, 8), row_count=10)
+
+
+def test_primera_ejecucion_carga_entera_y_guarda_la_marca(incremental):
+    rows, repository, load_full_table, copy_rows = incremental(None, datetime(2024, 11, 8))
+
+    assert rows == 10
+    assert load_full_table.call_args.kwargs == {'key_columns': ['ide']}
+    copy_rows.assert_not_called()
+    assert repository.state == saved_state(datetime(2024, 11, 8))
+
+
+def test_sin_filas_nuevas_no_se_copia_nada(incremental):
+    rows, repository, load_full_table, copy_rows = incremental(saved_state(datetime(2024, 11, 8)),
+                                                               datetime(2024, 11, 8))
+
+    assert rows == 0
+    load_full_table.assert_not_called()
+    copy_rows.assert_not_called()
+
+
+def test_cambio_de_esquema_fuerza_la_recarga(incremental):
+    rows, repository, load_full_table, copy_rows = incremental(
+        saved_state(datetime(2024, 11, 7), schema_hash='h1'), datetime(2024, 11, 8), schema_hash='h2'
+    )
+
+    load_full_table.assert_called_once()
+    copy_rows.assert_not_called()
+    assert repository.state['schema_hash'] == 'h2'
+
+
+@pytest.mark.parametrize("key_columns, operator", [
+    (('ide',), '>='),                   # La marca no es clave: puede repetirse
+    (('fecha_mod', 'ide'), '>='),       # Clave compuesta: filas nuevas con la última fecha y otro ide
+    (('fecha_mod',), '>'),              # La marca es la clave: no se repite
+])
+def test_filas_nuevas_se_leen_desde_la_marca_y_se_aplican_como_upsert(incremental, key_columns, operator):
+    rows, repository, load_full_table, copy_rows = incremental(
+        saved_state(datetime(2024, 11, 7)), datetime(2024, 11, 8), key_columns=key_columns
+    )
+
+    assert rows == 3
+    load_full_table.assert_not_called()
+    assert copy_rows.call_args.kwargs == {
+        'where': f"[fecha_mod] {operator} ?", 'params': (datetime(2024, 11, 7),), 'key_columns': list(key_columns),
+    }
+    assert repository.state == saved_state(datetime(2024, 11, 8))
+
+
+def test_la_clave_del_upsert_y_su_indice_usan_los_nombres_de_destino():
+    sync = SyncSQLToPostgres(
+        sql_server_config={}, postgres_config={}, tables=['cli'],
+        table_config={'cli': {'schema': 'pandas', 'transformations': [{'column': 'ide', 'type': 'rename', 'to': 'id'}]}},
+    )
+    chunk = MagicMock()
+    with patch.object(SyncSQLToPostgres, 'read_frames') as read_frames, \
+         patch('application.sync_sql_to_postgres.upsert_dataframe') as upsert_dataframe, \
+         patch('application.sync_sql_to_postgres.PostgresTableManager') as tables:
+        read_frames.return_value.__enter__.return_value = [chunk]
+        sync.copy_rows(MagicMock(), MagicMock(), 'cli', 'cli', 'copy_text', key_columns=['ide'])
+        sync.build_target_indexes(MagicMock(), MagicMock(), 'cli', 'cli', key_columns=['ide'])
+
+    assert upsert_dataframe.call_args.args[3] == ['id']
+    tables.unique_key_index_statement.assert_called_once_with('cli', ['id'])
@@ -0,0 +1,47 @@
+# tests/test_table_dependencies.py
+
+from application.table_dependencies import TableDependencies
+
+
+def fk(name, table, referenced_table):
+    return {'name': name, 'table': table, 'columns': ['ide_ref'], 'referenced_table': referenced_table,
+            'referenced_columns': ['ide'], 'trusted': True}
+
+
+FOREIGN_KEYS = [
+    fk('fk_obr_cli', 'obr', 'cli'),
+    fk('fk_obr_age', 'obr', 'age'),
+    fk('fk_cli_age', 'cli', 'age'),
+    fk('fk_age_padre', 'age', 'age'),  # Autorreferencia
+    fk('fk_obr_emp', 'obr', 'emp'),  # Tabla que no se sincroniza
+]
+
+
+def test_oleadas_topologicas():
+    dependencies = TableDependencies(['obr', 'prv', 'cli', 'age'], FOREIGN_KEYS)
+
+    assert dependencies.waves == [['prv', 'age'], ['cli'], ['obr']]
+    assert len(dependencies.foreign_keys) == 4
+
+
+def test_una_tabla_empieza_cuando_terminan_sus_dependencias():
+    dependencies = TableDependencies(['obr', 'prv', 'cli', 'age'], FOREIGN_KEYS)
+
+    assert dependencies.ready(finished=[], started=[]) == ['prv', 'age']
+    assert dependencies.ready(finished=['age'], started=['prv', 'age']) == ['cli']
+    assert dependencies.ready(finished=['age', 'cli'], started=['prv', 'age', 'cli']) == ['obr']
+
+
+def test_claves_foraneas_listas_cuando_sus_dos_tablas_terminan():
+    dependencies = TableDependencies(['obr', 'cli', 'age'], FOREIGN_KEYS)
+
+    assert {f['name'] for f in dependencies.foreign_keys_ready(['age'])} == {'fk_age_padre'}
+    assert {f['name'] for f in dependencies.foreign_keys_ready(['age', 'cli'])} == {'fk_age_padre', 'fk_cli_age'}
+
+
+def test_los_ciclos_se_rompen_sin_bloquear():
+    foreign_keys = [fk('fk_a_b', 'a', 'b'), fk('fk_b_a', 'b', 'a'), fk('fk_c_b', 'c', 'b'), fk('fk_b_d', 'b', 'd')]
+    dependencies = TableDependencies(['a', 'b', 'c', 'd'], foreign_keys)
+
+    assert dependencies.waves == [['d'], ['a'], ['b'], ['c']]
+    assert dependencies.ready(finished=['d'], started=['d']) == ['a']
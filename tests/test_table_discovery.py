@@ -0,0 +1,34 @@
+# tests/test_table_discovery.py
+
+from application.table_discovery import filter_tables, order_largest_first, plan_tables
+from domain.entities import SourceTable
+
+CATALOG = [
+    SourceTable('age', 120, 16384),
+    SourceTable('cli', 5000, 2 * 1024 * 1024),
+    SourceTable('obr', 900000, 800 * 1024 * 1024),
+    SourceTable('obr_hist', 3000000, 1200 * 1024 * 1024),
+    SourceTable('prv', 4000, 1024 * 1024),
+]
+
+
+def test_filtros_include_y_exclude_con_comodines():
+    tables = filter_tables(CATALOG, include=['obr*', 'CLI'], exclude=['*_hist'])
+
+    assert [t.name for t in tables] == ['cli', 'obr']
+
+
+def test_ordena_de_mayor_a_menor_tamano_reservado():
+    assert [t.name for t in order_largest_first(CATALOG)] == ['obr_hist', 'obr', 'cli', 'prv', 'age']
+
+
+def test_tablas_indicadas_se_ordenan_con_los_tamanos_del_catalogo():
+    tables = plan_tables(CATALOG, ['prv', 'AGE', 'nueva', 'obr'])
+
+    assert [t.name for t in tables] == ['obr', 'prv', 'AGE', 'nueva']
+    assert tables[2].rows == 120 and tables[3].reserved_bytes == 0
+
+
+def test_sin_lista_se_descubren_todas_y_se_respeta_el_orden_si_se_pide():
+    assert len(plan_tables(CATALOG)) == 5
+    assert [t.name for t in plan_tables(CATALOG, exclude=['obr*'], largest_first=False)] == ['age', 'cli', 'prv']
@@ -0,0 +1,175 @@
+# tests/test_table_partitioning.py
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from application.sync_sql_to_postgres import SyncSQLToPostgres
+from application.table_partitioning import KeyRange, chunk_key_range, ranges_from_boundaries, split_key_range
+from infrastructure.sql_server_catalog import checksum_aggregate, row_checksum
+from tests.test_sync_state_repository import MemorySyncState
+
+# Checksums guardados en la última carga: dos trozos de ancho 100 y el total ('*')
+STORED = {'0': (99, 111), '1': (100, 222), '*': (199, 333)}
+
+
+def test_split_key_range_cubre_todo_el_intervalo_sin_solapes():
+    ranges = split_key_range(1, 100, 4)
+
+    assert ranges == [KeyRange(None, 26), KeyRange(26, 51), KeyRange(51, 76), KeyRange(76, None)]
+
+
+def test_split_key_range_no_crea_mas_particiones_que_valores():
+    assert len(split_key_range(10, 12, 8)) == 3
+    assert split_key_range(5, 5, 4) == [KeyRange(None, None)]
+
+
+def test_ranges_from_boundaries_descarta_cortes_repetidos():
+    assert ranges_from_boundaries([10, 10, 20]) == [KeyRange(None, 10), KeyRange(10, 20), KeyRange(20, None)]
+
+
+def test_to_where_genera_predicados_parametrizados():
+    assert KeyRange(10, 20).to_where("ide") == ("[ide] >= ? AND [ide] < ?", (10, 20))
+    assert KeyRange(None, 20).to_where("ide") == ("[ide] < ?", (20,))
+    assert KeyRange(nulls=True).to_where("ide") == ("[ide] IS NULL", ())
+    assert KeyRange().to_where("ide") == ("[ide] IS NOT NULL", ())
+
+
+def test_split_key_range_valida_el_numero_de_particiones():
+    with pytest.raises(ValueError):
+        split_key_range(1, 10, 0)
+
+
+@pytest.mark.parametrize("bucket, expected", [
+    (3, KeyRange(300, 400)),
+    (0, KeyRange(-99, 100)),
+    (-2, KeyRange(-299, -199)),
+    (None, KeyRange(nulls=True)),
+])
+def test_chunk_key_range_reproduce_la_division_entera_de_sql_server(bucket, expected):
+    key_range = chunk_key_range(bucket, 100)
+    assert key_range == expected
+    if bucket is not None:
+        # Todas las claves del rango caen en el mismo trozo (división truncada hacia cero)
+        keys = range(key_range.lower, key_range.upper)
+        assert {int(k / 100) for k in keys} == {bucket}
+
+
+def test_to_where_para_postgresql():
+    assert KeyRange(10, 20).to_where("ide", dialect="postgresql") == ('"ide" >= %s AND "ide" < %s', (10, 20))
+
+
+@pytest.fixture
+def checksums():
+    """
+    Sincronización por checksums de 'obr' (clave 'ide', trozos de 100) con el
+    catálogo, el estado y las tablas destino sustituidos; devuelve una función
+    que la ejecuta con los checksums de origen indicados.
+    """
+    def run(table_checksum, chunks, stored=STORED, schema_hash='h1', lob_columns=(), table_config=None):
+        sync = SyncSQLToPostgres(
+            sql_server_config={}, postgres_config={}, tables=['obr'],
+            table_config={'obr': {'mode': 'checksum', 'checksum_key': 'ide', 'checksum_chunk_width': 100,
+                                  **(table_config or {})}},
+        )
+        repository = MemorySyncState(checksums=stored, schema_hash='h1')
+        with patch('application.sync_sql_to_postgres.SyncStateRepository', return_value=repository), \
+             patch('application.sync_sql_to_postgres.SQLServerCatalog') as catalog, \
+             patch('application.sync_sql_to_postgres.PostgresTableManager') as tables, \
+             patch('application.sync_sql_to_postgres.replace_rows', return_value=7) as replace_rows, \
+             patch.object(SyncSQLToPostgres, 'read_frames'), \
+             patch.object(SyncSQLToPostgres, 'get_source_hash', return_value=schema_hash), \
+             patch.object(SyncSQLToPostgres, 'load_full_table', return_value=199) as load_full_table:
+            catalog.return_value.get_lob_columns.return_value = list(lob_columns)
+            catalog.return_value.get_columns.return_value = [('ide', 'int'), ('nombre', 'varchar'), ('notas', 'text')]
+            catalog.return_value.get_table_checksum.return_value = table_checksum
+            catalog.return_value.get_chunk_checksums.return_value = chunks
+            catalog.return_value.get_average_row_bytes.return_value = 100.0
+            tables.return_value.is_unlogged.return_value = False
+            tables.return_value.count_rows.return_value = stored.get('*', (0,))[0]
+            rows = sync.process_checksum_table(MagicMock(), MagicMock(), 'obr', 'obr', 'copy_text')
+        return rows, repository, replace_rows, load_full_table, catalog.return_value
+    return run
+
+
+def test_checksums_iguales_omiten_la_tabla(checksums):
+    rows, repository, replace_rows, load_full_table, catalog = checksums((199, 333), {})
+
+    assert rows == 0
+    replace_rows.assert_not_called()
+    load_full_table.assert_not_called()
+    catalog.get_chunk_checksums.assert_not_called()
+
+
+def test_un_trozo_modificado_solo_reemplaza_su_rango(checksums):
+    rows, repository, replace_rows, load_full_table, catalog = checksums(
+        (199, 444), {0: (99, 111), 1: (100, 999)}
+    )
+
+    assert rows == 7
+    load_full_table.assert_not_called()
+    replace_rows.assert_called_once()
+    assert replace_rows.call_args.args[2:5] == ('obr', '"ide" >= %s AND "ide" < %s', (100, 200))
+    assert repository.checksums == {'0': (99, 111), '1': (100, 999), '*': (199, 444)}
+
+
+def test_un_trozo_eliminado_borra_su_rango_en_destino(checksums):
+    rows, repository, replace_rows, load_full_table, catalog = checksums((99, 111), {0: (99, 111)})
+
+    replace_rows.assert_called_once()
+    assert replace_rows.call_args.args[1:5] == ([], 'obr', '"ide" >= %s AND "ide" < %s', (100, 200))
+    assert repository.checksums == {'0': (99, 111), '*': (99, 111)}
+
+
+def test_el_borrado_del_rango_usa_el_nombre_de_clave_de_destino(checksums):
+    rows, repository, replace_rows, load_full_table, catalog = checksums(
+        (199, 444), {0: (99, 111), 1: (100, 999)},
+        table_config={'transformations': [{'column': 'ide', 'type': 'rename', 'to': 'id'}]}
+    )
+
+    assert replace_rows.call_args.args[3] == '"id" >= %s AND "id" < %s'
+
+
+def test_cambio_de_esquema_fuerza_la_recarga_completa(checksums):
+    rows, repository, replace_rows, load_full_table, catalog = checksums(
+        (199, 333), {0: (99, 111), 1: (100, 222)}, schema_hash='h2'
+    )
+
+    assert rows == 199
+    load_full_table.assert_called_once()
+    replace_rows.assert_not_called()
+    assert repository.checksum_schema_hash == 'h2'
+
+
+def test_columnas_lob_entran_en_el_checksum_por_su_hash(checksums):
+    rows, repository, replace_rows, load_full_table, catalog = checksums((199, 333), {}, lob_columns=['notas'])
+
+    assert rows == 0
+    assert catalog.get_table_checksum.call_args.args == ('obr', ['ide', 'nombre', 'notas'], None, (), ['notas'])
+
+
+def test_columnas_lob_con_checksum_lob_full_recargan_la_tabla(checksums):
+    rows, repository, replace_rows, load_full_table, catalog = checksums(
+        (199, 333), {}, lob_columns=['notas'], table_config={'checksum_lob': 'full'}
+    )
+
+    assert rows == 199
+    load_full_table.assert_called_once()
+    catalog.get_table_checksum.assert_not_called()
+    assert repository.checksums == {}
+
+
+def test_expresion_de_checksum_con_columnas_lob():
+    assert row_checksum() == "BINARY_CHECKSUM(*)"
+    assert row_checksum(['ide', 'notas'], ['NOTAS']) == (
+        "BINARY_CHECKSUM([ide], HASHBYTES('SHA2_256', CAST([notas] AS varbinary(max))))"
+    )
+    assert checksum_aggregate(['ide']) == "SUM(CAST(BINARY_CHECKSUM([ide]) AS bigint))"
+    with pytest.raises(ValueError):
+        row_checksum(None, ['notas'])
+
+
+def test_la_clave_de_checksums_debe_ser_entera(checksums):
+    with pytest.raises(ValueError, match="'nombre' de 'obr' es varchar; debe ser entera"):
+        checksums((199, 333), {}, table_config={'checksum_key': 'nombre'})
+    with pytest.raises(ValueError, match="no tiene la columna clave de checksums 'codigo'"):
+        checksums((199, 333), {}, table_config={'checksum_key': 'codigo'})
@@ -0,0 +1,57 @@
+# tests/test_table_stream.py
+
+import struct
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine, text
+from infrastructure.postgres_copy_loader import encode_binary_rows, encode_text_rows
+from infrastructure.table_stream import TableStreamReader, stream_table_chunks
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # SQLite acepta identificadores entre corchetes, igual que SQL Server
+    engine = create_engine(f"sqlite:///{tmp_path / 'origen.db'}")
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE obr (ide INTEGER, nombre TEXT)"))
+        for i in range(1, 26):
+            connection.execute(text("INSERT INTO obr VALUES (:i, :n)"), {"i": i, "n": f"obra {i}"})
+    yield engine
+    engine.dispose()
+
+
+def test_stream_table_chunks_respeta_el_tamano_de_lote(engine):
+    chunks = list(stream_table_chunks(engine, "obr", chunk_size=10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert list(chunks[0].columns) == ["ide", "nombre"]
+    assert sum(chunk["ide"].sum() for chunk in chunks) == sum(range(1, 26))
+
+
+def test_reader_aplica_columnas_y_filtro(engine):
+    with TableStreamReader(engine, "obr", columns=["ide"], where="[ide] > ?", params=(20,)) as reader:
+        chunk = reader.fetch(100)
+        assert reader.fetch(100) is None
+
+    assert list(chunk.columns) == ["ide"]
+    assert chunk["ide"].tolist() == [21, 22, 23, 24, 25]
+
+
+def test_los_decimal_llegan_exactos_a_los_codificadores_de_copy():
+    # pyodbc devuelve decimal/numeric/money como Decimal; como float64 se redondearían
+    amount, key = Decimal('12345678901234567.8901'), Decimal('9007199254740993')
+    engine = MagicMock()
+    cursor = engine.raw_connection.return_value.cursor.return_value
+    cursor.description = [("importe",), ("ide",)]
+    cursor.fetchmany.return_value = [(amount, key), (None, Decimal('1'))]
+
+    with TableStreamReader(engine, "fac") as reader:
+        chunk = reader.fetch(100)
+
+    assert chunk["importe"][0] == amount and chunk["ide"][0] == key
+    assert encode_text_rows(chunk) == "12345678901234567.8901\t9007199254740993\n\\N\t1\n"
+    data = encode_binary_rows(chunk, ["numeric", "numeric"])
+    # Primer campo: 6 dígitos base 10000, peso 4 y escala 4 (1|2345|6789|0123|4567|8901)
+    assert data[19 + 2 + 4:19 + 2 + 4 + 8 + 12] == struct.pack(">hhHH6H", 6, 4, 0, 4, 1, 2345, 6789, 123, 4567, 8901)
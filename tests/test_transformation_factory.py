@@ -0,0 +1,73 @@
+# tests/test_transformation_factory.py
+
+import pandas as pd
+import pytest
+from application.transformations.transformation_factory import TransformationFactory
+
+
+def test_el_plan_aplica_los_pasos_en_orden():
+    plan = TransformationFactory().get_plan("cli", {}, [
+        {"column": "tipo", "type": "trim"},
+        {"column": "tipo", "type": "map", "values": {"A": "Alta", "B": "Baja"}},
+        {"column": "tipo", "type": "rename", "to": "estado"},
+        {"column": "cod", "type": "cast", "to": "integer"},
+    ])
+    df = pd.DataFrame({"tipo": [" A ", "B", "X ", None], "cod": ["1", "2", None, "4"]})
+
+    result = plan.apply(df)
+
+    assert list(result.columns) == ["estado", "cod"]
+    assert result["estado"].tolist()[:3] == ["Alta", "Baja", "X"]
+    assert str(result["cod"].dtype) == "Int32"
+    assert result["cod"].isna().tolist() == [False, False, True, False]
+
+
+def test_map_con_valor_por_defecto():
+    plan = TransformationFactory().get_plan("cli", {}, [
+        {"column": "tipo", "type": "map", "values": {1: "Alta"}, "default": "Otro", "to": "text"}
+    ])
+
+    assert plan.apply(pd.DataFrame({"tipo": [1, 2]}))["tipo"].tolist() == ["Alta", "Otro"]
+    assert plan.output_column({"name": "tipo", "type": "integer", "nullable": True})["type"] == "text"
+
+
+def test_output_columns_refleja_nombres_y_tipos():
+    plan = TransformationFactory().get_plan("obr", {}, [{"column": "cod", "type": "rename", "to": "codigo"},
+                                                         {"column": "imp", "type": "cast", "to": "numeric(12,2)"}])
+    columns = [{"name": "ide", "type": "integer", "nullable": False},
+               {"name": "cod", "type": "text", "nullable": False},
+               {"name": "imp", "type": "double precision", "nullable": True}]
+
+    result = plan.output_columns(columns)
+
+    assert result[0] == columns[0]
+    assert result[1] == {"name": "codigo", "type": "text", "nullable": False}
+    assert result[2]["type"] == "numeric(12,2)"
+    assert plan.output_name("cod") == "codigo"
+
+
+def test_el_plan_se_compila_una_vez_por_tabla():
+    factory = TransformationFactory()
+
+    assert factory.get_plan("obr") is factory.get_plan("obr")
+
+
+def test_configuracion_no_valida():
+    with pytest.raises(ValueError, match="desconocida"):
+        TransformationFactory().get_plan("obr", {}, [{"column": "a", "type": "upper"}])
+    with pytest.raises(ValueError, match="repetidas"):
+        TransformationFactory().get_plan("obr", {}, [{"column": "a", "type": "rename", "to": "b"},
+                                                     {"column": "b", "type": "trim"}])
+
+
+def test_un_renombrado_no_puede_chocar_con_una_columna_sin_transformar():
+    specs = [{"column": "cod", "type": "rename", "to": "ide"}]
+
+    with pytest.raises(ValueError, match="repetidas: ide"):
+        TransformationFactory().get_plan("obr", {}, specs, ["ide", "cod"])
+    plan = TransformationFactory().get_plan("obr", {}, specs)
+    with pytest.raises(ValueError, match="repetidas: ide"):
+        plan.output_columns([{"name": "ide", "type": "integer", "nullable": False},
+                             {"name": "cod", "type": "text", "nullable": True}])
+    with pytest.raises(ValueError, match="repetidas: ide"):
+        plan.apply(pd.DataFrame({"ide": [1], "cod": ["a"]}))